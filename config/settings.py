@@ -14,4 +14,16 @@ APP_CONFIG = {
 DATABASE_CONFIG = {
     'type': 'sqlite',
     'path': os.path.join(BASE_DIR, 'data', 'app.db'),
+    'timeout': 30.0,
+    'cached_statements': 256,
+    # PRAGMA yang di-apply ke setiap koneksi di pool (urutan dipertahankan)
+    'pragmas': {
+        'journal_mode': 'WAL',          # Reader tidak diblok oleh writer
+        'synchronous': 'NORMAL',        # Aman dengan WAL, tanpa fsync per commit
+        'cache_size': -65536,           # Negatif = KiB (64 MB page cache)
+        'mmap_size': 268435456,         # 256 MB memory-mapped I/O
+        'temp_store': 'MEMORY',
+    },
+    # Interval (detik) untuk PRAGMA wal_checkpoint(PASSIVE), 0 = nonaktif
+    'checkpoint_interval': 300,
 }
\ No newline at end of file
@@ -1,9 +1,14 @@
 import sqlite3
 import os
-from datetime import datetime
+import atexit
+import threading
+from datetime import datetime, timedelta
 import hashlib
+import re
 import logging
 
+from config.settings import DATABASE_CONFIG
+
 # Setup logging - optimized untuk singleton pattern
 logger = logging.getLogger(__name__)
 
@@ -22,13 +27,275 @@ if not logger.handlers:
     logger.addHandler(file_handler)
     logger.addHandler(stream_handler)
 
+# Index untuk kolom join/filter yang dipakai query di views: (nama index, target)
+SCHEMA_INDEXES = [
+    ("idx_detail_container_container", "detail_container(container_id, assigned_at)"),
+    ("idx_detail_container_barang", "detail_container(barang_id, container_id)"),
+    ("idx_barang_pengirim", "barang(pengirim)"),
+    ("idx_barang_penerima", "barang(penerima)"),
+    ("idx_containers_kapal", "containers(kapal_id)"),
+    ("idx_containers_ref_joa", "containers(ref_joa)"),
+    ("idx_delivery_costs_container", "container_delivery_costs(container_id, delivery)"),
+    ("idx_barang_tax_container", "barang_tax(container_id, barang_id)"),
+]
+
+# Nama unik (case-insensitive) per tabel master: nama index -> (tabel, kolom nama)
+UNIQUE_NAME_INDEXES = {
+    'idx_customers_nama_upper': ('customers', 'nama_customer'),
+    'idx_pengirim_nama_upper': ('pengirim', 'nama_pengirim'),
+}
+
+# Full-text search (FTS5) untuk nama barang/customer/pengirim: kind -> (tabel, kolom id, kolom nama, kode rowid)
+# rowid search_index = ref_id * SEARCH_ROWID_FACTOR + kode, sehingga trigger bisa update/delete per rowid
+SEARCH_SOURCES = {
+    'barang': ('barang', 'barang_id', 'nama_barang', 1),
+    'customer': ('customers', 'customer_id', 'nama_customer', 2),
+    'pengirim': ('pengirim', 'pengirim_id', 'nama_pengirim', 3),
+}
+SEARCH_ROWID_FACTOR = 4
+
+# Tarif pajak barang (pajak = 1): PPN 1.1% dan PPH 23 2%
+PPN_RATE = 0.011
+PPH23_RATE = 0.02
+
+# Batas parameter per statement untuk query IN (...)
+SQL_PARAM_CHUNK = 900
+
+# Jumlah baris batch insert di antara cek cancel_event / laporan progres
+BATCH_PROGRESS_INTERVAL = 200
+
+# Kolom barang yang diisi oleh batch insert (urutan = urutan parameter)
+BARANG_INSERT_COLUMNS = (
+    'pengirim', 'penerima', 'nama_barang',
+    'panjang_barang', 'lebar_barang', 'tinggi_barang', 'm3_barang', 'ton_barang', 'container_barang',
+    'm3_pp', 'm3_pd', 'm3_dd', 'ton_pp', 'ton_pd', 'ton_dd',
+    'col_pp', 'col_pd', 'col_dd',
+    'container_pp', 'container_pd', 'container_dd',
+    'container_20_pp', 'container_20_pd', 'container_20_dd',
+    'container_21_pp', 'container_21_pd', 'container_21_dd',
+    'container_40hc_pp', 'container_40hc_pd', 'container_40hc_dd',
+    'pajak',
+)
+BARANG_INSERT_SQL = (
+    f"INSERT INTO barang ({', '.join(BARANG_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(BARANG_INSERT_COLUMNS))})"
+)
+
+# Kolom tabel staging import (create_barang_chunks): kolom barang + nomor baris file untuk laporan error
+BARANG_IMPORT_COLUMNS = BARANG_INSERT_COLUMNS + ('row_number',)
+
+# Insert satu baris barang_tax; tax_id diambil dari cursor.lastrowid per baris
+BARANG_TAX_INSERT_SQL = (
+    "INSERT INTO barang_tax (container_id, barang_id, penerima, total_nilai_barang, "
+    "ppn_rate, pph23_rate, ppn_amount, pph23_amount, total_tax, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)"
+)
+
+# Kolom yang boleh dipakai untuk ORDER BY pada query barang per halaman
+BARANG_SORT_COLUMNS = {
+    'barang_id': 'b.barang_id',
+    'sender_name': 's.nama_customer',
+    'receiver_name': 'r.nama_customer',
+    'nama_barang': 'b.nama_barang',
+    'm3_barang': 'b.m3_barang',
+    'ton_barang': 'b.ton_barang',
+    'pajak': 'b.pajak',
+    'created_at': 'b.created_at',
+    **{column: f'b.{column}' for column in (
+        'm3_pp', 'm3_pd', 'm3_dd', 'ton_pp', 'ton_pd', 'ton_dd', 'col_pp', 'col_pd', 'col_dd',
+        'container_20_pp', 'container_20_pd', 'container_20_dd',
+        'container_21_pp', 'container_21_pd', 'container_21_dd',
+        'container_40hc_pp', 'container_40hc_pd', 'container_40hc_dd',
+    )},
+}
+# Deteksi tabel yang ditulis oleh query execute*/execute_many, untuk generation counter
+WRITE_QUERY_PATTERN = re.compile(
+    r'^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+["`\[]?(\w+)',
+    re.IGNORECASE
+)
+
+
 class DatabaseError(Exception):
     """Custom database exception"""
     pass
 
+class OperationCancelled(DatabaseError):
+    """Batch operation dibatalkan lewat cancel_event; transaksi sudah di-rollback"""
+    pass
+
+class ConnectionPool:
+    """Thread-aware connection pool - satu koneksi per thread, di-reuse sampai close_all()
+
+    Koneksi dibuka sekali per thread dan dipakai ulang untuk semua query, sehingga
+    statement cache milik sqlite3 (cached_statements) benar-benar terpakai dan
+    overhead connect per query hilang.
+    """
+
+    def __init__(self, db_path, timeout=30.0, cached_statements=256, pragmas=None):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.pragmas = dict(pragmas or {})
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}  # thread ident -> connection
+        self._generation = 0  # dinaikkan setiap close_all() agar koneksi lama tidak dipakai lagi
+
+    def _connect(self):
+        """Open a new connection for the current thread"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=False  # Pool menjamin satu koneksi hanya dipakai oleh thread pemiliknya
+        )
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        for name, value in self.pragmas.items():
+            try:
+                conn.execute(f"PRAGMA {name} = {value}")
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to apply PRAGMA {name}={value}: {e}")
+        return conn
+
+    def get(self):
+        """Get the pooled connection for the current thread, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.generation == self._generation:
+            return conn
+
+        conn = self._connect()
+        ident = threading.get_ident()
+        with self._lock:
+            # Thread ident bisa dipakai ulang setelah thread lama selesai
+            stale = self._connections.pop(ident, None)
+            self._connections[ident] = conn
+            self._local.conn = conn
+            self._local.generation = self._generation
+
+        if stale is not None and stale is not conn:
+            try:
+                stale.close()
+            except sqlite3.Error:
+                pass
+
+        logger.debug(f"Opened pooled connection for thread {ident}")
+        return conn
+
+    def release(self):
+        """Close the connection owned by the current thread (untuk worker thread yang selesai)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+
+        with self._lock:
+            self._connections.pop(threading.get_ident(), None)
+            self._local.conn = None
+
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to close pooled connection: {e}")
+
+    def size(self):
+        """Number of open pooled connections"""
+        with self._lock:
+            return len(self._connections)
+
+    def close_all(self):
+        """Close every pooled connection (dipanggil saat aplikasi shutdown)"""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+            self._generation += 1
+
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to close pooled connection: {e}")
+
+        if connections:
+            logger.info(f"Closed {len(connections)} pooled database connection(s)")
+
+class CustomerDirectory:
+    """Process-wide cache of the customers table, loaded with one query
+
+    Menyimpan id -> record customer dan NAMA (upper) -> id. Dimuat saat pertama
+    dipakai, lalu dikosongkan oleh bump_generation('customers') pada setiap write
+    ke tabel customers sehingga pembacaan berikutnya memuat ulang sekaligus,
+    bukan lookup per id.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.RLock()
+        self._by_id = None  # customer_id -> dict customer
+        self._id_by_name = None  # nama customer (upper) -> customer_id
+
+    def _load(self):
+        """Return (by_id, id_by_name), loading them if needed"""
+        with self._lock:
+            if self._by_id is None:
+                by_id = {}
+                id_by_name = {}
+                for row in self.db.execute("SELECT * FROM customers ORDER BY customer_id"):
+                    customer = dict(row)
+                    by_id[customer['customer_id']] = customer
+                    if customer['nama_customer']:
+                        id_by_name.setdefault(customer['nama_customer'].upper(), customer['customer_id'])
+                self._by_id, self._id_by_name = by_id, id_by_name
+                logger.debug(f"Customer directory loaded: {len(by_id)} customers")
+            return self._by_id, self._id_by_name
+
+    def invalidate(self):
+        """Drop cached data (dipanggil setelah write ke tabel customers)"""
+        with self._lock:
+            self._by_id = None
+            self._id_by_name = None
+
+    def customers(self):
+        """All customers (copy) in customer_id order"""
+        by_id, _ = self._load()
+        return [dict(customer) for customer in by_id.values()]
+
+    def get(self, customer_id):
+        """Customer dict (copy) or None"""
+        try:
+            customer_id = int(customer_id)
+        except (TypeError, ValueError):
+            return None
+        customer = self._load()[0].get(customer_id)
+        return dict(customer) if customer else None
+
+    def id_for_name(self, nama_customer):
+        """Customer id for a name (case-insensitive) or None"""
+        return self._load()[1].get(str(nama_customer).strip().upper())
+
+    def name_by_id(self):
+        """Mapping customer_id -> nama_customer"""
+        by_id, _ = self._load()
+        return {customer_id: customer['nama_customer'] for customer_id, customer in by_id.items()}
+
+    def id_by_name(self):
+        """Mapping NAMA CUSTOMER (upper) -> customer_id"""
+        return dict(self._load()[1])
+
 class SQLiteDatabase:
     def __init__(self, db_path):
         self.db_path = db_path
+        self.customer_directory = CustomerDirectory(self)
+        self._generations = {}  # nama tabel -> generation, naik setiap ada write
+        self._generation_lock = threading.Lock()
+        self._subscribers = []  # (callback, set tabel atau None)
+        self._search_index_ready = None  # Tabel FTS5 search_index ada (None = belum dicek)
+        self.pool = ConnectionPool(
+            db_path,
+            timeout=DATABASE_CONFIG.get('timeout', 30.0),
+            cached_statements=DATABASE_CONFIG.get('cached_statements', 256),
+            pragmas=DATABASE_CONFIG.get('pragmas')
+        )
+        self._checkpoint_stop = threading.Event()
+        self._checkpoint_thread = None
         try:
             self.ensure_data_dir()
             self.init_db()
@@ -49,15 +316,141 @@ class SQLiteDatabase:
             raise DatabaseError(f"Cannot create data directory: {e}")
     
     def get_connection(self):
-        """Get database connection with error handling"""
+        """Get pooled database connection for the current thread with error handling
+
+        Koneksi di-reuse, jangan di-close oleh pemanggil. Pakai `with conn:` untuk
+        commit/rollback.
+        """
         try:
-            conn = sqlite3.connect(self.db_path, timeout=30.0)
-            conn.row_factory = sqlite3.Row  # Enable dict-like access
-            return conn
+            return self.pool.get()
         except sqlite3.Error as e:
             logger.error(f"Database connection failed: {e}")
             raise DatabaseError(f"Cannot connect to database: {e}")
+
+    def rollback(self):
+        """Rollback any open transaction on the current thread's connection"""
+        try:
+            self.get_connection().rollback()
+        except sqlite3.Error as e:
+            logger.warning(f"Rollback failed: {e}")
+
+    def close(self):
+        """Stop the checkpoint thread, checkpoint the WAL and close all pooled connections"""
+        self._checkpoint_stop.set()
+        if self._checkpoint_thread is not None:
+            self._checkpoint_thread.join(timeout=5.0)
+            self._checkpoint_thread = None
+
+        if not self.pool.size():
+            return
+
+        try:
+            self.checkpoint('TRUNCATE')
+        except DatabaseError:
+            pass
+        self.pool.close_all()
+
+    def apply_pragma_profile(self):
+        """Apply PRAGMA profile from DATABASE_CONFIG and start the periodic WAL checkpoint
+
+        Pragma di-apply oleh pool ke setiap koneksi baru; di sini hanya dicek
+        hasilnya (journal_mode bisa gagal jadi WAL, misalnya di network drive).
+        """
+        conn = self.get_connection()
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        logger.info(f"Database journal mode: {journal_mode}")
+
+        interval = DATABASE_CONFIG.get('checkpoint_interval', 0)
+        if str(journal_mode).lower() == 'wal' and interval and self._checkpoint_thread is None:
+            self._checkpoint_stop.clear()
+            self._checkpoint_thread = threading.Thread(
+                target=self._checkpoint_loop,
+                args=(interval,),
+                name="wal-checkpoint",
+                daemon=True
+            )
+            self._checkpoint_thread.start()
+
+    def checkpoint(self, mode='PASSIVE'):
+        """Run PRAGMA wal_checkpoint on the current thread's connection"""
+        try:
+            busy, log_pages, checkpointed = self.get_connection().execute(
+                f"PRAGMA wal_checkpoint({mode})"
+            ).fetchone()
+            logger.debug(f"WAL checkpoint {mode}: busy={busy}, log={log_pages}, checkpointed={checkpointed}")
+            return checkpointed
+        except sqlite3.Error as e:
+            logger.warning(f"WAL checkpoint failed: {e}")
+            raise DatabaseError(f"WAL checkpoint failed: {e}")
+
+    def _checkpoint_loop(self, interval):
+        """Background loop - checkpoint WAL secara berkala agar file -wal tidak terus membesar"""
+        try:
+            while not self._checkpoint_stop.wait(interval):
+                try:
+                    self.checkpoint('PASSIVE')
+                except DatabaseError:
+                    pass
+        finally:
+            self.pool.release()
     
+    def get_generation(self, table):
+        """Current write generation of a table (0 jika belum pernah ditulis sejak start)"""
+        return self._generations.get(table, 0)
+
+    def get_generations(self, *tables):
+        """Tuple of generations, dipakai view sebagai stamp untuk cek cache basi"""
+        return tuple(self._generations.get(table, 0) for table in tables)
+
+    def bump_generation(self, table, ids=None):
+        """Mark table as changed and notify subscribers
+
+        Dipanggil otomatis oleh execute/execute_insert/execute_many untuk query
+        INSERT/UPDATE/DELETE, dan secara eksplisit oleh method yang menulis lewat
+        cursor sendiri. ids: primary key baris yang ditambah/diubah/dihapus jika
+        diketahui, None berarti baris mana pun bisa berubah.
+
+        Callback subscriber bisa dipanggil dari worker thread (BackgroundTask),
+        jadi jangan menyentuh widget Tk di dalamnya; cukup tandai cache.
+        """
+        with self._generation_lock:
+            generation = self._generations.get(table, 0) + 1
+            self._generations[table] = generation
+            subscribers = list(self._subscribers)
+
+        if table == 'customers':
+            self.customer_directory.invalidate()
+
+        for callback, tables in subscribers:
+            if tables is not None and table not in tables:
+                continue
+            try:
+                callback(table, generation, ids)
+            except Exception as e:
+                logger.error(f"Generation subscriber failed for {table}: {e}")
+        return generation
+
+    def subscribe(self, callback, tables=None):
+        """Register callback(table, generation, ids) for writes; returns unsubscribe function
+
+        tables: iterable nama tabel yang diikuti, None untuk semua tabel
+        """
+        entry = (callback, set(tables) if tables is not None else None)
+        with self._generation_lock:
+            self._subscribers.append(entry)
+
+        def unsubscribe():
+            with self._generation_lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+        return unsubscribe
+
+    def _bump_for_query(self, query, ids=None):
+        """Bump the generation of the table written by query (jika query adalah write)"""
+        match = WRITE_QUERY_PATTERN.match(query)
+        if match:
+            self.bump_generation(match.group(1).lower(), ids)
+
     def execute(self, query, params=()):
         """Execute query and return results with error handling"""
         try:
@@ -66,7 +459,8 @@ class SQLiteDatabase:
                 cursor.execute(query, params)
                 result = cursor.fetchall()
                 logger.debug(f"Query executed successfully: {query[:50]}...")
-                return result
+            self._bump_for_query(query)
+            return result
         except sqlite3.IntegrityError as e:
             logger.error(f"Integrity constraint violation: {e}")
             raise DatabaseError(f"Data integrity error: {e}")
@@ -104,7 +498,8 @@ class SQLiteDatabase:
                 cursor.execute(query, params)
                 last_id = cursor.lastrowid
                 logger.info(f"Insert successful, ID: {last_id}")
-                return last_id
+            self._bump_for_query(query, [last_id])
+            return last_id
         except sqlite3.IntegrityError as e:
             logger.error(f"Insert failed - integrity constraint: {e}")
             raise DatabaseError(f"Data already exists or constraint violation: {e}")
@@ -123,7 +518,8 @@ class SQLiteDatabase:
                 cursor.executemany(query, params_list)
                 row_count = cursor.rowcount
                 logger.info(f"Bulk operation completed, rows affected: {row_count}")
-                return row_count
+            self._bump_for_query(query)
+            return row_count
         except sqlite3.Error as e:
             logger.error(f"Bulk operation failed: {e}")
             raise DatabaseError(f"Bulk operation error: {e}")
@@ -131,36 +527,241 @@ class SQLiteDatabase:
             logger.error(f"Unexpected error in bulk operation: {e}")
             raise DatabaseError(f"Unexpected bulk operation error: {e}")
     
+    def insert_unique_names(self, table, id_column, name_column, rows, columns=()):
+        """Insert rows whose name does not exist yet (case-insensitive) in one transaction
+
+        Dedupe dilakukan di database: INSERT ... WHERE NOT EXISTS memakai index
+        UPPER(nama) (lihat UNIQUE_NAME_INDEXES) dan ON CONFLICT DO NOTHING,
+        sehingga nama yang sudah ada maupun duplikat di dalam rows dilewati.
+
+        Args:
+            rows: list of tuple (nama, *nilai columns)
+            columns: kolom tambahan setelah kolom nama
+
+        Returns:
+            dict: {'inserted': int, 'duplicates': int, 'duplicate_indexes': [index rows yang dilewati]}
+        """
+        all_columns = (name_column, *columns)
+        placeholders = ', '.join('?' * len(all_columns))
+        query = f"""
+            INSERT INTO {table} ({', '.join(all_columns)})
+            SELECT {placeholders}
+            WHERE NOT EXISTS (SELECT 1 FROM {table} WHERE UPPER({name_column}) = UPPER(?))
+            ON CONFLICT DO NOTHING
+        """
+
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                last_id = cursor.execute(f"SELECT COALESCE(MAX({id_column}), 0) FROM {table}").fetchone()[0]
+                cursor.executemany(query, [(*row, row[0]) for row in rows])
+                inserted = cursor.rowcount
+
+                # Nama yang benar-benar ter-insert, untuk menandai baris yang dilewati
+                inserted_names = {
+                    str(name).upper() for (name,) in cursor.execute(
+                        f"SELECT {name_column} FROM {table} WHERE {id_column} > ?", (last_id,)
+                    )
+                }
+        except sqlite3.Error as e:
+            logger.error(f"Bulk insert into {table} failed: {e}")
+            raise DatabaseError(f"Bulk insert into {table} failed: {e}")
+
+        if inserted:
+            self.bump_generation(table)
+
+        duplicate_indexes = []
+        for idx, row in enumerate(rows):
+            key = str(row[0]).upper()
+            if key in inserted_names:
+                inserted_names.discard(key)  # Kemunculan berikutnya adalah duplikat
+            else:
+                duplicate_indexes.append(idx)
+
+        logger.info(f"Bulk insert into {table}: {inserted} inserted, {len(rows) - inserted} duplicates")
+        return {
+            'inserted': inserted,
+            'duplicates': len(rows) - inserted,
+            'duplicate_indexes': duplicate_indexes
+        }
+
+    # Migration berurutan: (versi, deskripsi, nama method). Versi baru ditambahkan di akhir,
+    # setiap step dijalankan sekali saja dan dicatat di tabel schema_version.
+    MIGRATIONS = [
+        (1, "Create base tables", "_migration_create_tables"),
+        (2, "Add container size pricing columns to barang", "migrate_barang_container_sizes"),
+        (3, "Create indexes for join/filter columns", "_migration_create_indexes"),
+        (4, "Create FTS5 search index for barang/customer/pengirim names", "_migration_create_search_index"),
+        (5, "Create unique upper-case name indexes for customers/pengirim", "_migration_create_unique_name_indexes"),
+    ]
+
     def init_db(self):
-        """Initialize database with required tables - Optimized"""
+        """Initialize database: apply PRAGMA profile and pending schema migrations"""
         try:
-            # Check if database already initialized (cek table users)
-            try:
-                existing = self.execute_one("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
-                if existing:
-                    logger.info("Database already initialized, skipping table creation")
-                    # Hanya insert default data jika belum ada
-                    self.insert_default_data()
-                    return
-            except:
-                pass  # Jika error, lanjutkan normal init
-
-            # Full initialization jika belum ada
-            self.create_users_table()
-            self.create_customers_table()
-            self.create_containers_table()
-            self.create_barang_table()
-            self.create_tax_table()
-            self.create_detail_container_table()
-            self.create_delivery_costs_table()
-            self.create_pengirim_table()
-            self.create_kapals_table()
+            self.apply_pragma_profile()
+            self.migrate_schema()
+            # Hanya insert default data jika belum ada
             self.insert_default_data()
-            logger.info("Database tables initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize database tables: {e}")
             raise DatabaseError(f"Table initialization failed: {e}")
-    
+
+    def get_schema_version(self):
+        """Return the latest applied migration version (0 untuk database baru)"""
+        try:
+            row = self.get_connection().execute("SELECT MAX(version) FROM schema_version").fetchone()
+            return row[0] or 0
+        except sqlite3.OperationalError:
+            # Tabel schema_version belum ada (database baru atau instalasi lama)
+            return 0
+
+    def migrate_schema(self):
+        """Run all pending migrations in a single transaction"""
+        current_version = self.get_schema_version()
+        pending = [m for m in self.MIGRATIONS if m[0] > current_version]
+        if not pending:
+            logger.info(f"Database schema up to date (version {current_version})")
+            return
+
+        conn = self.get_connection()
+        try:
+            conn.execute("BEGIN")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            for version, description, method_name in pending:
+                getattr(self, method_name)()
+                conn.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                    (version, description)
+                )
+                logger.info(f"Applied migration {version}: {description}")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Schema migration failed, rolled back to version {current_version}: {e}")
+            raise DatabaseError(f"Schema migration failed: {e}")
+
+        # Statistik baru supaya query planner langsung memakai index
+        conn.execute("ANALYZE")
+        logger.info(f"Schema migrated from version {current_version} to {pending[-1][0]}")
+
+    def _migration_create_tables(self):
+        """Migration 1 - create base tables (IF NOT EXISTS, aman untuk instalasi lama)"""
+        self.create_users_table()
+        self.create_customers_table()
+        self.create_containers_table()
+        self.create_barang_table()
+        self.create_tax_table()
+        self.create_detail_container_table()
+        self.create_delivery_costs_table()
+        self.create_pengirim_table()
+        self.create_kapals_table()
+
+    def _migration_create_indexes(self):
+        """Migration 3 - secondary indexes for join/filter columns used by the views"""
+        conn = self.get_connection()
+        for name, target in SCHEMA_INDEXES:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+    def fts5_available(self):
+        """Whether this SQLite build can create FTS5 tables"""
+        conn = self.get_connection()
+        try:
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(name)")
+            conn.execute("DROP TABLE temp.fts5_probe")
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    def has_search_index(self):
+        """Whether the FTS5 search_index table exists (tanpa itu search() memakai LIKE)"""
+        if self._search_index_ready is None:
+            row = self.get_connection().execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+            ).fetchone()
+            self._search_index_ready = row is not None
+        return self._search_index_ready
+
+    def _migration_create_search_index(self):
+        """Migration 4 - FTS5 search_index kept in sync with name columns by triggers
+
+        SQLite tanpa FTS5 melewati migration ini; search() lalu memakai LIKE.
+        """
+        self._search_index_ready = None
+        if not self.fts5_available():
+            logger.warning("SQLite build has no FTS5; skipping search_index, search() falls back to LIKE")
+            return
+
+        conn = self.get_connection()
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+                kind UNINDEXED,
+                ref_id UNINDEXED,
+                name,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+        """)
+
+        for kind, (table, id_column, name_column, code) in SEARCH_SOURCES.items():
+            rowid_new = f"NEW.{id_column} * {SEARCH_ROWID_FACTOR} + {code}"
+            rowid_old = f"OLD.{id_column} * {SEARCH_ROWID_FACTOR} + {code}"
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_search_insert AFTER INSERT ON {table}
+                BEGIN
+                    INSERT INTO search_index (rowid, kind, ref_id, name)
+                    VALUES ({rowid_new}, '{kind}', NEW.{id_column}, NEW.{name_column});
+                END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_search_update AFTER UPDATE OF {name_column} ON {table}
+                BEGIN
+                    DELETE FROM search_index WHERE rowid = {rowid_old};
+                    INSERT INTO search_index (rowid, kind, ref_id, name)
+                    VALUES ({rowid_new}, '{kind}', NEW.{id_column}, NEW.{name_column});
+                END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_search_delete AFTER DELETE ON {table}
+                BEGIN
+                    DELETE FROM search_index WHERE rowid = {rowid_old};
+                END
+            """)
+
+            # Isi index dari data yang sudah ada
+            conn.execute(f"""
+                INSERT OR REPLACE INTO search_index (rowid, kind, ref_id, name)
+                SELECT {id_column} * {SEARCH_ROWID_FACTOR} + {code}, '{kind}', {id_column}, {name_column}
+                FROM {table}
+            """)
+
+    def _migration_create_unique_name_indexes(self):
+        """Migration 5 - unique index on UPPER(name) so bulk imports dedupe inside the database
+
+        Jika data lama sudah berisi nama duplikat, index dibuat non-unique (tetap
+        mempercepat lookup) dan duplikat dicatat di log; insert_unique_names tetap
+        men-dedupe lewat NOT EXISTS.
+        """
+        conn = self.get_connection()
+        for index_name, (table, name_column) in UNIQUE_NAME_INDEXES.items():
+            duplicates = conn.execute(f"""
+                SELECT UPPER({name_column}), COUNT(*) FROM {table}
+                GROUP BY UPPER({name_column}) HAVING COUNT(*) > 1
+            """).fetchall()
+            if duplicates:
+                logger.warning(
+                    f"{table} has {len(duplicates)} duplicate names (e.g. {duplicates[0][0]!r}); "
+                    f"creating non-unique {index_name}"
+                )
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table}(UPPER({name_column}))")
+            else:
+                conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {table}(UPPER({name_column}))")
+
     def create_users_table(self):
         """Create users table with error handling"""
         query = '''
@@ -178,7 +779,7 @@ class SQLiteDatabase:
         )
         '''
         try:
-            self.execute(query)
+            self.get_connection().execute(query)
             logger.info("Users table created successfully")
         except Exception as e:
             logger.error(f"Failed to create users table: {e}")
@@ -196,7 +797,7 @@ class SQLiteDatabase:
         )
         '''
         try:
-            self.execute(query)
+            self.get_connection().execute(query)
             logger.info("Customers table created successfully")
         except Exception as e:
             logger.error(f"Failed to create customers table: {e}")
@@ -219,7 +820,7 @@ class SQLiteDatabase:
         )
         '''
         try:
-            self.execute(query)
+            self.get_connection().execute(query)
             logger.info("Kapals table created successfully")
         except Exception as e:
             logger.error(f"Failed to create kapals table: {e}")
@@ -242,7 +843,7 @@ class SQLiteDatabase:
         )
         '''
         try:
-            self.execute(query)
+            self.get_connection().execute(query)
             logger.info("Containers table created successfully")
         except Exception as e:
             logger.error(f"Failed to create containers table: {e}")
@@ -289,39 +890,32 @@ class SQLiteDatabase:
         )
         '''
         try:
-            self.execute(query)
+            self.get_connection().execute(query)
             logger.info("Barang table created successfully")
-            self.migrate_barang_container_sizes()
         except Exception as e:
             logger.error(f"Failed to create barang table: {e}")
             raise
 
     def migrate_barang_container_sizes(self):
-        """Add container size-specific columns if they don't exist"""
-        try:
-            # Check if new columns exist
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("PRAGMA table_info(barang)")
-                columns = [row[1] for row in cursor.fetchall()]
+        """Migration 2 - add container size-specific columns if they don't exist"""
+        # Hanya dijalankan sekali dari migrate_schema, jadi probe table_info di sini tidak
+        # terjadi lagi pada database yang sudah up to date
+        conn = self.get_connection()
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(barang)").fetchall()]
 
-                # Add new columns if they don't exist
-                new_columns = [
-                    'container_20_pp', 'container_20_pd', 'container_20_dd',
-                    'container_21_pp', 'container_21_pd', 'container_21_dd',
-                    'container_40hc_pp', 'container_40hc_pd', 'container_40hc_dd'
-                ]
+        new_columns = [
+            'container_20_pp', 'container_20_pd', 'container_20_dd',
+            'container_21_pp', 'container_21_pd', 'container_21_dd',
+            'container_40hc_pp', 'container_40hc_pd', 'container_40hc_dd'
+        ]
 
-                for col in new_columns:
-                    if col not in columns:
-                        cursor.execute(f"ALTER TABLE barang ADD COLUMN {col} REAL")
-                        logger.info(f"Added column {col} to barang table")
+        for col in new_columns:
+            if col not in columns:
+                conn.execute(f"ALTER TABLE barang ADD COLUMN {col} REAL")
+                logger.info(f"Added column {col} to barang table")
+
+        logger.info("Container size migration completed successfully")
 
-                conn.commit()
-                logger.info("Container size migration completed successfully")
-        except Exception as e:
-            logger.warning(f"Migration warning (may be harmless): {e}")  
-        
     def create_tax_table(self):
         """Create tax management table for tracking tax calculations"""
         query = '''
@@ -342,7 +936,7 @@ class SQLiteDatabase:
         )
         '''
         try:
-            self.execute(query)
+            self.get_connection().execute(query)
             logger.info("Tax table created successfully")
         except Exception as e:
             logger.error(f"Failed to create tax table: {e}")
@@ -439,7 +1033,7 @@ class SQLiteDatabase:
         )
         '''
         try:
-            self.execute(query)
+            self.get_connection().execute(query)
             print("[OK] Detail container table created/updated successfully")
         except Exception as e:
             print(f"[ERROR] Failed to create detail container table: {e}")
@@ -449,7 +1043,7 @@ class SQLiteDatabase:
     def create_delivery_costs_table(self):
         """Buat tabel untuk biaya pengantaran jika belum ada"""
         
-        self.execute("""
+        self.get_connection().execute("""
             CREATE TABLE IF NOT EXISTS container_delivery_costs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 container_id INTEGER NOT NULL,
@@ -473,7 +1067,7 @@ class SQLiteDatabase:
         )
         '''
         try:
-            self.execute(query)
+            self.get_connection().execute(query)
             logger.info("Pengirim table created successfully")
         except Exception as e:
             logger.error(f"Failed to create pengirim table: {e}")
@@ -507,6 +1101,13 @@ class SQLiteDatabase:
             print(f"Database error: {e}")
             return False
 
+    def bulk_upsert_senders(self, names):
+        """Insert sender names that do not exist yet (case-insensitive) in one transaction
+
+        Returns dict {'inserted', 'duplicates', 'duplicate_indexes'} - lihat insert_unique_names
+        """
+        return self.insert_unique_names('pengirim', 'pengirim_id', 'nama_pengirim', [(name,) for name in names])
+
     def get_container_delivery_total(self, container_id):
         """Mendapatkan total biaya pengantaran untuk container tertentu"""
         return self.execute("""
@@ -718,11 +1319,23 @@ class CustomerDatabase(SQLiteDatabase):
             logger.error(f"Failed to create customer {nama_customer}: {e}")
             raise DatabaseError(f"Failed to create customer: {e}")
     
+    def bulk_upsert_customers(self, customers):
+        """Insert customers whose name does not exist yet (case-insensitive) in one transaction
+
+        Args:
+            customers: list of tuple (nama_customer, alamat_customer)
+
+        Returns dict {'inserted', 'duplicates', 'duplicate_indexes'} - lihat insert_unique_names
+        """
+        rows = [(nama, alamat or '') for nama, alamat in customers if nama]
+        if len(rows) != len(customers):
+            raise ValueError("Customer name is required")
+        return self.insert_unique_names('customers', 'customer_id', 'nama_customer', rows, ('alamat_customer',))
+
     def get_all_customers(self):
-        """Get all customers with error handling"""
+        """Get all customers with error handling (dari customer_directory)"""
         try:
-            customers = self.execute("SELECT * FROM customers ORDER BY customer_id")
-            return [dict(customer) for customer in customers]
+            return self.customer_directory.customers()
         except Exception as e:
             logger.error(f"Failed to get all customers: {e}")
             raise DatabaseError(f"Failed to retrieve customers: {e}")
@@ -733,40 +1346,42 @@ class CustomerDatabase(SQLiteDatabase):
             raise ValueError("Customer ID is required")
         
         try:
-            customer = self.execute_one(
-                "SELECT * FROM customers WHERE customer_id = ?", 
-                (customer_id,)
-            )
-            return dict(customer) if customer else None
+            return self.customer_directory.get(customer_id)
         except Exception as e:
             logger.error(f"Failed to get customer ID {customer_id}: {e}")
             raise DatabaseError(f"Failed to retrieve customer: {e}")
         
     def get_customer_id_by_name(self, nama_customer):
-        """Get customer ID by name with error handling - returns int, not sqlite3.Row"""
+        """Get customer ID by exact name with error handling - returns int or None"""
         if not nama_customer:
             raise ValueError("Customer name is required")
         try:
-            customer = self.execute_one(
-                "SELECT customer_id FROM customers WHERE nama_customer = ?",
-                (nama_customer,)
-            )
-            
-            if customer:
-                # Extract the actual integer value from sqlite3.Row
-                if hasattr(customer, '__getitem__'):  # Check if it's a Row object
-                    customer_id = customer['customer_id']  # or customer[0]
-                else:
-                    customer_id = customer
-                
-                return int(customer_id) if customer_id is not None else None
-            else:
-                return None  # Customer not found
-                
+            customer_id = self.customer_directory.id_for_name(nama_customer)
+            customer = self.customer_directory.get(customer_id) if customer_id is not None else None
+            # Sama seperti query lama (nama_customer = ?): beda huruf besar/kecil dianggap tidak ada
+            if customer and customer['nama_customer'] == nama_customer:
+                return customer_id
+            return None
         except Exception as e:
             logger.error(f"Failed to get customer ID by name {nama_customer}: {e}")
             raise DatabaseError(f"Failed to retrieve customer ID: {e}")
 
+    def get_customer_name_map(self):
+        """Mapping NAMA CUSTOMER (upper) -> customer_id untuk resolusi nama saat import"""
+        try:
+            return self.customer_directory.id_by_name()
+        except Exception as e:
+            logger.error(f"Failed to get customer name map: {e}")
+            raise DatabaseError(f"Failed to retrieve customers: {e}")
+
+    def get_customer_names(self):
+        """Mapping customer_id -> nama_customer"""
+        try:
+            return self.customer_directory.name_by_id()
+        except Exception as e:
+            logger.error(f"Failed to get customer names: {e}")
+            raise DatabaseError(f"Failed to retrieve customers: {e}")
+
     def update_customer(self, customer_id, nama_customer=None, alamat_customer=None):
         """Update customer with error handling"""
         if not customer_id:
@@ -912,7 +1527,7 @@ class BarangDatabase(SQLiteDatabase):
             logger.error(f"Failed to create barang {nama_barang}: {e}")
             raise DatabaseError(f"Failed to create barang: {e}")
 
-    def create_barang_batch(self, barang_list):
+    def create_barang_batch(self, barang_list, cancel_event=None, progress_callback=None):
         """
         Create multiple barang in a single transaction for better performance.
 
@@ -922,6 +1537,10 @@ class BarangDatabase(SQLiteDatabase):
                     'pengirim': int, 'penerima': int, 'nama_barang': str,
                     'panjang_barang': float, 'lebar_barang': float, etc.
                 }
+            cancel_event: threading.Event opsional; jika di-set, seluruh batch
+                di-rollback dan OperationCancelled di-raise
+            progress_callback: callable(done, total) opsional, dipanggil setiap
+                BATCH_PROGRESS_INTERVAL baris
 
         Returns:
             dict: {
@@ -947,57 +1566,21 @@ class BarangDatabase(SQLiteDatabase):
             cursor = conn.cursor()
 
             try:
+                total = len(barang_list)
                 for idx, barang_data in enumerate(barang_list):
+                    if idx % BATCH_PROGRESS_INTERVAL == 0:
+                        if cancel_event is not None and cancel_event.is_set():
+                            raise OperationCancelled(f"Batch insert cancelled after {idx} of {total} items")
+                        if progress_callback:
+                            progress_callback(idx, total)
+
                     try:
                         # Validate required fields
                         if not barang_data.get('pengirim') or not barang_data.get('penerima') or not barang_data.get('nama_barang'):
                             raise ValueError("Pengirim, Penerima, and Nama Barang are required")
 
                         # Insert barang
-                        cursor.execute('''
-                            INSERT INTO barang (pengirim, penerima, nama_barang,
-                                            panjang_barang, lebar_barang, tinggi_barang, m3_barang, ton_barang, container_barang,
-                                            m3_pp, m3_pd, m3_dd, ton_pp, ton_pd, ton_dd,
-                                            col_pp, col_pd, col_dd,
-                                            container_pp, container_pd, container_dd,
-                                            container_20_pp, container_20_pd, container_20_dd,
-                                            container_21_pp, container_21_pd, container_21_dd,
-                                            container_40hc_pp, container_40hc_pd, container_40hc_dd,
-                                            pajak)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (
-                            barang_data.get('pengirim'),
-                            barang_data.get('penerima'),
-                            barang_data.get('nama_barang'),
-                            barang_data.get('panjang_barang'),
-                            barang_data.get('lebar_barang'),
-                            barang_data.get('tinggi_barang'),
-                            barang_data.get('m3_barang'),
-                            barang_data.get('ton_barang'),
-                            barang_data.get('container_barang'),
-                            barang_data.get('m3_pp'),
-                            barang_data.get('m3_pd'),
-                            barang_data.get('m3_dd'),
-                            barang_data.get('ton_pp'),
-                            barang_data.get('ton_pd'),
-                            barang_data.get('ton_dd'),
-                            barang_data.get('col_pp'),
-                            barang_data.get('col_pd'),
-                            barang_data.get('col_dd'),
-                            barang_data.get('container_pp'),
-                            barang_data.get('container_pd'),
-                            barang_data.get('container_dd'),
-                            barang_data.get('container_20_pp'),
-                            barang_data.get('container_20_pd'),
-                            barang_data.get('container_20_dd'),
-                            barang_data.get('container_21_pp'),
-                            barang_data.get('container_21_pd'),
-                            barang_data.get('container_21_dd'),
-                            barang_data.get('container_40hc_pp'),
-                            barang_data.get('container_40hc_pd'),
-                            barang_data.get('container_40hc_dd'),
-                            barang_data.get('pajak')
-                        ))
+                        cursor.execute(BARANG_INSERT_SQL, self._barang_insert_params(barang_data))
 
                         barang_id = cursor.lastrowid
                         result['created_ids'].append(barang_id)
@@ -1013,27 +1596,187 @@ class BarangDatabase(SQLiteDatabase):
                         })
                         logger.warning(f"Failed to insert barang at index {idx}: {str(e)}")
 
+                if cancel_event is not None and cancel_event.is_set():
+                    raise OperationCancelled(f"Batch insert cancelled before commit ({total} items)")
+
                 # Commit all successful inserts in one transaction
                 conn.commit()
+                if result['created_ids']:
+                    self.bump_generation('barang', result['created_ids'])
+                if progress_callback:
+                    progress_callback(total, total)
                 logger.info(f"Batch insert completed: {result['success_count']} success, {result['failed_count']} failed")
 
+            except OperationCancelled:
+                conn.rollback()
+                logger.info("Batch insert cancelled, transaction rolled back")
+                raise
+
             except Exception as e:
                 # Rollback on transaction-level error
                 conn.rollback()
                 logger.error(f"Batch insert transaction failed, rolling back: {e}")
                 raise DatabaseError(f"Batch insert transaction failed: {e}")
 
-            finally:
-                conn.close()
-
             return result
 
+        except OperationCancelled:
+            raise
+
         except Exception as e:
             logger.error(f"Batch insert failed: {e}")
             raise DatabaseError(f"Failed to batch insert barang: {e}")
 
+    @staticmethod
+    def _barang_insert_params(barang_data):
+        """Parameter tuple for BARANG_INSERT_SQL from a barang dict"""
+        return tuple(barang_data.get(column) for column in BARANG_INSERT_COLUMNS)
+
+    def create_barang_chunks(self, chunks, total=None, cancel_event=None, progress_callback=None):
+        """
+        Insert barang from an iterable of chunks (list of dict per chunk) as one atomic import.
+
+        Dipakai untuk import file besar: chunk bisa berasal dari generator sehingga
+        seluruh file tidak perlu ada di memori. Setiap chunk ditulis ke tabel TEMP
+        barang_import (database temp milik koneksi ini, tidak mengunci app.db), jadi
+        window lain tetap bisa menulis selama file dibaca dan tidak melihat baris
+        setengah jadi. Setelah chunk terakhir, semua baris dipindahkan ke barang
+        dalam satu transaksi; jika statement itu gagal, baris diulang satu per satu
+        agar baris yang bermasalah bisa dilaporkan. Cancel atau error sebelum
+        publish tidak menyisakan satu baris pun di barang.
+
+        Args:
+            chunks: iterable of list of dict (format sama dengan create_barang_batch)
+            total: jumlah baris total (opsional, hanya untuk progress_callback)
+            cancel_event: threading.Event opsional; dicek setiap chunk, staging dibuang
+                dan OperationCancelled di-raise jika di-set
+            progress_callback: callable(done, total) opsional, dipanggil setiap chunk
+
+        Returns:
+            dict: {
+                'success_count': int,
+                'failed_count': int,
+                'created_ids': [int, ...],
+                'errors': [{'index': int, 'nama_barang': str, 'error': str, 'data': dict}, ...]
+            }
+        """
+        result = {
+            'success_count': 0,
+            'failed_count': 0,
+            'created_ids': [],
+            'errors': []
+        }
+
+        def record_error(index, barang_data, error):
+            result['failed_count'] += 1
+            result['errors'].append({
+                'index': index,
+                'nama_barang': barang_data.get('nama_barang', 'Unknown'),
+                'error': str(error),
+                'data': barang_data
+            })
+            logger.warning(f"Failed to insert barang at index {index}: {error}")
+
+        conn = self.get_connection()
+        try:
+            conn.execute("DROP TABLE IF EXISTS temp.barang_import")
+            conn.execute(
+                f"CREATE TEMP TABLE barang_import (row_index INTEGER PRIMARY KEY, "
+                f"{', '.join(BARANG_IMPORT_COLUMNS)})"
+            )
+            staging_sql = (
+                f"INSERT INTO temp.barang_import (row_index, {', '.join(BARANG_IMPORT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (len(BARANG_IMPORT_COLUMNS) + 1))})"
+            )
+
+            offset = 0
+            for chunk in chunks:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise OperationCancelled(f"Batch insert cancelled after {offset} items")
+
+                rows = []
+                for idx, barang_data in enumerate(chunk, start=offset):
+                    if not barang_data.get('pengirim') or not barang_data.get('penerima') or not barang_data.get('nama_barang'):
+                        record_error(idx, barang_data, "Pengirim, Penerima, and Nama Barang are required")
+                    else:
+                        rows.append((idx, *(barang_data.get(column) for column in BARANG_IMPORT_COLUMNS)))
+                conn.executemany(staging_sql, rows)
+                conn.commit()  # Hanya database temp yang ditulis
+
+                offset += len(chunk)
+                if progress_callback:
+                    progress_callback(offset, total)
+
+            if cancel_event is not None and cancel_event.is_set():
+                raise OperationCancelled(f"Batch insert cancelled after {offset} items")
+
+            result['created_ids'] = self._publish_barang_import(conn, record_error)
+            result['success_count'] = len(result['created_ids'])
+            logger.info(f"Chunked insert completed: {result['success_count']} success, {result['failed_count']} failed")
+            return result
+
+        except OperationCancelled:
+            conn.rollback()
+            logger.info("Chunked insert cancelled, staged rows discarded")
+            raise
+
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Chunked insert failed, nothing published: {e}")
+            raise DatabaseError(f"Failed to batch insert barang: {e}")
+
+        finally:
+            try:
+                conn.execute("DROP TABLE IF EXISTS temp.barang_import")
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to drop barang import staging table: {e}")
+
+    def _publish_barang_import(self, conn, record_error):
+        """Move staged temp.barang_import rows into barang in one transaction; return new barang_ids"""
+        columns = ', '.join(BARANG_INSERT_COLUMNS)
+        cursor = conn.cursor()
+        try:
+            # IMMEDIATE: write lock diambil di awal, id > last_id pasti milik import ini
+            cursor.execute("BEGIN IMMEDIATE")
+            last_id = cursor.execute("SELECT COALESCE(MAX(barang_id), 0) FROM barang").fetchone()[0]
+
+            cursor.execute("SAVEPOINT barang_import")
+            try:
+                cursor.execute(f"INSERT INTO barang ({columns}) "
+                               f"SELECT {columns} FROM temp.barang_import ORDER BY row_index")
+            except sqlite3.Error:
+                # Ulang per baris untuk menemukan baris yang gagal
+                cursor.execute("ROLLBACK TO SAVEPOINT barang_import")
+                staged = conn.execute(f"SELECT row_index, {', '.join(BARANG_IMPORT_COLUMNS)} "
+                                      f"FROM temp.barang_import ORDER BY row_index")
+                for idx, *values in staged:
+                    barang_data = dict(zip(BARANG_IMPORT_COLUMNS, values))
+                    try:
+                        cursor.execute(BARANG_INSERT_SQL, self._barang_insert_params(barang_data))
+                    except sqlite3.Error as e:
+                        record_error(idx, barang_data, e)
+            cursor.execute("RELEASE SAVEPOINT barang_import")
+
+            created_ids = [row[0] for row in cursor.execute(
+                "SELECT barang_id FROM barang WHERE barang_id > ? ORDER BY barang_id", (last_id,)
+            )]
+            conn.commit()
+
+        except Exception:
+            conn.rollback()
+            raise
+
+        if created_ids:
+            self.bump_generation('barang', created_ids)
+        return created_ids
+
     def update_barang(self, barang_data):
-        """Update existing barang with error handling"""
+        """Update existing barang with error handling
+
+        Returns:
+            dict: record barang setelah update (format get_barang_by_id), supaya
+            view bisa memperbarui satu baris tanpa memuat ulang seluruh daftar
+        """
         if not barang_data or not barang_data.get('barang_id'):
             raise ValueError("Barang data and ID are required")
 
@@ -1088,6 +1831,8 @@ class BarangDatabase(SQLiteDatabase):
                     raise ValueError(f"Gagal mengupdate barang ID {barang_data['barang_id']} - data tidak ditemukan")
 
             logger.info(f"Barang updated successfully: ID {barang_data['barang_id']}")
+            self.bump_generation('barang', [barang_data['barang_id']])
+            return self.get_barang_by_id(barang_data['barang_id'])
 
         except ValueError:
             # Re-raise ValueError tanpa wrap ke DatabaseError
@@ -1097,7 +1842,7 @@ class BarangDatabase(SQLiteDatabase):
             raise DatabaseError(f"Failed to update barang: {e}")
     
     def delete_barang(self, barang_id):
-        """Delete barang with error handling"""
+        """Delete barang with error handling; returns the deleted barang_id"""
         if not barang_id:
             raise ValueError("Barang ID is required")
     
@@ -1113,6 +1858,8 @@ class BarangDatabase(SQLiteDatabase):
                     raise ValueError(f"Barang dengan ID {barang_id} tidak ditemukan")
         
             logger.info(f"Barang deleted successfully: ID {barang_id}")
+            self.bump_generation('barang', [barang_id])
+            return barang_id
         
         except ValueError:
             # Re-raise ValueError agar bisa ditangani di GUI
@@ -1165,6 +1912,253 @@ class BarangDatabase(SQLiteDatabase):
             logger.error(f"Failed to get all barang: {e}")
             raise DatabaseError(f"Failed to retrieve barang: {e}")
     
+    @staticmethod
+    def _like_pattern(text):
+        """Build a LIKE '%text%' pattern with % and _ escaped"""
+        escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return f"%{escaped}%"
+
+    def _barang_filter_clause(self, filters):
+        """Build WHERE clause for barang list filters
+
+        filters: dict dengan key opsional 'nama' (semua kata harus ada),
+        'pengirim' dan 'penerima' (substring nama customer).
+        """
+        conditions = []
+        params = []
+        filters = filters or {}
+
+        for term in str(filters.get('nama') or '').split():
+            conditions.append("b.nama_barang LIKE ? ESCAPE '\\'")
+            params.append(self._like_pattern(term))
+
+        for key, column in (('pengirim', 's.nama_customer'), ('penerima', 'r.nama_customer')):
+            value = str(filters.get(key) or '').strip()
+            if value:
+                conditions.append(f"{column} LIKE ? ESCAPE '\\'")
+                params.append(self._like_pattern(value))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return where, params
+
+    def count_barang(self, filters=None):
+        """Count barang matching list filters"""
+        try:
+            where, params = self._barang_filter_clause(filters)
+            row = self.execute_one(f'''
+                SELECT COUNT(*)
+                FROM barang b
+                LEFT JOIN customers r ON b.penerima = r.customer_id
+                LEFT JOIN customers s ON b.pengirim = s.customer_id
+                {where}
+            ''', params)
+            return row[0] if row else 0
+
+        except Exception as e:
+            logger.error(f"Failed to count barang: {e}")
+            raise DatabaseError(f"Failed to count barang: {e}")
+
+    @staticmethod
+    def _barang_order_by(sort):
+        """ORDER BY clause for sort (kolom, descending); default barang_id ASC"""
+        if sort and sort[0] in BARANG_SORT_COLUMNS:
+            direction = 'DESC' if sort[1] else 'ASC'
+            column = BARANG_SORT_COLUMNS[sort[0]]
+            # Nilai kosong selalu di akhir, sama seperti sorting di PaginatedTreeView
+            return f"{column} IS NULL, {column} {direction}, b.barang_id {direction}"
+        return 'b.barang_id ASC'
+
+    def get_barang_page(self, offset, limit, sort=None, filters=None):
+        """Get one page of barang with customer info (LIMIT/OFFSET)
+
+        sort: (kolom, descending) dengan kolom dari BARANG_SORT_COLUMNS, default barang_id ASC.
+        """
+        try:
+            where, params = self._barang_filter_clause(filters)
+            order_by = self._barang_order_by(sort)
+
+            barang_list = self.execute(f'''
+                SELECT 
+                    b.*,
+                    s.nama_customer AS sender_name,
+                    r.nama_customer AS receiver_name,
+                    r.alamat_customer AS receiver_address
+                FROM barang b
+                LEFT JOIN customers r ON b.penerima = r.customer_id
+                LEFT JOIN customers s ON b.pengirim = s.customer_id
+                {where}
+                ORDER BY {order_by}
+                LIMIT ? OFFSET ?
+            ''', (*params, int(limit), int(offset)))
+
+            return [dict(barang) for barang in barang_list]
+
+        except Exception as e:
+            logger.error(f"Failed to get barang page: {e}")
+            raise DatabaseError(f"Failed to retrieve barang: {e}")
+
+    def get_barang_sorted_ids(self, sort=None):
+        """All barang_id in list order for sort (sama dengan ORDER BY get_barang_page)
+
+        Dipakai bersama hasil index pencarian in-memory: halaman yang di-sort
+        diambil dari id hasil filter index dalam urutan ini.
+        """
+        try:
+            rows = self.execute(f'''
+                SELECT b.barang_id
+                FROM barang b
+                LEFT JOIN customers r ON b.penerima = r.customer_id
+                LEFT JOIN customers s ON b.pengirim = s.customer_id
+                ORDER BY {self._barang_order_by(sort)}
+            ''')
+            return [row[0] for row in rows]
+
+        except Exception as e:
+            logger.error(f"Failed to get sorted barang ids: {e}")
+            raise DatabaseError(f"Failed to retrieve barang: {e}")
+
+    @staticmethod
+    def _fts_prefix_query(text):
+        """Turn user input into an FTS5 query: every word must match as a prefix"""
+        terms = [term for term in re.split(r'\W+', str(text or '').lower()) if term]
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def search(self, text, kinds=None, limit=50):
+        """Full-text prefix search over barang, customer and pengirim names
+
+        Hasil diurutkan berdasarkan relevansi (bm25), nama yang sama per kind
+        digabung. Return: list dict {'kind', 'ref_id', 'name'}.
+        """
+        match = self._fts_prefix_query(text)
+        if not match:
+            return []
+
+        kinds = list(kinds or SEARCH_SOURCES.keys())
+        if not self.has_search_index():
+            return self._search_like(text, kinds, limit)
+
+        placeholders = ','.join('?' for _ in kinds)
+        try:
+            rows = self.execute(f"""
+                SELECT kind, MIN(ref_id) AS ref_id, name, MIN(rank) AS score
+                FROM search_index
+                WHERE search_index MATCH ? AND kind IN ({placeholders})
+                GROUP BY kind, name
+                ORDER BY score, name
+                LIMIT ?
+            """, (match, *kinds, int(limit)))
+            return [{'kind': row['kind'], 'ref_id': row['ref_id'], 'name': row['name']} for row in rows]
+
+        except Exception as e:
+            logger.error(f"Failed to search '{text}': {e}")
+            raise DatabaseError(f"Search failed: {e}")
+
+    def _search_like(self, text, kinds, limit):
+        """search() fallback without FTS5: every word must start a word in the name (LIKE)"""
+        terms = [term for term in re.split(r'\W+', str(text or '').lower()) if term]
+        selects = []
+        params = []
+        for kind in kinds:
+            if kind not in SEARCH_SOURCES:
+                continue
+            table, id_column, name_column, _ = SEARCH_SOURCES[kind]
+            conditions = ' AND '.join(f"(' ' || {name_column}) LIKE ? ESCAPE '\\'" for _ in terms)
+            selects.append(f"""
+                SELECT '{kind}' AS kind, MIN({id_column}) AS ref_id, {name_column} AS name
+                FROM {table}
+                WHERE {conditions}
+                GROUP BY {name_column}
+            """)
+            params.extend(self._like_pattern(f" {term}") for term in terms)
+        if not selects:
+            return []
+
+        try:
+            # Nama yang diawali kata pertama lebih relevan, lalu nama terpendek
+            rows = self.execute(f"""
+                SELECT kind, ref_id, name FROM ({' UNION ALL '.join(selects)})
+                ORDER BY name LIKE ? ESCAPE '\\' DESC, LENGTH(name), name
+                LIMIT ?
+            """, (*params, self._like_pattern(terms[0])[1:], int(limit)))
+            return [{'kind': row['kind'], 'ref_id': row['ref_id'], 'name': row['name']} for row in rows]
+
+        except Exception as e:
+            logger.error(f"Failed to search '{text}': {e}")
+            raise DatabaseError(f"Search failed: {e}")
+
+    def search_names(self, text, kind, limit=100):
+        """Names of one kind matching text, most relevant first (untuk autocomplete combobox)"""
+        return [result['name'] for result in self.search(text, kinds=(kind,), limit=limit)]
+
+    def get_barang_search_rows(self):
+        """Get slim barang rows (id, nama, pengirim/penerima id dan nama) for search indexing"""
+        try:
+            rows = self.execute('''
+                SELECT 
+                    b.barang_id,
+                    b.nama_barang,
+                    b.pengirim,
+                    b.penerima,
+                    s.nama_customer AS sender_name,
+                    r.nama_customer AS receiver_name
+                FROM barang b
+                LEFT JOIN customers r ON b.penerima = r.customer_id
+                LEFT JOIN customers s ON b.pengirim = s.customer_id
+                ORDER BY b.barang_id ASC
+            ''')
+            return [tuple(row) for row in rows]
+
+        except Exception as e:
+            logger.error(f"Failed to get barang search rows: {e}")
+            raise DatabaseError(f"Failed to retrieve barang: {e}")
+
+    def get_barang_by_ids(self, barang_ids):
+        """Get barang with customer info for the given ids, in the given order"""
+        try:
+            barang_ids = list(barang_ids)
+            records = {}
+            for start in range(0, len(barang_ids), SQL_PARAM_CHUNK):
+                chunk = barang_ids[start:start + SQL_PARAM_CHUNK]
+                placeholders = ','.join('?' for _ in chunk)
+                for barang in self.execute(f'''
+                    SELECT 
+                        b.*,
+                        s.nama_customer AS sender_name,
+                        r.nama_customer AS receiver_name,
+                        r.alamat_customer AS receiver_address
+                    FROM barang b
+                    LEFT JOIN customers r ON b.penerima = r.customer_id
+                    LEFT JOIN customers s ON b.pengirim = s.customer_id
+                    WHERE b.barang_id IN ({placeholders})
+                ''', chunk):
+                    records[barang['barang_id']] = dict(barang)
+
+            return [records[barang_id] for barang_id in barang_ids if barang_id in records]
+
+        except Exception as e:
+            logger.error(f"Failed to get barang by ids: {e}")
+            raise DatabaseError(f"Failed to retrieve barang: {e}")
+
+    def get_barang_by_id(self, barang_id):
+        """Get single barang with customer info"""
+        try:
+            barang = self.execute_one('''
+                SELECT 
+                    b.*,
+                    s.nama_customer AS sender_name,
+                    r.nama_customer AS receiver_name,
+                    r.alamat_customer AS receiver_address
+                FROM barang b
+                LEFT JOIN customers r ON b.penerima = r.customer_id
+                LEFT JOIN customers s ON b.pengirim = s.customer_id
+                WHERE b.barang_id = ?
+            ''', (barang_id,))
+            return dict(barang) if barang else None
+
+        except Exception as e:
+            logger.error(f"Failed to get barang {barang_id}: {e}")
+            raise DatabaseError(f"Failed to retrieve barang: {e}")
+
     def assign_barang_to_container(self, barang_id, container_id, satuan, door_type, colli_amount, harga_per_unit, total_harga):
         """Assign barang to container with pricing and tax handling"""
         try:
@@ -1230,6 +2224,10 @@ class AppDatabase(UserDatabase, CustomerDatabase, ContainerDatabase, BarangDatab
     _instance = None
     _initialized = False
 
+    # State untuk _next_assigned_at (assigned_at dipakai sebagai identitas baris di UI)
+    _assigned_at_lock = threading.Lock()
+    _last_assigned_at = None
+
     def __new__(cls, db_path="data/app.db"):
         """Singleton pattern - reuse satu instance untuk performa lebih baik"""
         if cls._instance is None:
@@ -1244,6 +2242,7 @@ class AppDatabase(UserDatabase, CustomerDatabase, ContainerDatabase, BarangDatab
         try:
             super().__init__(db_path)
             AppDatabase._initialized = True
+            atexit.register(self.close)
             logger.info("AppDatabase initialized successfully (singleton)")
         except Exception as e:
             logger.error(f"Failed to initialize AppDatabase: {e}")
@@ -1287,33 +2286,10 @@ class AppDatabase(UserDatabase, CustomerDatabase, ContainerDatabase, BarangDatab
                                         colli_amount, harga_per_unit, total_harga, tanggal):
         """Assign barang to container with complete pricing data, tax handling, and unique timestamp"""
         try:
-            from datetime import datetime
-            import time
-            
             # ============================================
-            # STEP 1: Generate Unique Timestamp
+            # STEP 1: Generate Unique Timestamp (monotonic, tanpa probe ke database)
             # ============================================
-            base_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            assigned_at = base_timestamp
-            
-            counter = 0
-            while True:
-                existing = self.execute_one("""
-                    SELECT id FROM detail_container 
-                    WHERE barang_id = ? AND container_id = ? AND assigned_at = ?
-                """, (barang_id, container_id, assigned_at))
-                
-                if not existing:
-                    break
-                
-                counter += 1
-                assigned_at = f"{base_timestamp}.{counter:03d}"
-                
-                if counter > 999:
-                    time.sleep(1)
-                    base_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    assigned_at = base_timestamp
-                    counter = 0
+            assigned_at = self._next_assigned_at()
             
             # ============================================
             # STEP 2: Validate Tanggal Format
@@ -1422,6 +2398,192 @@ class AppDatabase(UserDatabase, CustomerDatabase, ContainerDatabase, BarangDatab
             print(f"{'='*60}\n")
             return False
 
+    def assign_barang_batch(self, container_id, items):
+        """
+        Assign many barang to a container in a single transaction.
+
+        Args:
+            container_id: Target container
+            items: List of dicts:
+                {
+                    'barang_id': int, 'satuan': str, 'door_type': str, 'colli_amount': int,
+                    'harga_per_unit': float, 'total_harga': float, 'tanggal': 'YYYY-MM-DD'
+                }
+
+        Returns:
+            dict: {
+                'success_count': int,
+                'failed_count': int,
+                'assigned_ids': [barang_id, ...],
+                'errors': [{'index': int, 'barang_id': int, 'error': str}, ...],
+                'tax_count': int,
+                'total_ppn': float,
+                'total_pph23': float,
+                'total_tax': float
+            }
+        """
+        if not items:
+            raise ValueError("Items list cannot be empty")
+
+        result = {
+            'success_count': 0,
+            'failed_count': 0,
+            'assigned_ids': [],
+            'errors': [],
+            'tax_count': 0,
+            'total_ppn': 0,
+            'total_pph23': 0,
+            'total_tax': 0
+        }
+
+        # Info pajak + nama penerima untuk semua barang sekaligus
+        barang_info = self._get_barang_tax_info({item['barang_id'] for item in items})
+
+        default_tanggal = datetime.now().strftime('%Y-%m-%d')
+        detail_rows = []  # (item, tax_row or None)
+        for idx, item in enumerate(items):
+            info = barang_info.get(item['barang_id'])
+            if info is None:
+                result['failed_count'] += 1
+                result['errors'].append({
+                    'index': idx,
+                    'barang_id': item['barang_id'],
+                    'error': f"Barang dengan ID {item['barang_id']} tidak ditemukan"
+                })
+                continue
+
+            tax_row = None
+            if info['pajak'] == 1:
+                total_harga = item['total_harga']
+                ppn_amount = total_harga * PPN_RATE
+                pph23_amount = total_harga * PPH23_RATE
+                tax_row = (
+                    container_id, item['barang_id'], info['receiver_name'], total_harga,
+                    PPN_RATE, PPH23_RATE, ppn_amount, pph23_amount, ppn_amount + pph23_amount
+                )
+            detail_rows.append((item, tax_row))
+
+        if not detail_rows:
+            return result
+
+        conn = self.get_connection()
+        try:
+            # IMMEDIATE: kunci write dari awal, semua insert dalam satu transaksi
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.cursor()
+
+            insert_rows = []
+            for item, tax_row in detail_rows:
+                tax_id = None
+                if tax_row:
+                    # Insert per baris supaya tax_id diambil dari lastrowid, bukan ditebak berurutan
+                    cursor.execute(BARANG_TAX_INSERT_SQL, tax_row)
+                    tax_id = cursor.lastrowid
+                assigned_at = self._next_assigned_at()
+                insert_rows.append((
+                    item['barang_id'], container_id, tax_id, item['satuan'], item['door_type'],
+                    item['colli_amount'], item['harga_per_unit'], item['total_harga'],
+                    item.get('tanggal') or default_tanggal, assigned_at, assigned_at
+                ))
+
+                if tax_row:
+                    result['tax_count'] += 1
+                    result['total_ppn'] += tax_row[6]
+                    result['total_pph23'] += tax_row[7]
+                    result['total_tax'] += tax_row[8]
+
+            cursor.executemany("""
+                INSERT INTO detail_container 
+                (barang_id, container_id, tax_id, satuan, door_type, colli_amount, 
+                harga_per_unit, total_harga, tanggal, assigned_at, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, insert_rows)
+
+            conn.commit()
+
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Batch assign to container {container_id} failed, rolling back: {e}")
+            raise DatabaseError(f"Failed to assign barang to container: {e}")
+
+        self.bump_generation('detail_container')
+        if result['tax_count']:
+            self.bump_generation('barang_tax')
+        result['success_count'] = len(insert_rows)
+        result['assigned_ids'] = [row[0] for row in insert_rows]
+        logger.info(f"Batch assign to container {container_id}: {result['success_count']} success, "
+                    f"{result['failed_count']} failed, {result['tax_count']} tax records")
+        return result
+
+    def remove_barang_from_container(self, detail_ids):
+        """Remove detail_container rows by id together with their barang_tax rows in one transaction
+
+        Returns:
+            dict: {'removed_count': int, 'tax_removed_count': int,
+                   'removed_ids': [id detail_container yang benar-benar terhapus]}
+        """
+        if not detail_ids:
+            raise ValueError("Detail IDs are required")
+
+        detail_ids = list(detail_ids)
+        conn = self.get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            removed_ids = []
+            tax_removed_count = 0
+            for start in range(0, len(detail_ids), SQL_PARAM_CHUNK):
+                chunk = detail_ids[start:start + SQL_PARAM_CHUNK]
+                placeholders = ','.join('?' for _ in chunk)
+                removed_ids.extend(row[0] for row in conn.execute(
+                    f"SELECT id FROM detail_container WHERE id IN ({placeholders})", tuple(chunk)
+                ))
+                tax_removed_count += conn.execute(f"""
+                    DELETE FROM barang_tax WHERE tax_id IN (
+                        SELECT tax_id FROM detail_container
+                        WHERE id IN ({placeholders}) AND tax_id IS NOT NULL
+                    )
+                """, tuple(chunk)).rowcount
+                conn.execute(f"DELETE FROM detail_container WHERE id IN ({placeholders})", tuple(chunk))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Failed to remove detail rows {detail_ids}: {e}")
+            raise DatabaseError(f"Failed to remove barang from container: {e}")
+
+        self.bump_generation('detail_container', removed_ids)
+        if tax_removed_count:
+            self.bump_generation('barang_tax')
+
+        logger.info(f"Removed {len(removed_ids)} detail rows and {tax_removed_count} tax records")
+        return {'removed_count': len(removed_ids), 'tax_removed_count': tax_removed_count,
+                'removed_ids': removed_ids}
+
+    def _get_barang_tax_info(self, barang_ids):
+        """Get {barang_id: row(barang_id, pajak, receiver_name)} for many barang in chunked IN queries"""
+        barang_ids = list(barang_ids)
+        barang_info = {}
+        for start in range(0, len(barang_ids), SQL_PARAM_CHUNK):
+            chunk = barang_ids[start:start + SQL_PARAM_CHUNK]
+            placeholders = ','.join('?' for _ in chunk)
+            rows = self.execute(f"""
+                SELECT b.barang_id, b.pajak, COALESCE(r.nama_customer, 'Unknown') AS receiver_name
+                FROM barang b
+                LEFT JOIN customers r ON b.penerima = r.customer_id
+                WHERE b.barang_id IN ({placeholders})
+            """, tuple(chunk))
+            for row in rows:
+                barang_info[row['barang_id']] = row
+        return barang_info
+
+    def _next_assigned_at(self):
+        """Generate a unique, monotonic assigned_at timestamp (resolusi mikrodetik) tanpa query ke database"""
+        with self._assigned_at_lock:
+            now = datetime.now()
+            if self._last_assigned_at is not None and now <= self._last_assigned_at:
+                now = self._last_assigned_at + timedelta(microseconds=1)
+            self._last_assigned_at = now
+        return now.strftime('%Y-%m-%d %H:%M:%S.%f')
+
     def get_barang_in_container_with_colli_and_pricing(self, container_id):
         """Get all barang in a specific container with colli and pricing information"""
         try:
@@ -1444,7 +2606,9 @@ class AppDatabase(UserDatabase, CustomerDatabase, ContainerDatabase, BarangDatab
                     b.pajak,
                     COALESCE(dc.harga_per_unit, 0) as harga_per_unit,
                     COALESCE(dc.total_harga, 0) as total_harga,
-                    dc.assigned_at
+                    dc.assigned_at,
+                    dc.id AS detail_id,
+                    dc.tax_id
                 FROM detail_container dc
                 JOIN barang b ON dc.barang_id = b.barang_id
                 JOIN customers r ON b.penerima = r.customer_id
@@ -1536,6 +2700,246 @@ class AppDatabase(UserDatabase, CustomerDatabase, ContainerDatabase, BarangDatab
             logger.error(f"Error getting customer container summary with pricing: {e}")
             return []
 
+    def get_containers_overview(self, container_ids=None):
+        """Get containers with kapal feeder and item count/total colli/total value in one query
+
+        container_ids: hanya container ini (untuk refresh per baris), None untuk semua
+        """
+        where, detail_where, params = '', '', ()
+        if container_ids is not None:
+            container_ids = list(container_ids)
+            step = SQL_PARAM_CHUNK // 2  # Placeholder dipakai dua kali per id
+            if len(container_ids) > step:
+                return [container for start in range(0, len(container_ids), step)
+                        for container in self.get_containers_overview(container_ids[start:start + step])]
+            if not container_ids:
+                return []
+            placeholders = ','.join('?' for _ in container_ids)
+            where = f"WHERE c.container_id IN ({placeholders})"
+            detail_where = f"WHERE container_id IN ({placeholders})"
+            params = (*container_ids, *container_ids)
+
+        try:
+            result = self.execute(f"""
+                SELECT 
+                    c.container_id,
+                    c.kapal_id,
+                    k.feeder AS kapal_feeder,
+                    c.etd,
+                    c.party,
+                    c.container,
+                    c.seal,
+                    c.ref_joa,
+                    c.created_at,
+                    c.updated_at,
+                    COALESCE(dc.item_count, 0) AS item_count,
+                    COALESCE(dc.total_colli, 0) AS total_colli,
+                    COALESCE(dc.total_nilai, 0) AS total_nilai
+                FROM containers c
+                LEFT JOIN kapals k ON c.kapal_id = k.kapal_id
+                LEFT JOIN (
+                    SELECT 
+                        container_id,
+                        COUNT(*) AS item_count,
+                        SUM(colli_amount) AS total_colli,
+                        SUM(COALESCE(total_harga, 0)) AS total_nilai
+                    FROM detail_container
+                    {detail_where}
+                    GROUP BY container_id
+                ) dc ON dc.container_id = c.container_id
+                {where}
+                ORDER BY c.container_id DESC
+            """, params)
+            
+            return [dict(container) for container in result]
+            
+        except Exception as e:
+            logger.error(f"Error getting containers overview: {e}")
+            raise DatabaseError(f"Failed to retrieve containers overview: {e}")
+
+    def get_joa_catalog(self, ref_joa=None):
+        """Get JOA catalog grouped by ref_joa with containers and kapal info in one query
+
+        Returns dict {ref_joa: {...}}. Jika ref_joa diberikan, hanya JOA tersebut yang
+        di-load (untuk refresh satu JOA setelah edit).
+        """
+        try:
+            query = """
+                SELECT 
+                    c.ref_joa,
+                    c.container_id,
+                    c.container,
+                    c.kapal_id,
+                    c.party,
+                    k.feeder,
+                    k.destination,
+                    k.etd_sub,
+                    k.cls,
+                    k.open,
+                    k.full,
+                    k.shipping_line
+                FROM containers c
+                LEFT JOIN kapals k ON c.kapal_id = k.kapal_id
+                WHERE c.ref_joa IS NOT NULL AND c.ref_joa != ''
+            """
+            params = ()
+            if ref_joa is not None:
+                query += " AND c.ref_joa = ?"
+                params = (ref_joa,)
+            query += " ORDER BY c.ref_joa, c.container_id"
+
+            catalog = {}
+            for row in self.execute(query, params):
+                joa = row['ref_joa']
+                entry = catalog.get(joa)
+                if entry is None:
+                    entry = catalog[joa] = {
+                        'containers': [],
+                        'container_ids': [],
+                        'container': row['container'],
+                        'feeder': None,
+                        'destination': None,
+                        'etd_sub': None,
+                        'cls': None,
+                        'open': None,
+                        'full': None,
+                        'kapal_id': None,
+                        'party': None,
+                        'shipping_line': None
+                    }
+
+                entry['containers'].append(row['container'])
+                entry['container_ids'].append(row['container_id'])
+
+                if entry['kapal_id'] is None and row['kapal_id']:
+                    entry['kapal_id'] = row['kapal_id']
+                if entry['party'] is None and row['party']:
+                    entry['party'] = row['party']
+
+                # Info kapal diambil dari container pertama yang punya kapal
+                if entry['feeder'] is None and row['feeder'] is not None:
+                    for key in ('feeder', 'destination', 'etd_sub', 'cls', 'open', 'full', 'shipping_line'):
+                        entry[key] = row[key]
+
+            return catalog
+
+        except Exception as e:
+            logger.error(f"Error getting JOA catalog: {e}")
+            raise DatabaseError(f"Failed to retrieve JOA catalog: {e}")
+
+    def get_joa_financials(self, ref_joa):
+        """Get JOA sales/purchase summary with set-based queries (jumlah query tetap, tidak per customer)
+
+        Returns dict:
+            container_count, party_count_20/21/40,
+            receivers: [{customer_id, customer_name, total_colli, total_m3, total_ton, total_invoice, door_type}],
+            sales_total, pol_total, pod_total,
+            delivery_costs: {'pol': [...], 'pod': [...]} dengan {cost_type, size, notes, unit_cost}
+        """
+        try:
+            # Jumlah container per tipe (prioritas: 40'HC > 21' > 20')
+            party = self.execute_one("""
+                SELECT 
+                    COUNT(*) AS container_count,
+                    SUM(CASE WHEN party LIKE '%20%' AND party NOT LIKE '%40%' AND party NOT LIKE '%21%' THEN 1 ELSE 0 END) AS party_count_20,
+                    SUM(CASE WHEN party LIKE '%21%' AND party NOT LIKE '%40%' THEN 1 ELSE 0 END) AS party_count_21,
+                    SUM(CASE WHEN party LIKE '%40%' THEN 1 ELSE 0 END) AS party_count_40
+                FROM containers
+                WHERE ref_joa = ?
+            """, (ref_joa,))
+
+            # Total per penerima; door_type diambil eksplisit dari detail pertama (id terkecil)
+            receivers = self.execute("""
+                SELECT totals.*, first_dc.door_type
+                FROM (
+                    SELECT 
+                        b.penerima AS customer_id,
+                        COALESCE(c.nama_customer, b.penerima) AS customer_name,
+                        SUM(dc.colli_amount) AS total_colli,
+                        COALESCE(SUM(b.m3_barang * dc.colli_amount), 0) AS total_m3,
+                        COALESCE(SUM(b.ton_barang * dc.colli_amount), 0) AS total_ton,
+                        SUM(COALESCE(dc.total_harga, 0)) AS total_invoice,
+                        MIN(dc.id) AS first_detail_id
+                    FROM containers cont
+                    JOIN detail_container dc ON dc.container_id = cont.container_id
+                    JOIN barang b ON b.barang_id = dc.barang_id
+                    JOIN customers c ON c.customer_id = b.penerima
+                    WHERE cont.ref_joa = ?
+                    GROUP BY b.penerima
+                ) totals
+                JOIN detail_container first_dc ON first_dc.id = totals.first_detail_id
+                ORDER BY totals.customer_name
+            """, (ref_joa,))
+
+            # Biaya pengantaran: POL = lokasi kosong/Surabaya, POD = lokasi lain.
+            # Per (jenis biaya, ukuran) biaya dan catatan diambil dari baris pertama sebagai unit cost.
+            costs = self.execute("""
+                SELECT 
+                    cost_groups.bucket,
+                    cost_groups.cost_type,
+                    cost_groups.size,
+                    COALESCE(first_cdc.cost, 0) AS unit_cost,
+                    COALESCE(first_cdc.cost_description, '') AS notes
+                FROM (
+                    SELECT 
+                        CASE WHEN COALESCE(cdc.delivery, '') = ''
+                                  OR cdc.delivery LIKE '%surabaya%'
+                                  OR cdc.delivery LIKE '%sby%'
+                                  OR cdc.delivery LIKE '%sub%'
+                             THEN 'pol' ELSE 'pod' END AS bucket,
+                        COALESCE(cdc.description, '') AS cost_type,
+                        CASE WHEN cont.party LIKE '%40%' THEN '40'
+                             WHEN cont.party LIKE '%21%' THEN '21'
+                             WHEN cont.party LIKE '%20%' THEN '20'
+                             ELSE NULL END AS size,
+                        MIN(cdc.id) AS first_cost_id
+                    FROM containers cont
+                    JOIN container_delivery_costs cdc ON cdc.container_id = cont.container_id
+                    WHERE cont.ref_joa = ?
+                    GROUP BY bucket, cost_type, size
+                ) cost_groups
+                JOIN container_delivery_costs first_cdc ON first_cdc.id = cost_groups.first_cost_id
+                ORDER BY cost_groups.first_cost_id
+            """, (ref_joa,))
+
+            result = {
+                'container_count': party['container_count'] if party else 0,
+                'party_count_20': (party['party_count_20'] or 0) if party else 0,
+                'party_count_21': (party['party_count_21'] or 0) if party else 0,
+                'party_count_40': (party['party_count_40'] or 0) if party else 0,
+                'receivers': [],
+                'sales_total': 0,
+                'pol_total': 0,
+                'pod_total': 0,
+                'delivery_costs': {'pol': [], 'pod': []}
+            }
+
+            for row in receivers:
+                receiver = dict(row)
+                receiver.pop('first_detail_id', None)
+                receiver['door_type'] = receiver['door_type'] or 'PP'
+                result['receivers'].append(receiver)
+
+                result['sales_total'] += receiver['total_invoice']
+                if receiver['door_type'] == 'PP':
+                    result['pol_total'] += receiver['total_invoice']
+                else:
+                    result['pod_total'] += receiver['total_invoice']
+
+            for row in costs:
+                result['delivery_costs'][row['bucket']].append({
+                    'cost_type': row['cost_type'],
+                    'size': row['size'],
+                    'notes': row['notes'],
+                    'unit_cost': row['unit_cost']
+                })
+
+            return result
+
+        except Exception as e:
+            logger.error(f"Error getting JOA financials for {ref_joa}: {e}")
+            raise DatabaseError(f"Failed to retrieve JOA financials: {e}")
+
     def get_all_containers_with_value(self):
         """Get all containers with total value"""
         try:
@@ -1624,32 +3028,129 @@ class AppDatabase(UserDatabase, CustomerDatabase, ContainerDatabase, BarangDatab
 
     # HELPER METHODS UNTUK PRICING
     def bulk_update_container_pricing(self, container_id, pricing_data):
-        """Update pricing for multiple barang in container
-        pricing_data: dict {barang_id: {'harga_per_unit': x, 'total_harga': y}}
+        """Update pricing for multiple barang in container and resync barang_tax in one transaction
+        pricing_data: dict {barang_id: {'harga_per_unit': x, 'total_harga': y, 'detail_id': optional}}
+        Tanpa detail_id, semua baris barang tersebut di container ikut diupdate.
+
+        Returns:
+            dict: {'success': int, 'error': int, 'tax_updated': int}
         """
-        try:
-            success_count = 0
-            error_count = 0
-            
-            for barang_id, price_data in pricing_data.items():
-                try:
-                    self.update_barang_pricing_in_container(
-                        barang_id, 
-                        container_id, 
-                        price_data['harga_per_unit'], 
-                        price_data['total_harga']
+        if not pricing_data:
+            return {'success': 0, 'error': 0, 'tax_updated': 0}
+
+        try:
+            # Semua baris detail yang terdampak + tax_id-nya
+            detail_rows = []
+            barang_ids = list(pricing_data.keys())
+            for start in range(0, len(barang_ids), SQL_PARAM_CHUNK):
+                chunk = barang_ids[start:start + SQL_PARAM_CHUNK]
+                placeholders = ','.join('?' for _ in chunk)
+                detail_rows.extend(self.execute(f"""
+                    SELECT id, barang_id, tax_id
+                    FROM detail_container
+                    WHERE container_id = ? AND barang_id IN ({placeholders})
+                """, (container_id, *chunk)))
+
+            # Key pricing_data bisa string (dari Treeview), samakan dengan barang_id integer
+            prices = {str(barang_id): data for barang_id, data in pricing_data.items()}
+            barang_info = self._get_barang_tax_info({row['barang_id'] for row in detail_rows})
+
+            # Record pajak lama yang belum di-link ke detail_container (data sebelum tax_id dipakai)
+            unlinked_taxes = {}
+            detail_barang_ids = list({row['barang_id'] for row in detail_rows})
+            for start in range(0, len(detail_barang_ids), SQL_PARAM_CHUNK):
+                chunk = detail_barang_ids[start:start + SQL_PARAM_CHUNK]
+                placeholders = ','.join('?' for _ in chunk)
+                for tax in self.execute(f"""
+                    SELECT tax_id, barang_id FROM barang_tax
+                    WHERE container_id = ? AND barang_id IN ({placeholders})
+                    AND tax_id NOT IN (
+                        SELECT tax_id FROM detail_container WHERE container_id = ? AND tax_id IS NOT NULL
                     )
-                    success_count += 1
-                except Exception as e:
-                    logger.error(f"Error updating pricing for barang {barang_id}: {e}")
-                    error_count += 1
-            
-            logger.info(f"Bulk pricing update: {success_count} success, {error_count} errors")
-            return {'success': success_count, 'error': error_count}
+                    ORDER BY tax_id
+                """, (container_id, *chunk, container_id)):
+                    unlinked_taxes.setdefault(tax['barang_id'], []).append(tax['tax_id'])
+
+            price_updates = []   # (harga_per_unit, total_harga, detail_id)
+            tax_updates = []     # (total_nilai, ppn, pph23, total_tax, tax_id)
+            tax_inserts = []     # (detail_id, tax_row)
+            tax_links = []       # (tax_id, detail_id) untuk record pajak lama yang belum ter-link
+            updated_barang = set()
+            for row in detail_rows:
+                price_data = prices[str(row['barang_id'])]
+                detail_id = price_data.get('detail_id')
+                if detail_id is not None and int(detail_id) != row['id']:
+                    continue
+
+                total_harga = price_data['total_harga']
+                price_updates.append((price_data['harga_per_unit'], total_harga, row['id']))
+                updated_barang.add(str(row['barang_id']))
+
+                info = barang_info.get(row['barang_id'])
+                if info is None or info['pajak'] != 1:
+                    continue
+
+                ppn_amount = total_harga * PPN_RATE
+                pph23_amount = total_harga * PPH23_RATE
+                tax_id = row['tax_id']
+                if not tax_id and unlinked_taxes.get(row['barang_id']):
+                    tax_id = unlinked_taxes[row['barang_id']].pop(0)
+                    tax_links.append((tax_id, row['id']))
+
+                if tax_id:
+                    tax_updates.append((total_harga, ppn_amount, pph23_amount, ppn_amount + pph23_amount, tax_id))
+                else:
+                    tax_inserts.append((row['id'], (
+                        container_id, row['barang_id'], info['receiver_name'], total_harga,
+                        PPN_RATE, PPH23_RATE, ppn_amount, pph23_amount, ppn_amount + pph23_amount
+                    )))
+
+            conn = self.get_connection()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.cursor()
+                cursor.executemany("""
+                    UPDATE detail_container 
+                    SET harga_per_unit = ?, total_harga = ?
+                    WHERE id = ?
+                """, price_updates)
+
+                if tax_updates:
+                    cursor.executemany("""
+                        UPDATE barang_tax
+                        SET total_nilai_barang = ?, ppn_amount = ?, pph23_amount = ?, total_tax = ?
+                        WHERE tax_id = ?
+                    """, tax_updates)
+
+                if tax_links:
+                    cursor.executemany("UPDATE detail_container SET tax_id = ? WHERE id = ?", tax_links)
+
+                if tax_inserts:
+                    # Insert per baris; tax_id baru di-link dari lastrowid masing-masing
+                    new_links = []
+                    for detail_id, tax_row in tax_inserts:
+                        cursor.execute(BARANG_TAX_INSERT_SQL, tax_row)
+                        new_links.append((cursor.lastrowid, detail_id))
+                    cursor.executemany("UPDATE detail_container SET tax_id = ? WHERE id = ?", new_links)
+
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+            self.bump_generation('detail_container')
+            if tax_updates or tax_inserts:
+                self.bump_generation('barang_tax')
+            success_count = len(updated_barang)
+            error_count = len(pricing_data) - success_count
+            tax_updated = len(tax_updates) + len(tax_inserts)
+            logger.info(f"Bulk pricing update: {success_count} success, {error_count} errors, "
+                        f"{tax_updated} tax records synced")
+            return {'success': success_count, 'error': error_count, 'tax_updated': tax_updated}
             
         except Exception as e:
             logger.error(f"Error in bulk_update_container_pricing: {e}")
-            return {'success': 0, 'error': len(pricing_data)}
+            return {'success': 0, 'error': len(pricing_data), 'tax_updated': 0}
 
     def get_container_pricing_summary(self, container_id):
         """Get detailed pricing summary for a container"""
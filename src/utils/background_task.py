@@ -0,0 +1,142 @@
+"""
+Background Task
+Jalankan pekerjaan berat (import Excel, batch insert) di worker thread; progres
+dikirim lewat queue dan dibaca oleh Tk main thread dengan after(), sehingga UI
+tetap responsif dan widget tidak pernah disentuh dari thread lain
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+class BackgroundTask:
+    """Run target(task) on a worker thread and deliver its events on the Tk main thread
+
+    target menerima objek task ini dan boleh memanggil:
+        task.stage(name)                - context manager, mencatat durasi stage
+        task.report(done, total)        - progres stage aktif (total None = indeterminate)
+        task.cancelled()                - True jika cancel() sudah dipanggil
+        task.cancel_event               - threading.Event untuk diteruskan ke layer database
+
+    Callback (dipanggil di main thread):
+        on_progress(stage, done, total)
+        on_done(result, timings)        - timings: list (stage, detik) sesuai urutan
+        on_error(exception, timings)
+        on_cancelled(timings)
+    Exception yang terjadi setelah cancel() dianggap pembatalan, bukan error.
+    """
+
+    # Interval polling queue dari main thread (ms)
+    POLL_INTERVAL_MS = 100
+
+    def __init__(self, widget, target, on_progress=None, on_done=None, on_error=None,
+                 on_cancelled=None, cleanup=None, name="background-task"):
+        """
+        widget: widget Tk untuk menjadwalkan polling (after)
+        cleanup: dipanggil di worker thread setelah target selesai (mis. db.pool.release)
+        """
+        self.widget = widget
+        self.target = target
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_cancelled = on_cancelled
+        self.cleanup = cleanup
+        self.name = name
+
+        self.cancel_event = threading.Event()
+        self.timings = []
+        self._events = queue.Queue()
+        self._current_stage = None
+        self._thread = None
+        self._finished = False
+
+    # ---- API untuk target (worker thread) ----
+
+    @contextmanager
+    def stage(self, name):
+        """Mark a named stage; durasinya masuk ke timings"""
+        self._current_stage = name
+        self._events.put(('progress', name, None, None))
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.append((name, time.perf_counter() - started))
+
+    def report(self, done, total=None):
+        """Report progress of the current stage"""
+        self._events.put(('progress', self._current_stage, done, total))
+
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    # ---- API untuk main thread ----
+
+    def start(self):
+        """Start the worker thread and begin polling"""
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        self.widget.after(self.POLL_INTERVAL_MS, self._poll)
+        return self
+
+    def cancel(self):
+        """Request cancellation; target/layer database yang memeriksa cancel_event"""
+        self.cancel_event.set()
+
+    def is_running(self):
+        return self._thread is not None and not self._finished
+
+    def _run(self):
+        try:
+            result = self.target(self)
+            self._events.put(('done', result))
+        except Exception as e:
+            if self.cancel_event.is_set():
+                self._events.put(('cancelled', None))
+            else:
+                self._events.put(('error', e))
+        finally:
+            if self.cleanup:
+                try:
+                    self.cleanup()
+                except Exception as e:
+                    print(f"Background task cleanup failed: {e}")
+
+    def _poll(self):
+        """Drain the event queue on the main thread"""
+        try:
+            if not self.widget.winfo_exists():
+                self.cancel()
+                return
+        except Exception:
+            # Window sudah dihancurkan
+            self.cancel()
+            return
+
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                break
+
+            kind = event[0]
+            if kind == 'progress':
+                if self.on_progress:
+                    self.on_progress(*event[1:])
+                continue
+
+            self._finished = True
+            if kind == 'done':
+                if self.on_done:
+                    self.on_done(event[1], list(self.timings))
+            elif kind == 'cancelled':
+                if self.on_cancelled:
+                    self.on_cancelled(list(self.timings))
+            elif self.on_error:
+                self.on_error(event[1], list(self.timings))
+            return
+
+        self.widget.after(self.POLL_INTERVAL_MS, self._poll)
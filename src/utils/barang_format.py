@@ -0,0 +1,109 @@
+"""
+Barang Display Formatting
+Formatter bersama untuk baris Daftar Barang dan export Excel: kolom harga
+diformat per kolom sekaligus dan hasilnya di-memo per barang_id
+"""
+
+# Kolom harga barang sesuai urutan kolom Daftar Barang
+BARANG_PRICE_FIELDS = (
+    'm3_pp', 'm3_pd', 'm3_dd',
+    'ton_pp', 'ton_pd', 'ton_dd',
+    'col_pp', 'col_pd', 'col_dd',
+    'container_20_pp', 'container_20_pd', 'container_20_dd',
+    'container_21_pp', 'container_21_pd', 'container_21_dd',
+    'container_40hc_pp', 'container_40hc_pd', 'container_40hc_dd',
+)
+
+
+def format_rupiah(value):
+    """Format harga sebagai 'Rp 1,500,000'; kosong/0/'-' menjadi '-'"""
+    if not value or value == '-':
+        return '-'
+    try:
+        return f"Rp {float(value):,.0f}"
+    except (ValueError, TypeError):
+        return '-'
+
+
+def format_rupiah_column(values):
+    """Format satu kolom harga sekaligus; angka langsung diformat tanpa konversi ulang"""
+    number_types = (int, float)
+    return [
+        f"Rp {value:,.0f}" if value and value.__class__ in number_types else format_rupiah(value)
+        for value in values
+    ]
+
+
+def format_dimensi(barang):
+    """Format dimensi barang sebagai 'P×L×T'"""
+    return f"{barang.get('panjang_barang', '-')}×{barang.get('lebar_barang', '-')}×{barang.get('tinggi_barang', '-')}"
+
+
+def format_berat(value):
+    """Format berat dengan koma sebagai pemisah desimal"""
+    if value and value != '-':
+        try:
+            return str(float(value)).replace('.', ',')
+        except (ValueError, TypeError):
+            pass  # Keep original value if conversion fails
+    return value
+
+
+class BarangRowFormatter:
+    """Format barang records into Daftar Barang row tuples, memoised per barang_id
+
+    Record yang belum ada di memo diformat per kolom sekaligus (semua harga
+    satu kolom dalam satu map), lalu digabung menjadi tuple baris. Panggil
+    invalidate() setelah barang diubah atau dihapus.
+    """
+
+    def __init__(self):
+        self._rows = {}  # barang_id -> row tuple
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get_cached(self, barang_id):
+        """Cached row for barang_id or None"""
+        return self._rows.get(barang_id)
+
+    def format_rows(self, records):
+        """Format records (dict) into row tuples, reusing memoised rows"""
+        missing = [record for record in records if record['barang_id'] not in self._rows]
+
+        if missing:
+            price_columns = [
+                format_rupiah_column([record.get(field) for record in missing])
+                for field in BARANG_PRICE_FIELDS
+            ]
+            dimensi_column = list(map(format_dimensi, missing))
+            berat_column = list(map(format_berat, [record.get('ton_barang', '-') for record in missing]))
+
+            for record, dimensi, berat, prices in zip(missing, dimensi_column, berat_column, zip(*price_columns)):
+                created_at = record.get('created_at')
+                self._rows[record['barang_id']] = (
+                    record['barang_id'],
+                    record.get('sender_name'),
+                    record.get('receiver_name'),
+                    record.get('nama_barang'),
+                    dimensi,
+                    record.get('m3_barang', '-'),
+                    berat,
+                    *prices,
+                    record.get('pajak', 0),
+                    created_at[:10] if created_at else '-'
+                )
+
+        return [self._rows[record['barang_id']] for record in records]
+
+    def format_row(self, record):
+        """Format a single record"""
+        return self.format_rows([record])[0]
+
+    def invalidate(self, barang_ids=None):
+        """Drop memoised rows for barang_ids (semua jika None)"""
+        if barang_ids is None:
+            self._rows.clear()
+            return
+        for barang_id in barang_ids:
+            self._rows.pop(barang_id, None)
@@ -0,0 +1,330 @@
+"""
+Barang Excel Import
+Pipeline import barang berbasis kolom (pandas): pembersihan, resolusi nama
+customer, konversi angka dan laporan error dihitung per kolom, bukan per baris.
+File dibaca per chunk (openpyxl read-only / CSV chunksize) supaya memori tetap
+konstan untuk manifest yang sangat besar
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# Jumlah baris per chunk saat membaca dan meng-insert file import
+IMPORT_CHUNK_ROWS = 5000
+
+# Jumlah baris yang dibaca untuk preview
+PREVIEW_ROWS = 50
+
+# Ekstensi file yang dibaca sebagai CSV
+CSV_EXTENSIONS = ('.csv', '.txt')
+
+# Kolom wajib pada column mapping
+REQUIRED_IMPORT_FIELDS = ('pengirim', 'penerima', 'nama_barang')
+
+# Nilai teks yang dianggap kosong
+EMPTY_MARKERS = ['', 'NAN', 'NONE', 'NULL', '#N/A', '#NULL!']
+
+# Field angka yang divalidasi: field mapping -> (label, tipe)
+NUMERIC_IMPORT_FIELDS = {
+    'panjang': ('Panjang', 'float'),
+    'lebar': ('Lebar', 'float'),
+    'tinggi': ('Tinggi', 'float'),
+    'm3': ('Volume M³', 'float'),
+    'ton': ('Berat Ton', 'float'),
+    'colli': ('Colli', 'int'),
+}
+
+# Field harga yang divalidasi (harga_m3/harga_ton/harga_coll = template lama)
+PRICE_IMPORT_FIELDS = (
+    'harga_m3_pp', 'harga_m3_pd', 'harga_m3_dd',
+    'harga_ton_pp', 'harga_ton_pd', 'harga_ton_dd',
+    'harga_col_pp', 'harga_col_pd', 'harga_col_dd',
+    'harga_m3', 'harga_ton', 'harga_coll',
+)
+
+# Kolom barang yang diisi dari file: kolom database -> field mapping
+IMPORT_VALUE_FIELDS = {
+    'panjang_barang': 'panjang',
+    'lebar_barang': 'lebar',
+    'tinggi_barang': 'tinggi',
+    'm3_barang': 'm3',
+    'ton_barang': 'ton',
+    'm3_pp': 'harga_m3_pp',
+    'm3_pd': 'harga_m3_pd',
+    'm3_dd': 'harga_m3_dd',
+    'ton_pp': 'harga_ton_pp',
+    'ton_pd': 'harga_ton_pd',
+    'ton_dd': 'harga_ton_dd',
+    'col_pp': 'harga_col_pp',
+    'col_pd': 'harga_col_pd',
+    'col_dd': 'harga_col_dd',
+    'container_20_pp': 'harga_container_20_pp',
+    'container_20_pd': 'harga_container_20_pd',
+    'container_20_dd': 'harga_container_20_dd',
+    'container_21_pp': 'harga_container_21_pp',
+    'container_21_pd': 'harga_container_21_pd',
+    'container_21_dd': 'harga_container_21_dd',
+    'container_40hc_pp': 'harga_container_40hc_pp',
+    'container_40hc_pd': 'harga_container_40hc_pd',
+    'container_40hc_dd': 'harga_container_40hc_dd',
+    'pajak': 'pajak',
+}
+
+
+def _chunk_frame(rows, header, start):
+    """Build a DataFrame chunk whose index is the 0-based data row number in the file"""
+    width = len(header)
+    rows = [tuple(row[:width]) + (None,) * (width - len(row)) for row in rows]
+    return pd.DataFrame(rows, columns=header, index=pd.RangeIndex(start, start + len(rows)))
+
+
+def _read_xlsx_chunks(filename, chunk_rows):
+    """Stream an xlsx sheet with openpyxl read-only mode"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(filename, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header_row = next(rows, None)
+        if header_row is None:
+            return
+        # Header kosong / duplikat diberi nama seperti pandas ("Unnamed: 3", "Harga.1")
+        header, seen = [], {}
+        for i, name in enumerate(header_row):
+            name = str(name) if name is not None else f"Unnamed: {i}"
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            header.append(name)
+
+        chunk, start = [], 0
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield _chunk_frame(chunk, header, start)
+                start += len(chunk)
+                chunk = []
+        if chunk:
+            yield _chunk_frame(chunk, header, start)
+    finally:
+        workbook.close()
+
+
+def read_import_chunks(filename, chunk_rows=IMPORT_CHUNK_ROWS):
+    """Yield DataFrame chunks of an import file (xlsx, csv; xls dibaca utuh lalu dipotong)
+
+    Index setiap chunk = nomor baris data (0-based) di file, sehingga nomor baris
+    Excel tetap benar lintas chunk.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+
+    if extension in CSV_EXTENSIONS:
+        # utf-8-sig: CSV hasil "Save As" Excel diawali BOM
+        for chunk in pd.read_csv(filename, chunksize=chunk_rows, encoding='utf-8-sig',
+                                 sep=None, engine='python'):
+            yield chunk
+    elif extension == '.xls':
+        # Format lama tidak didukung openpyxl read-only
+        df = pd.read_excel(filename)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+    else:
+        yield from _read_xlsx_chunks(filename, chunk_rows)
+
+
+def read_import_preview(filename, rows=PREVIEW_ROWS):
+    """Read only the first rows of an import file"""
+    chunks = read_import_chunks(filename, chunk_rows=rows)
+    try:
+        return next(chunks, pd.DataFrame())
+    finally:
+        chunks.close()
+
+
+def clean_text_column(series):
+    """Strip text column; kosong/NaN/marker kosong menjadi ''"""
+    text = series.astype(str).str.strip()
+    return text.where(series.notna() & ~text.str.upper().isin(EMPTY_MARKERS), '')
+
+
+def to_number_column(series, strip_rupiah=False):
+    """Convert column to float; returns (values, invalid mask)
+
+    Koma dan spasi dibuang (format angka Indonesia), 'Rp' dibuang untuk harga.
+    Sel kosong atau '-' menjadi NaN tanpa dianggap error.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float), pd.Series(False, index=series.index)
+
+    text = series.astype(str).str.replace(',', '', regex=False).str.replace(' ', '', regex=False)
+    if strip_rupiah:
+        text = text.str.replace('Rp', '', regex=False)
+
+    present = series.notna() & ~text.str.upper().isin(EMPTY_MARKERS + ['-'])
+    values = pd.to_numeric(text.where(present), errors='coerce')
+    return values, present & values.isna()
+
+
+def prepare_import_frame(df, column_mapping):
+    """Normalise header names and keep rows whose required columns are meaningful
+
+    Returns (frame, stats) dengan stats {'total_rows', 'non_empty_rows', 'meaningful_rows'}.
+    Nomor baris Excel (header = baris 1) disimpan di kolom '_row_number'.
+    """
+    df = df.copy()
+    df.columns = df.columns.astype(str).str.strip()
+    df['_row_number'] = df.index + 2
+    df = df.dropna(how='all', subset=[col for col in df.columns if col != '_row_number'])
+
+    missing_fields = [field for field in REQUIRED_IMPORT_FIELDS if field not in column_mapping]
+    if missing_fields:
+        raise ValueError(f"Kolom wajib tidak ditemukan dalam mapping: {', '.join(missing_fields)}")
+
+    invalid_columns = [f"{field} -> {column_mapping[field]}" for field in REQUIRED_IMPORT_FIELDS
+                       if column_mapping[field] not in df.columns]
+    if invalid_columns:
+        raise ValueError(f"Kolom mapped tidak ada dalam file Excel: {', '.join(invalid_columns)}")
+
+    required_cols = [column_mapping[field] for field in REQUIRED_IMPORT_FIELDS]
+    non_empty = df.dropna(subset=required_cols)
+
+    meaningful_mask = pd.Series(True, index=non_empty.index)
+    for col in required_cols:
+        meaningful_mask &= clean_text_column(non_empty[col]) != ''
+
+    stats = {
+        'total_rows': len(df),
+        'non_empty_rows': len(non_empty),
+        'meaningful_rows': int(meaningful_mask.sum()),
+    }
+    return non_empty[meaningful_mask], stats
+
+
+def validate_import_frame(df, column_mapping, existing_customers):
+    """Validate prepared rows and build create_barang_batch records
+
+    existing_customers: {NAMA CUSTOMER (upper): customer_id}
+
+    Returns dict:
+        'records': list dict untuk create_barang_batch (hanya baris valid), termasuk
+                   'row_number' (nomor baris Excel) untuk laporan error
+        'validation_errors': [{'nama_barang', 'pengirim', 'penerima', 'error', 'row_number'}]
+        'customer_not_found': [{'nama_barang', 'pengirim', 'penerima', 'row_number', 'errors'}]
+    """
+    pengirim = clean_text_column(df[column_mapping['pengirim']])
+    penerima = clean_text_column(df[column_mapping['penerima']])
+    nama_barang = clean_text_column(df[column_mapping['nama_barang']])
+
+    # Resolusi nama -> customer_id untuk seluruh kolom sekaligus
+    pengirim_id = pengirim.str.upper().map(existing_customers)
+    penerima_id = penerima.str.upper().map(existing_customers)
+
+    # (mask error, pesan) - pesan berupa string atau Series per baris
+    customer_checks = [
+        (pengirim.ne('') & pengirim_id.isna(), "Pengirim '" + pengirim + "' tidak ditemukan di database"),
+        (penerima.ne('') & penerima_id.isna(), "Penerima '" + penerima + "' tidak ditemukan di database"),
+    ]
+    other_checks = [
+        (pengirim.eq(''), "Pengirim tidak boleh kosong"),
+        (penerima.eq(''), "Penerima tidak boleh kosong"),
+        (nama_barang.eq(''), "Nama barang tidak boleh kosong"),
+    ]
+
+    for field, (label, data_type) in NUMERIC_IMPORT_FIELDS.items():
+        column = column_mapping.get(field)
+        if column not in df.columns:
+            continue
+        values, invalid = to_number_column(df[column])
+        if data_type == 'int':
+            values = np.trunc(values)
+        other_checks.append((invalid, f"{label} harus berupa angka valid (ditemukan: '" + df[column].astype(str) + "')"))
+        other_checks.append((values <= 0, f"{label} harus lebih besar dari 0"))
+
+    for field in PRICE_IMPORT_FIELDS:
+        column = column_mapping.get(field)
+        if column not in df.columns:
+            continue
+        values, invalid = to_number_column(df[column], strip_rupiah=True)
+        other_checks.append((invalid, f"Format harga {field} tidak valid (ditemukan: '" + df[column].astype(str) + "')"))
+        other_checks.append((values <= 0, f"Harga {field} harus lebih besar dari 0"))
+
+    other_checks.append((
+        pengirim.ne('') & pengirim.str.upper().eq(penerima.str.upper()),
+        "Pengirim dan Penerima tidak boleh sama"
+    ))
+
+    # Nilai yang disimpan; kolom yang tidak bisa dikonversi juga dilaporkan sebagai error
+    values = {}
+    for db_field, field in IMPORT_VALUE_FIELDS.items():
+        column = column_mapping.get(field)
+        if column not in df.columns:
+            values[db_field] = pd.Series(0.0 if db_field == 'pajak' else float('nan'), index=df.index)
+            continue
+        converted, invalid = to_number_column(df[column], strip_rupiah=field.startswith('harga_'))
+        if db_field == 'pajak':
+            converted = converted.fillna(0.0)
+        values[db_field] = converted
+        if field not in NUMERIC_IMPORT_FIELDS and field not in PRICE_IMPORT_FIELDS:
+            other_checks.append((invalid, f"Format {field} tidak valid: '" + df[column].astype(str) + "'"))
+
+    customer_error = pd.Series(False, index=df.index)
+    for mask, _ in customer_checks:
+        customer_error |= mask
+    other_error = pd.Series(False, index=df.index)
+    for mask, _ in other_checks:
+        other_error |= mask
+
+    def collect_messages(checks, error_mask):
+        """Gabungkan pesan error per baris, hanya untuk baris yang error"""
+        messages = {index: [] for index in df.index[error_mask.values]}
+        for mask, message in checks:
+            hit = mask & error_mask
+            if not hit.any():
+                continue
+            texts = message[hit] if isinstance(message, pd.Series) else pd.Series(message, index=df.index[hit])
+            for index, text in texts.items():
+                messages[index].append(text)
+        return messages
+
+    row_number = df['_row_number']
+    customer_not_found = [
+        {
+            'nama_barang': nama_barang[index] or 'N/A',
+            'pengirim': pengirim[index] or 'N/A',
+            'penerima': penerima[index] or 'N/A',
+            'row_number': int(row_number[index]),
+            'errors': errors,
+        }
+        for index, errors in collect_messages(customer_checks, customer_error).items()
+    ]
+    validation_errors = [
+        {
+            'nama_barang': nama_barang[index] or 'N/A',
+            'pengirim': pengirim[index] or 'N/A',
+            'penerima': penerima[index] or 'N/A',
+            'error': '; '.join(errors),
+            'row_number': int(row_number[index]),
+        }
+        for index, errors in collect_messages(other_checks, other_error).items()
+    ]
+
+    valid = ~(customer_error | other_error)
+    out = pd.DataFrame({
+        'pengirim': pengirim_id[valid].astype(int),
+        'penerima': penerima_id[valid].astype(int),
+        'nama_barang': nama_barang[valid],
+        **{db_field: series[valid] for db_field, series in values.items()},
+        'row_number': row_number[valid].astype(int),
+    })
+    # NaN -> None supaya tersimpan sebagai NULL
+    out = out.astype(object).where(out.notna(), None)
+
+    return {
+        'records': out.to_dict('records'),
+        'validation_errors': sorted(validation_errors, key=lambda error: error['row_number']),
+        'customer_not_found': sorted(customer_not_found, key=lambda error: error['row_number']),
+    }
@@ -0,0 +1,250 @@
+"""
+Barang Search Index
+Index pencarian in-memory untuk Daftar Barang, dibangun sekali saat load_barang
+sehingga filter per ketikan tidak perlu lowercase dan scan seluruh baris lagi
+"""
+
+from bisect import bisect_left, insort
+
+from src.widget.paginated_tree_view import QueryDataSource
+
+
+def search_row(record):
+    """Index row (lihat get_barang_search_rows) from a barang record dict"""
+    return (record['barang_id'], record.get('nama_barang'), record.get('pengirim'),
+            record.get('penerima'), record.get('sender_name'), record.get('receiver_name'))
+
+
+class BarangSearchIndex:
+    """In-memory search index for barang name, pengirim and penerima filters
+
+    Semantik sama dengan filter lama: setiap kata pencarian harus menjadi
+    substring nama barang, pengirim/penerima dicocokkan sebagai substring nama.
+    Pencarian hanya men-scan kosakata token dan daftar nama customer yang unik,
+    bukan seluruh baris barang.
+    """
+
+    # Batas memo kata pencarian -> token sebelum dikosongkan
+    MAX_TERM_MEMO = 1000
+
+    def __init__(self, rows):
+        """rows: (barang_id, nama_barang, pengirim, penerima, sender_name, receiver_name)"""
+        self.barang_ids = []  # Urut barang_id, sama dengan urutan default list
+        self.token_postings = {}  # token nama (lowercase) -> set barang_id
+        self.sender_ids = {}  # nama pengirim (lowercase) -> set barang_id
+        self.receiver_ids = {}  # nama penerima (lowercase) -> set barang_id
+        self._term_tokens = {}  # kata pencarian -> token yang memuat kata tersebut
+        self._entries = {}  # barang_id -> (token, nama pengirim, nama penerima), untuk update per baris
+        self._last_search = (None, None)
+
+        for row in rows:
+            self.barang_ids.append(row[0])
+            self._add(row)
+
+    def __len__(self):
+        return len(self.barang_ids)
+
+    def _add(self, row):
+        """Add one row to postings; True jika ada token baru di kosakata"""
+        barang_id, nama_barang, pengirim, penerima, sender_name, receiver_name = row
+        tokens = frozenset(str(nama_barang or '').lower().split())
+        sender = str(sender_name or '').lower()
+        receiver = str(receiver_name or '').lower()
+        self._entries[barang_id] = (tokens, sender, receiver)
+
+        new_token = False
+        for token in tokens:
+            if token not in self.token_postings:
+                new_token = True
+            self.token_postings.setdefault(token, set()).add(barang_id)
+        self.sender_ids.setdefault(sender, set()).add(barang_id)
+        self.receiver_ids.setdefault(receiver, set()).add(barang_id)
+        return new_token
+
+    def _discard(self, barang_id):
+        """Remove one barang from postings (barang_ids tidak disentuh)"""
+        entry = self._entries.pop(barang_id, None)
+        if entry is None:
+            return False
+        tokens, sender, receiver = entry
+        for token in tokens:
+            self.token_postings[token].discard(barang_id)
+        self.sender_ids[sender].discard(barang_id)
+        self.receiver_ids[receiver].discard(barang_id)
+        return True
+
+    def upsert(self, rows):
+        """Add or replace rows (format sama dengan constructor) tanpa membangun ulang index"""
+        new_token = False
+        for row in rows:
+            if not self._discard(row[0]):
+                insort(self.barang_ids, row[0])
+            new_token = self._add(row) or new_token
+
+        # Memo kata -> token tidak memuat token baru; hasil pencarian terakhir sudah basi
+        if new_token:
+            self._term_tokens.clear()
+        self._last_search = (None, None)
+
+    def remove(self, barang_ids):
+        """Remove barang ids from the index"""
+        for barang_id in barang_ids:
+            if self._discard(barang_id):
+                position = bisect_left(self.barang_ids, barang_id)
+                del self.barang_ids[position]
+        self._last_search = (None, None)
+
+    def _ids_for_term(self, term):
+        """Barang ids whose name contains term (term tidak mengandung spasi)"""
+        tokens = self._term_tokens.get(term)
+        if tokens is None:
+            # Token yang memuat "meja" pasti memuat "mej", jadi cukup scan hasil kata sebelumnya
+            candidates = self._term_tokens.get(term[:-1], self.token_postings.keys())
+            tokens = [token for token in candidates if term in token]
+            if len(self._term_tokens) >= self.MAX_TERM_MEMO:
+                self._term_tokens.clear()
+            self._term_tokens[term] = tokens
+
+        return set().union(*(self.token_postings[token] for token in tokens))
+
+    @staticmethod
+    def _ids_for_name(name_map, value):
+        """Barang ids whose customer name contains value"""
+        return set().union(*(ids for name, ids in name_map.items() if value in name))
+
+    def search(self, filters=None):
+        """Return matching barang ids in barang_id order
+
+        filters: dict {'nama', 'pengirim', 'penerima'} seperti BarangWindow.get_barang_filters()
+        """
+        filters = filters or {}
+        key = (str(filters.get('nama') or '').lower(),
+               str(filters.get('pengirim') or '').strip().lower(),
+               str(filters.get('penerima') or '').strip().lower())
+
+        # count() dan fetch_page() dipanggil berurutan dengan filter yang sama
+        if self._last_search[0] == key:
+            return self._last_search[1]
+
+        search_name, search_pengirim, search_penerima = key
+        result = None
+
+        for term in search_name.split():
+            ids = self._ids_for_term(term)
+            result = ids if result is None else result & ids
+            if not result:
+                break
+
+        for value, name_map in ((search_pengirim, self.sender_ids), (search_penerima, self.receiver_ids)):
+            if value and (result is None or result):
+                ids = self._ids_for_name(name_map, value)
+                result = ids if result is None else result & ids
+
+        matched = self.barang_ids if result is None else sorted(result)
+        self._last_search = (key, matched)
+        return matched
+
+
+class BarangIndexDataSource(QueryDataSource):
+    """Daftar Barang data source: filter lewat BarangSearchIndex, record per halaman dari database
+
+    Count dan baris selalu berasal dari id hasil pencarian index. Tanpa sort,
+    id tersebut dipotong per halaman; dengan kolom sort aktif, urutan id
+    diambil sekali dari database (ORDER BY, lihat get_barang_sorted_ids) lalu
+    disaring dengan id hasil pencarian. Hanya record yang barisnya belum ada di
+    memo formatter yang diambil dengan get_barang_by_ids. Panggil invalidate()
+    setelah index di-upsert/remove.
+    """
+
+    def __init__(self, db, index, formatter, sort_columns=None):
+        super().__init__(db.count_barang, db.get_barang_page, format_row=formatter.format_row,
+                         sort_columns=sort_columns)
+        self.db = db
+        self.index = index
+        self.formatter = formatter  # BarangRowFormatter, dipakai bersama oleh BarangWindow
+        self._sorted_ids = {}  # (kolom sort database, descending) -> semua barang_id dalam urutan itu
+        self._sorted_match = (None, None, None)  # (sort, hasil search, id hasil search terurut)
+
+    def invalidate(self):
+        """Drop cached sort orders (nilai kolom sort atau isi index berubah)"""
+        self._sorted_ids = {}
+        self._sorted_match = (None, None, None)
+
+    def count(self, filters=None):
+        return len(self.index.search(filters))
+
+    def sorted_ids(self, matched, sort):
+        """matched (urut barang_id) dalam urutan sort database"""
+        cached_sort, cached_matched, ordered = self._sorted_match
+        if cached_sort == sort and cached_matched is matched:
+            return ordered
+
+        all_ids = self._sorted_ids.get(sort)
+        if all_ids is None:
+            all_ids = self.db.get_barang_sorted_ids(sort)
+            self._sorted_ids[sort] = all_ids
+
+        matched_set = set(matched)
+        ordered = [barang_id for barang_id in all_ids if barang_id in matched_set]
+        if len(ordered) != len(matched):
+            # Id index yang belum ada di urutan database tetap tampil, di akhir
+            seen = set(ordered)
+            ordered.extend(barang_id for barang_id in matched if barang_id not in seen)
+        self._sorted_match = (sort, matched, ordered)
+        return ordered
+
+    def fetch_page(self, offset, limit, sort=None, filters=None):
+        matched = self.index.search(filters)
+        if sort and sort[0] in self.sort_columns:
+            matched = self.sorted_ids(matched, (self.sort_columns[sort[0]], sort[1]))
+
+        page_ids = matched[offset:offset + limit]
+        missing = [barang_id for barang_id in page_ids if self.formatter.get_cached(barang_id) is None]
+        if missing:
+            self.formatter.format_rows(self.db.get_barang_by_ids(missing))
+
+        rows = (self.formatter.get_cached(barang_id) for barang_id in page_ids)
+        return [row for row in rows if row is not None]
+
+
+class AvailableBarangFilter:
+    """Filter-ready rows for the container assignment panel (Barang Tersedia)
+
+    Dibangun sekali dari hasil get_all_barang (sender_name/receiver_name sudah
+    di-join): nama lowercase per kolom dan tuple tampilan dihitung di awal,
+    sehingga filter per ketikan tidak menyentuh database. Jika kata pencarian
+    baru memuat kata sebelumnya (user menambah huruf), pencarian hanya men-scan
+    baris hasil filter sebelumnya.
+    """
+
+    def __init__(self, records, format_row):
+        records = [record for record in records if record is not None]
+        self.barang_ids = [record.get('barang_id') for record in records]
+        self.sender_names = [str(record.get('sender_name') or '').lower() for record in records]
+        self.receiver_names = [str(record.get('receiver_name') or '').lower() for record in records]
+        self.barang_names = [str(record.get('nama_barang') or '').lower() for record in records]
+        self.rows = [format_row(record) for record in records]
+        self._last_terms = ('', '', '')
+        self._last_matches = range(len(self.rows))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def filter(self, sender_name=None, receiver_name=None, barang_name=None):
+        """Return display rows matching all given substrings (case-insensitive)"""
+        terms = tuple(str(term or '').lower() for term in (sender_name, receiver_name, barang_name))
+
+        # Hasil sebelumnya cukup sebagai kandidat jika setiap kata baru memuat kata lama
+        if all(old in new for old, new in zip(self._last_terms, terms)):
+            candidates = self._last_matches
+        else:
+            candidates = range(len(self.rows))
+
+        matches = candidates
+        for term, names in zip(terms, (self.sender_names, self.receiver_names, self.barang_names)):
+            if term:
+                matches = [i for i in matches if term in names[i]]
+
+        self._last_terms = terms
+        self._last_matches = matches
+        return [self.rows[i] for i in matches]
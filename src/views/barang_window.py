@@ -3,22 +3,109 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import pandas as pd
 import os
-from src.models.database import AppDatabase
+from src.models.database import AppDatabase, OperationCancelled
 import re
 from PIL import Image, ImageTk
 
-from src.widget.paginated_tree_view import PaginatedTreeView
+from src.widget.paginated_tree_view import PaginatedTreeView, DECIMAL_COMMA, DECIMAL_POINT
+from src.utils.barang_search import BarangSearchIndex, BarangIndexDataSource, search_row
+from src.utils.barang_format import BarangRowFormatter, format_dimensi
+from src.utils.barang_import import (
+    PREVIEW_ROWS, prepare_import_frame, read_import_chunks, read_import_preview, validate_import_frame
+)
+from src.utils.background_task import BackgroundTask
 from src.utils.helpers import setup_window_restore_behavior
 
+# Kolom harga pada export Excel (header, field barang)
+EXPORT_PRICE_COLUMNS = (
+    ('Harga M³ PP (Rp)', 'm3_pp'),
+    ('Harga M³ PD (Rp)', 'm3_pd'),
+    ('Harga M³ DD (Rp)', 'm3_dd'),
+    ('Harga Ton PP (Rp)', 'ton_pp'),
+    ('Harga Ton PD (Rp)', 'ton_pd'),
+    ('Harga Ton DD (Rp)', 'ton_dd'),
+    ('Harga Colli PP (Rp)', 'col_pp'),
+    ('Harga Colli PD (Rp)', 'col_pd'),
+    ('Harga Colli DD (Rp)', 'col_dd'),
+)
+
+# Kolom Daftar Barang yang bisa di-sort di database (kolom TreeView -> BARANG_SORT_COLUMNS)
+BARANG_TREE_SORT_COLUMNS = {
+    'ID': 'barang_id',
+    'Pengirim': 'sender_name',
+    'Penerima': 'receiver_name',
+    'Nama': 'nama_barang',
+    'Volume': 'm3_barang',
+    'Berat': 'ton_barang',
+    'Harga/M3_PP': 'm3_pp', 'Harga/M3_PD': 'm3_pd', 'Harga/M3_DD': 'm3_dd',
+    'Harga/Ton_PP': 'ton_pp', 'Harga/Ton_PD': 'ton_pd', 'Harga/Ton_DD': 'ton_dd',
+    'Harga/Col_PP': 'col_pp', 'Harga/Col_PD': 'col_pd', 'Harga/Col_DD': 'col_dd',
+    'Harga/Container_20_PP': 'container_20_pp', 'Harga/Container_20_PD': 'container_20_pd',
+    'Harga/Container_20_DD': 'container_20_dd',
+    'Harga/Container_21_PP': 'container_21_pp', 'Harga/Container_21_PD': 'container_21_pd',
+    'Harga/Container_21_DD': 'container_21_dd',
+    'Harga/Container_40HC_PP': 'container_40hc_pp', 'Harga/Container_40HC_PD': 'container_40hc_pd',
+    'Harga/Container_40HC_DD': 'container_40hc_dd',
+    'Pajak': 'pajak',
+    'Created': 'created_at',
+}
+
+UPLOAD_BUTTON_TEXT = "⬆️ Upload ke Database"
+
+# Status per stage import Excel (nama stage BackgroundTask -> teks status)
+UPLOAD_STAGE_LABELS = {
+    'customers': "Memvalidasi data customer...",
+    'validate': "Membaca dan memvalidasi data barang...",
+    'insert': "Mengupload barang ke database...",
+}
+
+# Nama singkat stage untuk ringkasan waktu
+UPLOAD_STAGE_NAMES = {
+    'customers': 'customer',
+    'validate': 'baca+validasi',
+    'insert': 'simpan',
+}
+
 class BarangWindow:
 
     def __init__(self, parent, db, refresh_callback=None):
         self.parent = parent
         self.db = db
         self.refresh_callback = refresh_callback
-        self.original_barang_data = []
-        self.list_tab_loaded = False  # Track if data has been loaded
+        self.barang_index = None
+        self.barang_source = None
+        self.barang_formatter = BarangRowFormatter()  # Memo baris tampilan per barang_id
+        self.upload_task = None  # BackgroundTask import Excel yang sedang berjalan
+        self.barang_index_stamp = None  # Generation barang/customers saat index dibangun
+        self.pending_db_changes = []  # (table, generation, ids) dari subscriber database, diterapkan di main thread
+        self.unsubscribe_db = self.db.subscribe(self.on_db_changed, tables=('barang', 'customers'))
         self.create_window()
+        self.window.bind('<Destroy>', self.on_window_destroy, add='+')
+
+    def on_db_changed(self, table, generation, ids):
+        """Subscriber generation database; bisa dipanggil dari worker thread, jadi hanya mencatat"""
+        if table == 'customers':
+            # Nama customer ikut tampil di baris barang dan ada di index pencarian pengirim/penerima:
+            # semua memo dibuang dan index dibangun ulang pada load berikutnya
+            self.barang_index_stamp = None
+        self.pending_db_changes.append((table, generation, ids))
+
+    def apply_db_changes(self):
+        """Drop memoised rows for barang changed since the last load (main thread)
+
+        Returns: list (table, generation, ids) yang baru saja diterapkan
+        """
+        changes = []
+        while self.pending_db_changes:
+            changes.append(self.pending_db_changes.pop(0))
+        for table, generation, ids in changes:
+            self.barang_formatter.invalidate(ids if table == 'barang' else None)
+        return changes
+
+    def on_window_destroy(self, event):
+        if event.widget is self.window and self.unsubscribe_db:
+            self.unsubscribe_db()
+            self.unsubscribe_db = None
     
     def get_scale_factor(self):
         """Calculate scale factor based on screen size"""
@@ -967,7 +1054,7 @@ class BarangWindow:
         
         self.upload_btn = tk.Button(
             upload_btn_frame,
-            text="⬆️ Upload ke Database",
+            text=UPLOAD_BUTTON_TEXT,
             font=('Arial', 12, 'bold'),
             bg='#27ae60',
             fg='white',
@@ -991,6 +1078,22 @@ class BarangWindow:
         self.make_button_keyboard_accessible(download_template_btn)
         download_template_btn.pack(side='left')
         
+        self.upload_cancel_btn = tk.Button(
+            upload_btn_frame,
+            text="⏹ Batal Upload",
+            font=('Arial', 12, 'bold'),
+            bg='#e74c3c',
+            fg='white',
+            padx=10,
+            pady=5,
+            command=self.cancel_upload,
+            state='disabled'
+        )
+        self.upload_cancel_btn.pack(side='left', padx=(15, 0))
+        
+        # Progress bar import, hanya tampil selama upload berjalan
+        self.upload_progress = ttk.Progressbar(upload_btn_frame, mode='determinate', length=250)
+        
         # Status label
         self.status_label = tk.Label(
             content_frame,
@@ -1171,7 +1274,11 @@ class BarangWindow:
             columns=columns,
             show='headings',
             height=12,
-            items_per_page=100  
+            items_per_page=100,
+            virtual=True,  # Scroll seluruh daftar tanpa halaman, item Tk tetap sebanyak baris terlihat
+            # Berat dari format_berat ('0,125'), harga 'Rp 1,500,000'
+            decimal_marks={column: DECIMAL_COMMA if column == 'Berat' else DECIMAL_POINT
+                           for column in columns[5:-2]}
         )
         
         
@@ -1241,7 +1348,6 @@ class BarangWindow:
         self.tree.pack(fill='both', expand=True)
         
         # Store original data for filtering
-        self.original_barang_data = []
         self.original_pengirim_data = []
         self.original_penerima_data = []
 
@@ -1295,11 +1401,6 @@ class BarangWindow:
             # Reload all data without filter
             self.load_barang()
             
-            # Update info label
-            if hasattr(self, 'info_label'):
-                total_count = len(self.original_barang_data) if hasattr(self, 'original_barang_data') else 0
-                self.info_label.config(text=f"💡 Menampilkan semua {total_count} barang")
-
             print("[OK] Filter cleared, showing all barang")
             
         except Exception as e:
@@ -1308,150 +1409,54 @@ class BarangWindow:
             traceback.print_exc()
         
     def filter_barang(self):
-        """Filter barang based on search criteria - OPTIMIZED VERSION"""
+        """Filter barang based on search criteria - filter lewat index pencarian in-memory"""
         try:
-            if not hasattr(self, 'original_barang_data') or not self.original_barang_data:
+            if getattr(self.tree, 'data_source', None) is None:
                 self.load_barang()  # Load data if not available
                 return
             
-            # Get search criteria
-            search_name = self.search_name_var.get().strip().lower()
-            filter_pengirim = self.filter_pengirim_var.get().strip().lower()
-            filter_penerima = self.filter_penerima_var.get().strip().lower()
-            
-            print(f"\n=== FILTERING BARANG ===")
-            print(f"Search name: '{search_name}'")
-            print(f"Filter pengirim: '{filter_pengirim}'")
-            print(f"Filter penerima: '{filter_penerima}'")
-            print(f"Total original data: {len(self.original_barang_data)}")
-            
-            # Filter data
-            filtered_data = []
-            
-            for barang in self.original_barang_data:
-                show_item = True
-                
-                # Extract values for filtering
-                if isinstance(barang, dict):
-                    nama_barang = str(barang.get('nama_barang', '')).lower()
-                    pengirim_name = str(barang.get('sender_name', '')).lower()
-                    penerima_name = str(barang.get('receiver_name', '')).lower()
-                else:
-                    # Fallback for tuple/list structure
-                    nama_barang = str(barang[3]).lower() if len(barang) > 3 else ''
-                    pengirim_name = str(barang[1]).lower() if len(barang) > 1 else ''
-                    penerima_name = str(barang[2]).lower() if len(barang) > 2 else ''
-                
-                # PERBAIKAN: Filter logic yang lebih robust
-                # 1. Check name filter (partial match, support multiple words)
-                if search_name:
-                    search_terms = search_name.split()
-                    name_match = all(term in nama_barang for term in search_terms)
-                    if not name_match:
-                        show_item = False
-                
-                # 2. Check pengirim filter (partial match)
-                if filter_pengirim and show_item:
-                    if filter_pengirim not in pengirim_name:
-                        show_item = False
-                
-                # 3. Check penerima filter (partial match)
-                if filter_penerima and show_item:
-                    if filter_penerima not in penerima_name:
-                        show_item = False
-                
-                if show_item:
-                    filtered_data.append(barang)
+            # Index basi jika barang/customers ditulis sejak dibangun: load ulang dengan filter baru
+            if self.barang_index_stamp != self.db.get_generations('barang', 'customers'):
+                self.load_barang()
+                return
             
-            print(f"Filtered result: {len(filtered_data)} items")
+            filters = self.get_barang_filters()
             
-            # Format filtered data for PaginatedTreeView
-            formatted_data = []
+            print(f"\n=== FILTERING BARANG ===")
+            print(f"Search name: '{filters['nama']}'")
+            print(f"Filter pengirim: '{filters['pengirim']}'")
+            print(f"Filter penerima: '{filters['penerima']}'")
             
-            for barang in filtered_data:
-                if isinstance(barang, dict):
-                    # Dictionary structure - format for display
-                    dimensi = f"{barang.get('panjang_barang', '-')}×{barang.get('lebar_barang', '-')}×{barang.get('tinggi_barang', '-')}"
-                    
-                    # Format currency
-                    def format_price(value):
-                        if value and value != '-':
-                            try:
-                                return f"Rp {float(value):,.0f}"
-                            except:
-                                return '-'
-                        return '-'
-                    
-                    harga_m3_pp = format_price(barang.get('m3_pp'))
-                    harga_m3_pd = format_price(barang.get('m3_pd'))
-                    harga_m3_dd = format_price(barang.get('m3_dd'))
-                    harga_ton_pp = format_price(barang.get('ton_pp'))
-                    harga_ton_pd = format_price(barang.get('ton_pd'))
-                    harga_ton_dd = format_price(barang.get('ton_dd'))
-                    harga_col_pp = format_price(barang.get('col_pp'))
-                    harga_col_pd = format_price(barang.get('col_pd'))
-                    harga_col_dd = format_price(barang.get('col_dd'))
-                    
-                    # Format date
-                    created_date = barang.get('created_at', '')[:10] if barang.get('created_at') else '-'
-                    
-                    # Create row tuple
-                    row_data = (
-                        barang.get('barang_id', ''),
-                        barang.get('sender_name', ''),
-                        barang.get('receiver_name', ''),
-                        barang.get('nama_barang', ''),
-                        dimensi,
-                        barang.get('m3_barang', '-'),
-                        barang.get('ton_barang', '-'),
-                        harga_m3_pp,
-                        harga_m3_pd,
-                        harga_m3_dd,
-                        harga_ton_pp,
-                        harga_ton_pd,
-                        harga_ton_dd,
-                        harga_col_pp,
-                        harga_col_pd,
-                        harga_col_dd,
-                        barang.get('pajak', '0'),
-                        created_date
-                    )
-                    
-                    formatted_data.append(row_data)
-                else:
-                    # List/tuple structure - add as is
-                    formatted_data.append(barang)
-
-            # Clear tree to prevent race condition with debouncing
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-
-            # Set filtered data to PaginatedTreeView
-            self.tree.set_data(formatted_data)
-            
-            # Update info label
-            total_count = len(self.original_barang_data)
-            filtered_count = len(filtered_data)
-            
-            if hasattr(self, 'info_label'):
-                if total_count != filtered_count:
-                    self.info_label.config(
-                        text=f"🔍 Menampilkan {filtered_count} dari {total_count} barang",
-                        fg='#3498db'
-                    )
-                else:
-                    self.info_label.config(
-                        text=f"💡 Menampilkan semua {total_count} barang",
-                        fg='#7f8c8d'
-                    )
+            # Widget hanya re-count dan mengambil halaman pertama hasil filter
+            self.tree.set_filters(filters)
+            self.update_barang_info_label()
 
-            print(f"[OK] Filter completed: {filtered_count}/{total_count} items displayed")
+            print(f"[OK] Filter completed: {self.tree.total_items} items matched")
 
         except Exception as e:
             print(f"[ERROR] Error in filter_barang: {str(e)}")
             import traceback
             traceback.print_exc()
             messagebox.showerror("Error", f"Gagal menerapkan filter: {str(e)}")
+    
+    def update_barang_info_label(self):
+        """Update info label with filtered/total barang count"""
+        if not hasattr(self, 'info_label'):
+            return
+        
+        filtered_count = self.tree.total_items
+        total_count = len(self.barang_index) if self.barang_index is not None else filtered_count
+        
+        if total_count != filtered_count:
+            self.info_label.config(
+                text=f"🔍 Menampilkan {filtered_count} dari {total_count} barang",
+                fg='#3498db'
+            )
+        else:
+            self.info_label.config(
+                text=f"💡 Menampilkan semua {total_count} barang",
+                fg='#7f8c8d'
+            )
               
     def update_barang(self):
         """Update selected barang"""
@@ -1464,45 +1469,8 @@ class BarangWindow:
         item = self.tree.item(selection[0])
         barang_id = item['values'][0]
         
-        # Find full barang data
-        selected_barang = None
-        for barang in self.original_barang_data:
-            # Handle both dictionary and list/tuple structures
-            if isinstance(barang, dict):
-                if barang['barang_id'] == barang_id:
-                    selected_barang = barang
-                    break
-            else:
-                # For list/tuple structure, ID is at index 0
-                if str(barang[0]) == str(barang_id):
-                    # Convert to dictionary structure for easier handling
-                    selected_barang = {
-                        'barang_id': barang[0] if len(barang) > 0 else '',
-                        'pengirim': barang[1] if len(barang) > 1 else '',
-                        'penerima': barang[2] if len(barang) > 2 else '',
-                        'nama_barang': barang[3] if len(barang) > 3 else '',
-                        'dimensi': barang[4] if len(barang) > 4 else '',
-                        'volume_barang': barang[5] if len(barang) > 5 else '',
-                        'berat_barang': barang[6] if len(barang) > 6 else '',
-                        'colli_barang': barang[7] if len(barang) > 7 else '',
-                        'harga_m3_pp': barang[8] if len(barang) > 8 else '',
-                        'harga_m3_pd': barang[9] if len(barang) > 9 else '',
-                        'harga_m3_dd': barang[10] if len(barang) > 10 else '',
-                        'harga_ton_pp': barang[11] if len(barang) > 11 else '',
-                        'harga_ton_pd': barang[12] if len(barang) > 12 else '',
-                        'harga_ton_dd': barang[13] if len(barang) > 13 else '',
-                        'harga_col_pp': barang[14] if len(barang) > 14 else '',
-                        'harga_col_pd': barang[15] if len(barang) > 15 else '',
-                        'harga_col_dd': barang[16] if len(barang) > 16 else '',
-                        'created_at': barang[17] if len(barang) > 17 else ''
-                    }
-                    # Parse dimensions if it's in "PxLxT" format
-                    if selected_barang['dimensi'] and '×' in selected_barang['dimensi']:
-                        dims = selected_barang['dimensi'].split('×')
-                        selected_barang['panjang_barang'] = dims[0] if len(dims) > 0 and dims[0] != '-' else ''
-                        selected_barang['lebar_barang'] = dims[1] if len(dims) > 1 and dims[1] != '-' else ''
-                        selected_barang['tinggi_barang'] = dims[2] if len(dims) > 2 and dims[2] != '-' else ''
-                    break
+        # Ambil data lengkap barang dari database (list hanya memuat halaman yang tampil)
+        selected_barang = self.db.get_barang_by_id(barang_id)
         
         print(f"Selected barang: {selected_barang}")
 
@@ -1516,11 +1484,9 @@ class BarangWindow:
     def save_changes(self, updated_barang):
         try:
             print(f"Updated data: {updated_barang}")
-            self.db.update_barang(updated_barang)
+            record = self.db.update_barang(updated_barang)
             messagebox.showinfo("Sukses", "Data barang berhasil disimpan!")
-            # Reset flag to ensure data reloads when switching tabs
-            self.list_tab_loaded = False
-            self.load_barang()
+            self.apply_barang_write(updated=[record] if record else [])
             self.load_pengirim_penerima_filter()  # Refresh filter options
         except Exception as e:
             print(f"Error saat menyimpan data: {e}")
@@ -2103,12 +2069,12 @@ class BarangWindow:
         
         try:
             # Delete from database
-            self.db.delete_barang(barang_id)
+            deleted_id = self.db.delete_barang(barang_id)
             
             messagebox.showinfo("Sukses", f"Barang '{nama_barang}' berhasil dihapus!")
             
-            # Refresh data
-            self.load_barang()
+            # Refresh hanya baris yang dihapus
+            self.apply_barang_write(removed=[deleted_id])
             if self.refresh_callback:
                 self.refresh_callback()
                 
@@ -2118,7 +2084,8 @@ class BarangWindow:
     def export_barang(self):
         """Export barang data to Excel - FIXED for pengirim-penerima system"""
         try:
-            if not self.original_barang_data:
+            barang_list = self.db.get_all_barang()
+            if not barang_list:
                 messagebox.showwarning("Peringatan", "Tidak ada data barang untuk diekspor!")
                 return
             
@@ -2134,37 +2101,30 @@ class BarangWindow:
             if not filename:
                 return
             
-            # Prepare data for export - UPDATED structure
-            export_data = []
-            for barang in self.original_barang_data:
-                # Format dimensions
-                dimensi = f"{barang.get('panjang_barang', '-')}×{barang.get('lebar_barang', '-')}×{barang.get('tinggi_barang', '-')}"
-                
-                export_data.append({
-                    'ID': barang.get('barang_id', ''),
-                    'Pengirim': barang.get('sender_name', ''),  # Updated field name
-                    'Penerima': barang.get('receiver_name', ''), # Updated field name
-                    'Nama Barang': barang.get('nama_barang', ''),
-                    'Dimensi (P×L×T cm)': dimensi,
-                    'Panjang (cm)': barang.get('panjang_barang', ''),
-                    'Lebar (cm)': barang.get('lebar_barang', ''),
-                    'Tinggi (cm)': barang.get('tinggi_barang', ''),
-                    'Volume (m³)': barang.get('m3_barang', ''),
-                    'Berat (ton)': barang.get('ton_barang', ''),
-                    
-                    # All pricing fields
-                    'Harga M³ PP (Rp)': barang.get('m3_pp', ''),
-                    'Harga M³ PD (Rp)': barang.get('m3_pd', ''),
-                    'Harga M³ DD (Rp)': barang.get('m3_dd', ''),
-                    'Harga Ton PP (Rp)': barang.get('ton_pp', ''),
-                    'Harga Ton PD (Rp)': barang.get('ton_pd', ''),
-                    'Harga Ton DD (Rp)': barang.get('ton_dd', ''),
-                    'Harga Colli PP (Rp)': barang.get('col_pp', ''),
-                    'Harga Colli PD (Rp)': barang.get('col_pd', ''),
-                    'Harga Colli DD (Rp)': barang.get('col_dd', ''),
-                    
-                    'Tanggal Dibuat': barang.get('created_at', '')[:19] if barang.get('created_at') else ''
-                })
+            # Prepare data for export - dibangun per kolom (bukan dict per baris)
+            def column(field):
+                return [barang.get(field, '') for barang in barang_list]
+            
+            export_data = {
+                'ID': column('barang_id'),
+                'Pengirim': column('sender_name'),
+                'Penerima': column('receiver_name'),
+                'Nama Barang': column('nama_barang'),
+                'Dimensi (P×L×T cm)': list(map(format_dimensi, barang_list)),
+                'Panjang (cm)': column('panjang_barang'),
+                'Lebar (cm)': column('lebar_barang'),
+                'Tinggi (cm)': column('tinggi_barang'),
+                'Volume (m³)': column('m3_barang'),
+                'Berat (ton)': column('ton_barang'),
+            }
+            
+            # All pricing fields
+            for header, field in EXPORT_PRICE_COLUMNS:
+                export_data[header] = column(field)
+            
+            export_data['Tanggal Dibuat'] = [
+                barang['created_at'][:19] if barang.get('created_at') else '' for barang in barang_list
+            ]
             
             # Create DataFrame and export
             df = pd.DataFrame(export_data)
@@ -2209,7 +2169,7 @@ class BarangWindow:
             messagebox.showinfo(
                 "Export Berhasil",
                 f"Data barang berhasil diekspor ke:\n{filename}\n\n" +
-                f"📊 Total: {len(export_data)} barang\n" +
+                f"📊 Total: {len(df)} barang\n" +
                 f"📋 Kolom: Pengirim, Penerima, Nama Barang, Dimensi, Harga lengkap"
             )
             
@@ -2493,10 +2453,8 @@ class BarangWindow:
             # Jika kosong, tampilkan semua
             self.pengirim_combo['values'] = self.original_pengirim_values
         else:
-            # Filter berdasarkan yang diketik
-            filtered = [item for item in self.original_pengirim_values 
-                    if typed in item.lower()]
-            self.pengirim_combo['values'] = filtered
+            # Filter berdasarkan yang diketik - prefix search lewat FTS5 index
+            self.pengirim_combo['values'] = self.db.search_names(typed, 'customer')
         
         # Buka dropdown untuk menampilkan hasil filter
         # self.pengirim_combo.event_generate('<Button-1>')
@@ -2517,10 +2475,8 @@ class BarangWindow:
             # Jika kosong, tampilkan semua
             self.filter_pengirim_combo['values'] = self.original_pengirim_filter_values
         else:
-            # Filter berdasarkan yang diketik
-            filtered = [item for item in self.original_pengirim_filter_values 
-                    if typed in item.lower()]
-            self.filter_pengirim_combo['values'] = filtered
+            # Filter berdasarkan yang diketik - prefix search lewat FTS5 index
+            self.filter_pengirim_combo['values'] = self.db.search_names(typed, 'customer')
 
     def filter_penerima(self, event):
         """Filter penerima combobox saat user mengetik"""
@@ -2534,10 +2490,8 @@ class BarangWindow:
             # Jika kosong, tampilkan semua
             self.penerima_combo['values'] = self.original_penerima_values
         else:
-            # Filter berdasarkan yang diketik
-            filtered = [item for item in self.original_penerima_values 
-                    if typed in item.lower()]
-            self.penerima_combo['values'] = filtered
+            # Filter berdasarkan yang diketik - prefix search lewat FTS5 index
+            self.penerima_combo['values'] = self.db.search_names(typed, 'customer')
         
         # Buka dropdown untuk menampilkan hasil filter
         # self.penerima_combo.event_generate('<Button-1>')
@@ -2558,21 +2512,21 @@ class BarangWindow:
             # Jika kosong, tampilkan semua
             self.filter_penerima_combo['values'] = self.original_penerima_filter_values
         else:
-            # Filter berdasarkan yang diketik
-            filtered = [item for item in self.original_penerima_filter_values 
-                    if typed in item.lower()]
-            self.filter_penerima_combo['values'] = filtered
+            # Filter berdasarkan yang diketik - prefix search lewat FTS5 index
+            self.filter_penerima_combo['values'] = self.db.search_names(typed, 'customer')
             
 
     def browse_file(self):
         """Browse for Excel file"""
         file_types = [
+            ('Excel / CSV files', '*.xlsx *.xls *.csv'),
             ('Excel files', '*.xlsx *.xls'),
+            ('CSV files', '*.csv'),
             ('All files', '*.*')
         ]
         
         filename = filedialog.askopenfilename(
-            title="Pilih File Excel",
+            title="Pilih File Excel / CSV",
             filetypes=file_types,
             parent=self.window
         )
@@ -2590,8 +2544,8 @@ class BarangWindow:
             for item in self.preview_tree.get_children():
                 self.preview_tree.delete(item)
             
-            # Read Excel file
-            df = pd.read_excel(filename, engine='openpyxl')
+            # Read only the first rows - file lengkap dibaca per chunk saat upload
+            df = read_import_preview(filename)
             print(f"📋 Columns found: {list(df.columns)}")
             
             # Clean column names
@@ -2709,10 +2663,10 @@ class BarangWindow:
             
             # ✅ UPDATED: Preview data with pengirim-penerima validation
             valid_rows = df.dropna(subset=[found_columns['pengirim'], found_columns['penerima'], found_columns['nama_barang']])
-            preview_data = valid_rows.head(50)
+            preview_data = valid_rows.head(PREVIEW_ROWS)
             
             # Get existing customers for validation
-            existing_customers = {c['nama_customer'].upper(): c['customer_id'] for c in self.db.get_all_customers()}
+            existing_customers = self.db.get_customer_name_map()
 
             preview_count = 0
             pengirim_errors = set()
@@ -2858,7 +2812,7 @@ class BarangWindow:
             basic_fields = [f for f in optional_fields if f in ['panjang', 'lebar', 'tinggi', 'm3', 'ton', 'colli']]
             pricing_fields = [f for f in optional_fields if 'harga' in f]
             
-            status_msg = f"✅ File berhasil dibaca: {preview_count} baris data\n\n"
+            status_msg = f"✅ File berhasil dibaca: preview {preview_count} baris pertama\n\n"
             status_msg += f"📋 Kolom wajib: {', '.join([found_columns[f] for f in required_fields_found])}\n"
             
             if basic_fields:
@@ -3217,118 +3171,8 @@ class BarangWindow:
                 'row_index': row_index
             }
 
-    def validate_excel_row_enhanced(self, row, column_mapping, existing_customers, row_number):
-        """Enhanced validation for Excel row with better error handling - UPDATED"""
-        errors = []
-        result = {
-            'valid': False, 
-            'errors': [], 
-            'row_number': row_number,
-            'pengirim_name': '',
-            'penerima_name': '',
-            'pengirim_id': None,
-            'penerima_id': None,
-            'nama_barang': ''
-        }
-        
-        try:
-            # ✅ UPDATED: Get pengirim
-            pengirim_name = str(row.get(column_mapping.get('pengirim', ''), '')).strip()
-            print(f"Validating row {row_number}: Pengirim='{pengirim_name}'")
-            if not pengirim_name or pengirim_name.upper() == 'NAN':
-                errors.append("Pengirim tidak boleh kosong")
-            else:
-                pengirim_id = existing_customers.get(pengirim_name.upper())
-                if not pengirim_id:
-                    errors.append(f"Pengirim '{pengirim_name}' tidak ditemukan di database")
-                else:
-                    result['pengirim_id'] = pengirim_id
-                    result['pengirim_name'] = pengirim_name
-            
-            # ✅ UPDATED: Get penerima
-            penerima_name = str(row.get(column_mapping.get('penerima', ''), '')).strip()
-            if not penerima_name or penerima_name.upper() == 'NAN':
-                errors.append("Penerima tidak boleh kosong")
-            else:
-                penerima_id = existing_customers.get(penerima_name.upper())
-                if not penerima_id:
-                    errors.append(f"Penerima '{penerima_name}' tidak ditemukan di database")
-                else:
-                    result['penerima_id'] = penerima_id
-                    result['penerima_name'] = penerima_name
-            
-            # Get nama barang
-            nama_barang = str(row.get(column_mapping.get('nama_barang', ''), '')).strip()
-            if not nama_barang or nama_barang.upper() == 'NAN':
-                errors.append("Nama barang tidak boleh kosong")
-            else:
-                result['nama_barang'] = nama_barang
-            
-            # ✅ UPDATED: Validate numeric fields (optional) - Enhanced validation
-            numeric_fields = {
-                'panjang': ('Panjang', 'float'),
-                'lebar': ('Lebar', 'float'),
-                'tinggi': ('Tinggi', 'float'),
-                'm3': ('Volume M³', 'float'),
-                'ton': ('Berat Ton', 'float'),
-                'colli': ('Colli', 'int')
-            }
-            
-            for field, (field_name, data_type) in numeric_fields.items():
-                if field in column_mapping:
-                    value = row.get(column_mapping[field])
-                    if pd.notna(value) and str(value).strip() != '' and str(value).upper() != 'NAN':
-                        try:
-                            clean_value = str(value).replace(',', '').replace(' ', '')
-                            if data_type == 'int':
-                                test_val = int(float(clean_value))
-                                if test_val <= 0:
-                                    errors.append(f"{field_name} harus lebih besar dari 0")
-                            else:
-                                test_val = float(clean_value)
-                                if test_val <= 0:
-                                    errors.append(f"{field_name} harus lebih besar dari 0")
-                        except (ValueError, TypeError):
-                            errors.append(f"{field_name} harus berupa angka valid (ditemukan: '{value}')")
-            
-            # ✅ UPDATED: Validate pricing fields
-            pricing_fields = [
-                'harga_m3_pp', 'harga_m3_pd', 'harga_m3_dd',
-                'harga_ton_pp', 'harga_ton_pd', 'harga_ton_dd', 
-                'harga_col_pp', 'harga_col_pd', 'harga_col_dd',
-                'harga_m3', 'harga_ton', 'harga_coll'  # Legacy support
-            ]
-            
-            has_valid_price = False
-            for field in pricing_fields:
-                if field in column_mapping:
-                    value = row.get(column_mapping[field])
-                    if pd.notna(value) and str(value).strip() != '' and str(value).upper() != '-':
-                        try:
-                            clean_value = str(value).replace(',', '').replace(' ', '').replace('Rp', '')
-                            test_price = float(clean_value)
-                            if test_price > 0:
-                                has_valid_price = True
-                            elif test_price <= 0:
-                                errors.append(f"Harga {field} harus lebih besar dari 0")
-                        except (ValueError, TypeError):
-                            errors.append(f"Format harga {field} tidak valid (ditemukan: '{value}')")
-            
-            # Business rules
-            if pengirim_name and penerima_name and pengirim_name.upper() == penerima_name.upper():
-                errors.append("Pengirim dan Penerima tidak boleh sama")
-            
-            result['errors'] = errors
-            result['valid'] = len(errors) == 0
-            
-            return result
-            
-        except Exception as e:
-            result['errors'] = [f"Error validasi: {str(e)}"]
-            return result
-        
     def upload_excel_data(self):
-        """Upload Excel data with enhanced validation and error handling - CLEANED VERSION"""
+        """Upload Excel data - baca/validasi/insert berjalan di worker thread, UI tetap responsif"""
         filename = self.file_path_var.get()
         if not filename:
             messagebox.showerror("Error", "Pilih file Excel terlebih dahulu!")
@@ -3339,283 +3183,280 @@ class BarangWindow:
             messagebox.showerror("Error", f"File tidak ditemukan: {filename}")
             return
         
-        # Disable upload button during process
-        original_btn_text = self.upload_btn.cget('text')
-        self.upload_btn.config(state='disabled', text="Processing...")
+        if self.upload_task is not None and self.upload_task.is_running():
+            return
+        
+        column_mapping = getattr(self, 'column_mapping', {})
+        if not column_mapping:
+            self.on_upload_failed(ValueError(
+                "Column mapping tidak tersedia. Silakan preview file terlebih dahulu dengan klik 'Browse' dan pilih file."
+            ), [])
+            return
+        
+        print(f"Starting barang upload from file: {filename}")
+        self.upload_filename = filename
+        self.upload_timings = []
+        self.set_upload_busy(True)
         self.status_label.config(text="Memproses file Excel...", fg='#3498db')
-        self.window.update()
         
-        try:
-            print(f"Starting barang upload from file: {filename}")
-
-            # Step 1: Read and validate Excel file
+        self.upload_task = BackgroundTask(
+            self.window,
+            lambda task: self.run_upload_validation(task, filename, dict(column_mapping)),
+            on_progress=self.on_upload_progress,
+            on_done=self.on_upload_validated,
+            on_error=self.on_upload_failed,
+            on_cancelled=self.on_upload_cancelled,
+            cleanup=self.db.pool.release,
+            name="barang-import-validate"
+        ).start()
+
+    def set_upload_busy(self, busy):
+        """Toggle upload controls while a background import is running"""
+        if busy:
+            self.upload_btn.config(state='disabled', text="Processing...")
+            self.upload_cancel_btn.config(state='normal')
+            self.upload_progress.pack(side='left', padx=(15, 0))
+        else:
+            self.upload_btn.config(state='normal', text=UPLOAD_BUTTON_TEXT)
+            self.upload_cancel_btn.config(state='disabled')
+            self.upload_progress.stop()
+            self.upload_progress.config(mode='determinate', value=0)
+            self.upload_progress.pack_forget()
+
+    def cancel_upload(self):
+        """Cancel the running import; batch insert yang sedang berjalan di-rollback"""
+        if self.upload_task is not None and self.upload_task.is_running():
+            self.upload_task.cancel()
+            self.upload_cancel_btn.config(state='disabled')
+            self.status_label.config(text="Membatalkan upload...", fg='#95a5a6')
+
+    def on_upload_progress(self, stage, done, total):
+        """Update status label and progress bar from worker progress events"""
+        label = UPLOAD_STAGE_LABELS.get(stage, "Memproses file Excel...")
+        if total:
+            if str(self.upload_progress.cget('mode')) != 'determinate':
+                self.upload_progress.stop()
+                self.upload_progress.config(mode='determinate')
+            self.upload_progress.config(maximum=total, value=done)
+            label = f"{label} ({done}/{total})"
+        else:
+            if done is not None:
+                label = f"{label} ({done} baris)"
+            if str(self.upload_progress.cget('mode')) != 'indeterminate':
+                self.upload_progress.config(mode='indeterminate')
+                self.upload_progress.start(15)
+        self.status_label.config(text=label, fg='#3498db')
+
+    @staticmethod
+    def format_upload_timings(timings):
+        """Format stage timings as 'baca 1.2s, validasi 0.3s'"""
+        return ", ".join(f"{UPLOAD_STAGE_NAMES.get(stage, stage)} {seconds:.1f}s" for stage, seconds in timings)
+
+    def read_upload_chunks(self, filename):
+        """Yield import file chunks; kegagalan membaca file dilaporkan sebagai ValueError"""
+        chunks = read_import_chunks(filename)
+        while True:
             try:
-                self.status_label.config(text="Membaca file Excel...", fg='#3498db')
-                self.window.update()
-                
-                df = pd.read_excel(filename, engine='openpyxl')
-                if df.empty:
-                    raise ValueError("File Excel kosong atau tidak memiliki data")
-                
-                # ✅ ENHANCED: Clean and validate data
-                df.columns = df.columns.astype(str).str.strip()
-                
-                # Remove completely empty rows
-                df = df.dropna(how='all')
-                
-                if df.empty:
-                    raise ValueError("File Excel tidak memiliki data yang valid (semua baris kosong)")
-                
-                print(f"Found {len(df)} rows in Excel file (after removing empty rows)")
-                
+                chunk = next(chunks, None)
             except Exception as e:
                 raise ValueError(f"Gagal membaca file Excel: {str(e)}")
-            
-            # Step 2: Check column mapping
-            column_mapping = getattr(self, 'column_mapping', {})
-            if not column_mapping:
-                raise ValueError("Column mapping tidak tersedia. Silakan preview file terlebih dahulu dengan klik 'Browse' dan pilih file.")
-            
-            # ✅ ENHANCED: Validate required columns exist and accessible
-            required_fields = ['pengirim', 'penerima', 'nama_barang']
-            missing_fields = []
-            invalid_columns = []
-            
-            for field in required_fields:
-                if field not in column_mapping:
-                    missing_fields.append(field)
-                elif column_mapping[field] not in df.columns:
-                    invalid_columns.append(f"{field} -> {column_mapping[field]}")
-            
-            if missing_fields:
-                raise ValueError(f"Kolom wajib tidak ditemukan dalam mapping: {', '.join(missing_fields)}")
-            
-            if invalid_columns:
-                raise ValueError(f"Kolom mapped tidak ada dalam file Excel: {', '.join(invalid_columns)}")
-            
-            # Step 3: Get existing customers (pengirim & penerima)
-            self.status_label.config(text="Memvalidasi data customer...", fg='#3498db')
-            self.window.update()
+            if chunk is None:
+                return
+            yield chunk
+
+    def run_upload_validation(self, task, filename, column_mapping):
+        """Worker thread: stream the file chunk by chunk and validate every row
 
+        Record hasil validasi tidak disimpan (hanya error dan jumlahnya) supaya
+        memori tetap konstan; file dibaca ulang saat insert.
+        """
+        # Step 1: Get existing customers (pengirim & penerima)
+        with task.stage('customers'):
             try:
-                existing_customers = {c['nama_customer'].upper(): c['customer_id'] for c in self.db.get_all_customers()}
+                existing_customers = self.db.get_customer_name_map()
                 print(f"Found {len(existing_customers)} existing customers in database")
 
-
                 if not existing_customers:
                     raise ValueError("Tidak ada customer yang terdaftar dalam database. Silakan tambahkan customer terlebih dahulu.")
                 
             except Exception as e:
                 raise ValueError(f"Gagal mengambil data customer: {str(e)}")
-            
-            # Step 4: Filter and validate data
-            self.status_label.config(text="Memfilter data valid...", fg='#3498db')
-            self.window.update()
-            
-            # Filter rows with required data - more thorough checking
-            required_cols = [column_mapping['pengirim'], column_mapping['penerima'], column_mapping['nama_barang']]
-            
-            # Check each required column individually for better error reporting
-            for col in required_cols:
-                if col not in df.columns:
-                    raise ValueError(f"Kolom '{col}' tidak ditemukan dalam file Excel")
-            
-            # Filter valid rows
-            valid_rows = df.dropna(subset=required_cols)
-            
-            # ✅ ENHANCED: Additional filtering for meaningful data
-            def is_meaningful_value(value):
-                if pd.isna(value):
-                    return False
-                str_val = str(value).strip().upper()
-                return str_val not in ['', 'NAN', 'NONE', 'NULL', '#N/A', '#NULL!']
-            
-            # Further filter rows with meaningful data
-            meaningful_rows = []
-            for _, row in valid_rows.iterrows():
-                if (is_meaningful_value(row[column_mapping['pengirim']]) and 
-                    is_meaningful_value(row[column_mapping['penerima']]) and 
-                    is_meaningful_value(row[column_mapping['nama_barang']])):
-                    meaningful_rows.append(row)
-            
-            if not meaningful_rows:
-                raise ValueError(
-                    "Tidak ada data valid untuk diupload!\n\n" +
-                    "Pastikan kolom Pengirim, Penerima, dan Nama Barang terisi dengan data yang valid.\n" +
-                    f"Total baris dalam file: {len(df)}\n" +
-                    f"Baris dengan data tidak kosong: {len(valid_rows)}\n" +
-                    f"Baris dengan data bermakna: {len(meaningful_rows)}"
-                )
-            
-            valid_rows = pd.DataFrame(meaningful_rows)
-            print(f"Processing {len(valid_rows)} valid rows (filtered from {len(df)} total rows)")
-            
-            # Step 5: Detailed validation with progress
-            self.status_label.config(text="Memvalidasi data barang...", fg='#3498db')
-            self.window.update()
-            
-            validation_errors = []
-            customer_not_found_list = []
-            valid_data_for_upload = []
-            
-            for idx, (_, row) in enumerate(valid_rows.iterrows()):
-                try:
-                    validation_result = self.validate_excel_row_enhanced(
-                        row, column_mapping, existing_customers,idx + 2
-                    )
-                    
-                    print(f"Validation result: {validation_result}")
-                    
-                    if validation_result['valid']:
-                        valid_data_for_upload.append((idx, row, validation_result))
-                    else:
-                        # ✅ ENHANCED: Better error categorization
-                        customer_errors = [e for e in validation_result['errors'] 
-                                        if any(keyword in e.lower() for keyword in ['tidak ditemukan', 'tidak terdaftar', 'not found'])]
-                        other_errors = [e for e in validation_result['errors'] 
-                                    if not any(keyword in e.lower() for keyword in ['tidak ditemukan', 'tidak terdaftar', 'not found'])]
-                        
-                        if customer_errors:
-                            customer_not_found_list.append({
-                                'nama_barang': validation_result.get('nama_barang', 'N/A'),
-                                'pengirim': validation_result.get('pengirim_name', 'N/A'),
-                                'penerima': validation_result.get('penerima_name', 'N/A'),
-                                'row_number': idx + 2,
-                                'errors': customer_errors
-                            })
-                        
-                        if other_errors:
-                            validation_errors.append({
-                                'nama_barang': validation_result.get('nama_barang', 'N/A'),
-                                'pengirim': validation_result.get('pengirim_name', 'N/A'),
-                                'penerima': validation_result.get('penerima_name', 'N/A'),
-                                'error': '; '.join(other_errors),
-                                'row_number': idx + 2
-                            })
-                            
-                except Exception as e:
-                    print(f"Validation exception at row {idx + 2}: {str(e)}")
-                    validation_errors.append({
-                        'nama_barang': str(row.get(column_mapping.get('nama_barang', ''), 'N/A'))[:50],
-                        'pengirim': str(row.get(column_mapping.get('pengirim', ''), 'N/A'))[:30],
-                        'penerima': str(row.get(column_mapping.get('penerima', ''), 'N/A'))[:30],
-                        'error': f"Validation exception: {str(e)}",
-                        'row_number': idx + 2
-                    })
-            
-            # Step 6: Handle validation errors with detailed reporting
-            total_errors = len(validation_errors) + len(customer_not_found_list)
-            if total_errors > 0:
-                self.status_label.config(
-                    text=f"Ditemukan {total_errors} error validasi!", 
-                    fg='#e74c3c'
-                )
-                
-                # ✅ ENHANCED: More informative error dialog
-                error_summary = (
-                    f"HASIL VALIDASI:\n\n"
-                    f"Data valid siap upload: {len(valid_data_for_upload)}\n"
-                    f"Customer tidak ditemukan: {len(customer_not_found_list)}\n"
-                    f"Error validasi lainnya: {len(validation_errors)}\n"
-                    f"Total baris diproses: {len(valid_rows)}\n\n"
-                )
+        
+        # Step 2: Read and validate the file chunk by chunk
+        file_rows = 0
+        row_stats = {'total_rows': 0, 'non_empty_rows': 0, 'meaningful_rows': 0}
+        valid_count = 0
+        validation_errors = []
+        customer_not_found = []
+        
+        with task.stage('validate'):
+            for chunk in self.read_upload_chunks(filename):
+                if task.cancelled():
+                    return None
                 
-                if customer_not_found_list:
-                    # Show sample of missing customers
-                    sample_missing = list(set([item['pengirim'] for item in customer_not_found_list[:3]] + 
-                                            [item['penerima'] for item in customer_not_found_list[:3]]))
-                    error_summary += f"Contoh customer tidak ditemukan: {', '.join(sample_missing[:5])}\n\n"
+                file_rows += len(chunk)
+                valid_rows, chunk_stats = prepare_import_frame(chunk, column_mapping)
+                for key, value in chunk_stats.items():
+                    row_stats[key] += value
                 
-                error_summary += "Lihat detail lengkap error?"
+                if not valid_rows.empty:
+                    chunk_result = validate_import_frame(valid_rows, column_mapping, existing_customers)
+                    valid_count += len(chunk_result['records'])
+                    validation_errors.extend(chunk_result['validation_errors'])
+                    customer_not_found.extend(chunk_result['customer_not_found'])
                 
-                if messagebox.askyesno("Hasil Validasi", error_summary):
-                    self.show_enhanced_error_details(
-                        validation_errors, 
-                        customer_not_found_list, 
-                        0,  # success_count = 0 karena belum upload
-                        len(valid_rows)
-                    )
-                return
-            
-            # Step 7: Confirm upload with detailed summary
-            self.status_label.config(text="Semua data valid! Siap upload...", fg='#27ae60')
-            
-            # ✅ ENHANCED: More informative confirmation dialog
-            confirmation_msg = (
-                f"VALIDASI BERHASIL!\n\n"
-                f"Total barang siap upload: {len(valid_data_for_upload)}\n"
-                f"File: {os.path.basename(filename)}\n\n"
-                f"Lanjutkan upload ke database?"
+                task.report(file_rows)
+        
+        if file_rows == 0:
+            raise ValueError("Gagal membaca file Excel: File Excel kosong atau tidak memiliki data")
+        
+        if row_stats['total_rows'] == 0:
+            raise ValueError("Gagal membaca file Excel: File Excel tidak memiliki data yang valid (semua baris kosong)")
+        
+        if row_stats['meaningful_rows'] == 0:
+            raise ValueError(
+                "Tidak ada data valid untuk diupload!\n\n" +
+                "Pastikan kolom Pengirim, Penerima, dan Nama Barang terisi dengan data yang valid.\n" +
+                f"Total baris dalam file: {row_stats['total_rows']}\n" +
+                f"Baris dengan data tidak kosong: {row_stats['non_empty_rows']}\n" +
+                f"Baris dengan data bermakna: {row_stats['meaningful_rows']}"
             )
-            
-            if not messagebox.askyesno("Konfirmasi Upload", confirmation_msg):
-                self.status_label.config(text="Upload dibatalkan oleh user", fg='#95a5a6')
-                return
-            
-            # Step 8: Upload to database with BATCH INSERT for better performance
-            self.status_label.config(text="Menyiapkan data untuk batch upload...", fg='#3498db')
-            self.window.update()
-
-            # ✅ NEW: Prepare all data for batch insert
-            barang_batch_list = []
-            batch_metadata = []  # Store metadata for error reporting
-
-            for idx, (original_idx, row, validation_data) in enumerate(valid_data_for_upload):
-                try:
-                    # Get validated data
-                    pengirim_id = validation_data['pengirim_id']
-                    penerima_id = validation_data['penerima_id']
-                    nama_barang = validation_data['nama_barang']
-
-                    # Extract all fields with enhanced error handling
-                    extracted_data = self.extract_row_data(row, column_mapping)
-
-                    # Combine into single dict for batch insert
-                    barang_dict = {
-                        'pengirim': pengirim_id,
-                        'penerima': penerima_id,
-                        'nama_barang': nama_barang,
-                        **extracted_data
-                    }
-
-                    barang_batch_list.append(barang_dict)
-                    batch_metadata.append({
-                        'original_idx': original_idx,
-                        'validation_data': validation_data
-                    })
-
-                except Exception as e:
-                    print(f"Error preparing barang data at index {idx}: {str(e)}")
+        
+        print(f"Validated {row_stats['meaningful_rows']} rows (from {row_stats['total_rows']} total rows), {valid_count} valid")
+        
+        return {
+            'filename': filename,
+            'column_mapping': column_mapping,
+            'existing_customers': existing_customers,
+            'valid_count': valid_count,
+            'processed_rows': row_stats['meaningful_rows'],
+            'validation_errors': validation_errors,
+            'customer_not_found': customer_not_found,
+        }
 
-            # ✅ NEW: Perform batch insert in single transaction
-            print(f"Starting batch insert of {len(barang_batch_list)} items...")
+    def on_upload_validated(self, import_result, timings):
+        """Main thread: report validation errors or confirm, then start the batch insert"""
+        self.upload_timings = timings
+        if import_result is None:
+            self.on_upload_cancelled(timings)
+            return
+        
+        print(f"Upload validation timings: {self.format_upload_timings(timings)}")
+        valid_count = import_result['valid_count']
+        validation_errors = import_result['validation_errors']
+        customer_not_found_list = import_result['customer_not_found']
+        
+        # Step 4: Handle validation errors with detailed reporting
+        total_errors = len(validation_errors) + len(customer_not_found_list)
+        if total_errors > 0:
+            self.set_upload_busy(False)
             self.status_label.config(
-                text=f"Mengupload {len(barang_batch_list)} barang ke database...",
-                fg='#3498db'
+                text=f"Ditemukan {total_errors} error validasi!", 
+                fg='#e74c3c'
             )
-            self.window.update()
-
+            
+            # ✅ ENHANCED: More informative error dialog
+            error_summary = (
+                f"HASIL VALIDASI:\n\n"
+                f"Data valid siap upload: {valid_count}\n"
+                f"Customer tidak ditemukan: {len(customer_not_found_list)}\n"
+                f"Error validasi lainnya: {len(validation_errors)}\n"
+                f"Total baris diproses: {import_result['processed_rows']}\n\n"
+            )
+            
+            if customer_not_found_list:
+                # Show sample of missing customers
+                sample_missing = list(set([item['pengirim'] for item in customer_not_found_list[:3]] + 
+                                        [item['penerima'] for item in customer_not_found_list[:3]]))
+                error_summary += f"Contoh customer tidak ditemukan: {', '.join(sample_missing[:5])}\n\n"
+            
+            error_summary += "Lihat detail lengkap error?"
+            
+            if messagebox.askyesno("Hasil Validasi", error_summary):
+                self.show_enhanced_error_details(
+                    validation_errors, 
+                    customer_not_found_list, 
+                    0,  # success_count = 0 karena belum upload
+                    import_result['processed_rows']
+                )
+            return
+        
+        # Step 5: Confirm upload with detailed summary
+        self.status_label.config(text="Semua data valid! Siap upload...", fg='#27ae60')
+        
+        # ✅ ENHANCED: More informative confirmation dialog
+        confirmation_msg = (
+            f"VALIDASI BERHASIL!\n\n"
+            f"Total barang siap upload: {valid_count}\n"
+            f"File: {os.path.basename(self.upload_filename)}\n\n"
+            f"Lanjutkan upload ke database?"
+        )
+        
+        if not messagebox.askyesno("Konfirmasi Upload", confirmation_msg):
+            self.set_upload_busy(False)
+            self.status_label.config(text="Upload dibatalkan oleh user", fg='#95a5a6')
+            return
+        
+        # Step 6: Batch insert in a single transaction on the worker thread
+        print(f"Starting batch insert of {valid_count} items...")
+        self.upload_task = BackgroundTask(
+            self.window,
+            lambda task: self.run_upload_insert(task, import_result),
+            on_progress=self.on_upload_progress,
+            on_done=self.on_upload_inserted,
+            on_error=self.on_upload_failed,
+            on_cancelled=self.on_upload_cancelled,
+            cleanup=self.db.pool.release,
+            name="barang-import-insert"
+        ).start()
+
+    def run_upload_insert(self, task, import_result):
+        """Worker thread: re-stream the file and insert valid rows per chunk; cancel membuang seluruh batch"""
+        column_mapping = import_result['column_mapping']
+        existing_customers = import_result['existing_customers']
+        customer_names = {customer_id: name for name, customer_id in existing_customers.items()}
+        # Baris yang berubah jadi tidak valid sejak validasi (file diedit saat upload)
+        late_errors = []
+        
+        def record_chunks():
+            for chunk in self.read_upload_chunks(import_result['filename']):
+                valid_rows, _ = prepare_import_frame(chunk, column_mapping)
+                if valid_rows.empty:
+                    continue
+                chunk_result = validate_import_frame(valid_rows, column_mapping, existing_customers)
+                late_errors.extend(chunk_result['validation_errors'])
+                late_errors.extend({**error, 'error': '; '.join(error['errors'])}
+                                   for error in chunk_result['customer_not_found'])
+                yield chunk_result['records']
+        
+        with task.stage('insert'):
             try:
-                batch_result = self.db.create_barang_batch(barang_batch_list)
+                batch_result = self.db.create_barang_chunks(
+                    record_chunks(),
+                    total=import_result['valid_count'],
+                    cancel_event=task.cancel_event,
+                    progress_callback=task.report
+                )
 
                 success_count = batch_result['success_count']
-                upload_errors = []
+                upload_errors = list(late_errors)
 
                 # Convert batch errors to upload error format
                 for error_info in batch_result['errors']:
-                    idx = error_info['index']
-                    if idx < len(batch_metadata):
-                        metadata = batch_metadata[idx]
-                        upload_errors.append({
-                            'nama_barang': error_info['nama_barang'][:50],
-                            'pengirim': metadata['validation_data'].get('pengirim_name', 'N/A')[:30],
-                            'penerima': metadata['validation_data'].get('penerima_name', 'N/A')[:30],
-                            'error': f"Database error: {error_info['error']}"[:200],
-                            'row_number': metadata['original_idx'] + 2
-                        })
+                    record = error_info['data']
+                    upload_errors.append({
+                        'nama_barang': error_info['nama_barang'][:50],
+                        'pengirim': customer_names.get(record.get('pengirim'), 'N/A')[:30],
+                        'penerima': customer_names.get(record.get('penerima'), 'N/A')[:30],
+                        'error': f"Database error: {error_info['error']}"[:200],
+                        'row_number': record.get('row_number', 0)
+                    })
 
                 print(f"Batch insert completed: {success_count} success, {len(upload_errors)} failed")
 
+            except OperationCancelled:
+                raise
+
             except Exception as e:
                 # If batch insert completely fails, treat all as errors
                 print(f"Batch insert failed completely: {str(e)}")
@@ -3627,123 +3468,86 @@ class BarangWindow:
                     'error': f"Batch insert failed: {str(e)}"[:200],
                     'row_number': 0
                 }]
-            
-            # Step 9: Show comprehensive results
-            if upload_errors:
-                self.status_label.config(
-                    text=f"Upload selesai: {success_count} berhasil, {len(upload_errors)} error",
-                    fg='#f39c12'
-                )
-                self.show_enhanced_error_details(
-                    upload_errors, [], success_count, len(valid_data_for_upload)
-                )
-            else:
-                self.status_label.config(
-                    text=f"Upload berhasil! {success_count} barang ditambahkan",
-                    fg='#27ae60'
-                )
-                
-                # ✅ ENHANCED: More detailed success message
-                success_msg = (
-                    f"UPLOAD BERHASIL!\n\n"
-                    f"Total berhasil: {success_count} barang\n"
-                    f"File: {os.path.basename(filename)}\n\n"
-                    f"Data telah tersimpan dalam database."
-                )
-                
-                messagebox.showinfo("Upload Berhasil!", success_msg)
-            
-            # Step 10: Refresh and cleanup
-            try:
-                self.load_barang()
-                if hasattr(self, 'refresh_callback') and self.refresh_callback:
-                    self.refresh_callback()
-            except Exception as e:
-                print(f"Warning: Failed to refresh data: {str(e)}")
-                    
-        except Exception as e:
-            error_msg = str(e)
-            print(f"Fatal error during upload: {error_msg}")
-            
+        
+        return {
+            'success_count': success_count,
+            'upload_errors': upload_errors,
+            'total_count': import_result['valid_count']
+        }
+
+    def on_upload_inserted(self, insert_result, timings):
+        """Main thread: show upload results and refresh the list"""
+        self.set_upload_busy(False)
+        timings = self.upload_timings + timings
+        timing_text = self.format_upload_timings(timings)
+        print(f"Upload timings: {timing_text}")
+        
+        success_count = insert_result['success_count']
+        upload_errors = insert_result['upload_errors']
+        
+        # Step 7: Show comprehensive results
+        if upload_errors:
             self.status_label.config(
-                text=f"Error: {error_msg[:80]}...",
-                fg='#e74c3c'
+                text=f"Upload selesai: {success_count} berhasil, {len(upload_errors)} error ({timing_text})",
+                fg='#f39c12'
             )
-            
-            # ✅ ENHANCED: Better error dialog with troubleshooting tips
-            error_dialog = (
-                f"GAGAL UPLOAD DATA\n\n"
-                f"Error: {error_msg}\n\n"
-                f"TIPS MENGATASI:\n"
-                f"• Pastikan file Excel tidak sedang dibuka\n"
-                f"• Periksa format data dalam file Excel\n"
-                f"• Pastikan customer Pengirim & Penerima sudah terdaftar\n"
-                f"• Coba preview file terlebih dahulu\n"
-                f"• Gunakan template Excel yang disediakan"
+            self.show_enhanced_error_details(
+                upload_errors, [], success_count, insert_result['total_count']
+            )
+        else:
+            self.status_label.config(
+                text=f"Upload berhasil! {success_count} barang ditambahkan ({timing_text})",
+                fg='#27ae60'
             )
             
-            messagebox.showerror("Error Upload", error_dialog)
-            
-        finally:
-            # ✅ ENHANCED: Always restore button state
-            self.upload_btn.config(state='normal', text=original_btn_text)
-
-    def extract_row_data(self, row, column_mapping):
-        """Extract and convert row data with proper type handling"""
-        def get_safe_value(field_name, value_type='str', default_value=None):
-            if field_name not in column_mapping:
-                return default_value
-            
-            value = row.get(column_mapping[field_name])
-            if pd.isna(value) or str(value).strip() == '' or str(value).upper() == 'NAN':
-                return default_value
+            # ✅ ENHANCED: More detailed success message
+            success_msg = (
+                f"UPLOAD BERHASIL!\n\n"
+                f"Total berhasil: {success_count} barang\n"
+                f"File: {os.path.basename(self.upload_filename)}\n\n"
+                f"Data telah tersimpan dalam database."
+            )
             
-            try:
-                if value_type == 'float':
-                    # Handle comma separated numbers (Indonesian format)
-                    if str(value).strip() == "-":
-                        return default_value
-                    
-                    if isinstance(value, str):
-                        value = value.replace(',', '').replace(' ', '')
-                    return float(str(value).strip()) if str(value).strip() else default_value
-                elif value_type == 'int':
-                    if isinstance(value, str):
-                        value = value.replace(',', '').replace(' ', '')
-                    return int(float(str(value).strip())) if str(value).strip() else default_value
-                else:
-                    return str(value).strip() if str(value).strip() else default_value
-            except Exception as e:
-                raise ValueError(f"Format {field_name} tidak valid: '{value}' - {str(e)}")
+            messagebox.showinfo("Upload Berhasil!", success_msg)
         
-        return {
-            'panjang_barang': get_safe_value('panjang', 'float'),
-            'lebar_barang': get_safe_value('lebar', 'float'),
-            'tinggi_barang': get_safe_value('tinggi', 'float'),
-            'm3_barang': get_safe_value('m3', 'float'),
-            'ton_barang': get_safe_value('ton', 'float'),
-            # Pricing fields
-            'm3_pp': get_safe_value('harga_m3_pp', 'float'),
-            'm3_pd': get_safe_value('harga_m3_pd', 'float'),
-            'm3_dd': get_safe_value('harga_m3_dd', 'float'),
-            'ton_pp': get_safe_value('harga_ton_pp', 'float'),
-            'ton_pd': get_safe_value('harga_ton_pd', 'float'),
-            'ton_dd': get_safe_value('harga_ton_dd', 'float'),
-            'col_pp': get_safe_value('harga_col_pp', 'float'),
-            'col_pd': get_safe_value('harga_col_pd', 'float'),
-            'col_dd': get_safe_value('harga_col_dd', 'float'),
-            # Container size-specific pricing
-            'container_20_pp': get_safe_value('harga_container_20_pp', 'float'),
-            'container_20_pd': get_safe_value('harga_container_20_pd', 'float'),
-            'container_20_dd': get_safe_value('harga_container_20_dd', 'float'),
-            'container_21_pp': get_safe_value('harga_container_21_pp', 'float'),
-            'container_21_pd': get_safe_value('harga_container_21_pd', 'float'),
-            'container_21_dd': get_safe_value('harga_container_21_dd', 'float'),
-            'container_40hc_pp': get_safe_value('harga_container_40hc_pp', 'float'),
-            'container_40hc_pd': get_safe_value('harga_container_40hc_pd', 'float'),
-            'container_40hc_dd': get_safe_value('harga_container_40hc_dd', 'float'),
-            'pajak': get_safe_value('pajak', 'float', 0.0),
-        }
+        # Step 8: Refresh and cleanup
+        try:
+            self.load_barang()
+            if hasattr(self, 'refresh_callback') and self.refresh_callback:
+                self.refresh_callback()
+        except Exception as e:
+            print(f"Warning: Failed to refresh data: {str(e)}")
+
+    def on_upload_cancelled(self, timings):
+        """Main thread: import cancelled, tidak ada data yang tersimpan"""
+        self.set_upload_busy(False)
+        print(f"Upload cancelled after: {self.format_upload_timings(self.upload_timings + timings)}")
+        self.status_label.config(text="Upload dibatalkan - tidak ada data yang disimpan", fg='#95a5a6')
+
+    def on_upload_failed(self, error, timings):
+        """Main thread: show the fatal upload error"""
+        self.set_upload_busy(False)
+        error_msg = str(error)
+        print(f"Fatal error during upload: {error_msg}")
+        
+        self.status_label.config(
+            text=f"Error: {error_msg[:80]}...",
+            fg='#e74c3c'
+        )
+        
+        # ✅ ENHANCED: Better error dialog with troubleshooting tips
+        error_dialog = (
+            f"GAGAL UPLOAD DATA\n\n"
+            f"Error: {error_msg}\n\n"
+            f"TIPS MENGATASI:\n"
+            f"• Pastikan file Excel tidak sedang dibuka\n"
+            f"• Periksa format data dalam file Excel\n"
+            f"• Pastikan customer Pengirim & Penerima sudah terdaftar\n"
+            f"• Coba preview file terlebih dahulu\n"
+            f"• Gunakan template Excel yang disediakan"
+        )
+        
+        messagebox.showerror("Error Upload", error_dialog)
 
     def show_enhanced_error_details(self, validation_errors, customer_not_found, success_count, total_count):
         """Show enhanced error details in a popup window"""
@@ -4104,100 +3908,32 @@ class BarangWindow:
             except:
                 pass
         
+    def get_barang_filters(self):
+        """Get current search/filter inputs as data source filters"""
+        return {
+            'nama': self.search_name_var.get().strip(),
+            'pengirim': self.filter_pengirim_var.get().strip(),
+            'penerima': self.filter_penerima_var.get().strip(),
+        }
+
     def load_barang(self):
-        """Load barang into PaginatedTreeView"""
+        """Load barang into PaginatedTreeView (server-side paging)"""
         try:
             print("Loading barang from database...")
             
-            # Load barang from database
-            barang_list = self.db.get_all_barang()
-            self.original_barang_data = barang_list  # Store original data for filtering
-            print(f"Found {len(barang_list)} barang in database")
-            
-            # Format data untuk PaginatedTreeView
-            formatted_data = []
-            
-            for barang in barang_list:
-                # Format dimensions
-                dimensi = f"{barang.get('panjang_barang', '-')}×{barang.get('lebar_barang', '-')}×{barang.get('tinggi_barang', '-')}"
-                
-                # Format currency
-                harga_m3_pp = f"Rp {barang.get('m3_pp', 0):,.0f}" if barang.get('m3_pp') and barang.get('m3_pp') != '-' else '-'
-                harga_m3_pd = f"Rp {barang.get('m3_pd', 0):,.0f}" if barang.get('m3_pd') and barang.get('m3_pd') != '-' else '-'
-                harga_m3_dd = f"Rp {barang.get('m3_dd', 0):,.0f}" if barang.get('m3_dd') and barang.get('m3_dd') != '-' else '-'
-
-                harga_ton_pp = f"Rp {barang.get('ton_pp', 0):,.0f}" if barang.get('ton_pp') and barang.get('ton_pp') != '-' else '-'
-                harga_ton_pd = f"Rp {barang.get('ton_pd', 0):,.0f}" if barang.get('ton_pd') and barang.get('ton_pd') != '-' else '-'
-                harga_ton_dd = f"Rp {barang.get('ton_dd', 0):,.0f}" if barang.get('ton_dd') and barang.get('ton_dd') != '-' else '-'
-
-                harga_col_pp = f"Rp {barang.get('col_pp', 0):,.0f}" if barang.get('col_pp') and barang.get('col_pp') != '-' else '-'
-                harga_col_pd = f"Rp {barang.get('col_pd', 0):,.0f}" if barang.get('col_pd') and barang.get('col_pd') != '-' else '-'
-                harga_col_dd = f"Rp {barang.get('col_dd', 0):,.0f}" if barang.get('col_dd') and barang.get('col_dd') != '-' else '-'
-
-                # Container 20'
-                harga_container_20_pp = f"Rp {barang.get('container_20_pp', 0):,.0f}" if barang.get('container_20_pp') and barang.get('container_20_pp') != '-' else '-'
-                harga_container_20_pd = f"Rp {barang.get('container_20_pd', 0):,.0f}" if barang.get('container_20_pd') and barang.get('container_20_pd') != '-' else '-'
-                harga_container_20_dd = f"Rp {barang.get('container_20_dd', 0):,.0f}" if barang.get('container_20_dd') and barang.get('container_20_dd') != '-' else '-'
-
-                # Container 21'
-                harga_container_21_pp = f"Rp {barang.get('container_21_pp', 0):,.0f}" if barang.get('container_21_pp') and barang.get('container_21_pp') != '-' else '-'
-                harga_container_21_pd = f"Rp {barang.get('container_21_pd', 0):,.0f}" if barang.get('container_21_pd') and barang.get('container_21_pd') != '-' else '-'
-                harga_container_21_dd = f"Rp {barang.get('container_21_dd', 0):,.0f}" if barang.get('container_21_dd') and barang.get('container_21_dd') != '-' else '-'
-
-                # Container 40' HC
-                harga_container_40hc_pp = f"Rp {barang.get('container_40hc_pp', 0):,.0f}" if barang.get('container_40hc_pp') and barang.get('container_40hc_pp') != '-' else '-'
-                harga_container_40hc_pd = f"Rp {barang.get('container_40hc_pd', 0):,.0f}" if barang.get('container_40hc_pd') and barang.get('container_40hc_pd') != '-' else '-'
-                harga_container_40hc_dd = f"Rp {barang.get('container_40hc_dd', 0):,.0f}" if barang.get('container_40hc_dd') and barang.get('container_40hc_dd') != '-' else '-'
-
-                # Format date
-                created_date = barang.get('created_at', '')[:10] if barang.get('created_at') else '-'
-                
-                # Format weight with comma as decimal separator
-                ton_barang = barang.get('ton_barang', '-')
-                if ton_barang and ton_barang != '-':
-                    try:
-                        # Convert to float and format with comma
-                        ton_barang = str(float(ton_barang)).replace('.', ',')
-                    except (ValueError, TypeError):
-                        pass  # Keep original value if conversion fails
-
-                # Buat tuple data untuk row ini
-                row_data = (
-                    barang['barang_id'],
-                    barang['sender_name'],
-                    barang['receiver_name'],
-                    barang['nama_barang'],
-                    dimensi,
-                    barang.get('m3_barang', '-'),
-                    ton_barang,
-                    harga_m3_pp,
-                    harga_m3_pd,
-                    harga_m3_dd,
-                    harga_ton_pp,
-                    harga_ton_pd,
-                    harga_ton_dd,
-                    harga_col_pp,
-                    harga_col_pd,
-                    harga_col_dd,
-                    harga_container_20_pp,
-                    harga_container_20_pd,
-                    harga_container_20_dd,
-                    harga_container_21_pp,
-                    harga_container_21_pd,
-                    harga_container_21_dd,
-                    harga_container_40hc_pp,
-                    harga_container_40hc_pd,
-                    harga_container_40hc_dd,
-                    barang.get('pajak', 0),
-                    created_date
-                )
-                
-                formatted_data.append(row_data)
-            
-            # Set data ke PaginatedTreeView
-            self.tree.set_data(formatted_data)
+            # Index pencarian hanya dibangun ulang jika barang/customers ditulis sejak build
+            # terakhir; memo baris hanya dibuang untuk barang yang berubah
+            self.apply_db_changes()
+            stamp = self.db.get_generations('barang', 'customers')
+            if self.barang_index is None or stamp != self.barang_index_stamp:
+                self.barang_index = BarangSearchIndex(self.db.get_barang_search_rows())
+                self.barang_source = BarangIndexDataSource(self.db, self.barang_index, self.barang_formatter,
+                                                           sort_columns=BARANG_TREE_SORT_COLUMNS)
+                self.barang_index_stamp = stamp
+            self.tree.set_data_source(self.barang_source, filters=self.get_barang_filters())
+            self.update_barang_info_label()
             
-            print("Barang list loaded successfully")
+            print(f"Found {self.tree.total_items} barang in database")
             
         except Exception as e:
             print(f"Error loading barang: {str(e)}")
@@ -4205,6 +3941,50 @@ class BarangWindow:
             traceback.print_exc()
             messagebox.showerror("Error", f"Gagal memuat daftar barang: {str(e)}")
         
+    def apply_barang_write(self, updated=(), removed=()):
+        """Apply barang edits/deletes made by this window to the index and list row by row
+
+        updated: record barang hasil update_barang, removed: barang_id yang dihapus.
+        Index pencarian dan memo baris diperbarui per barang, lalu list hanya mengganti
+        baris yang tampil. Jika subscriber mencatat write lain sejak index dibangun
+        (barang lain, customers, atau write tanpa ids) atau index belum ada, jatuh
+        kembali ke load_barang penuh.
+        """
+        if self.barang_index is None or self.barang_index_stamp is None:
+            self.load_barang()
+            return
+
+        # Buang memo baris yang berubah; setiap write yang tercatat harus berasal dari window ini
+        written_ids = {record['barang_id'] for record in updated} | set(removed)
+        barang_generation, customers_generation = self.barang_index_stamp
+        for table, generation, ids in self.apply_db_changes():
+            if table != 'barang' or ids is None or not written_ids.issuperset(ids):
+                self.load_barang()
+                return
+            barang_generation = max(barang_generation, generation)
+
+        try:
+            self.barang_index.remove(removed)
+            self.barang_index.upsert([search_row(record) for record in updated])
+            self.barang_source.invalidate()  # Urutan sort bisa berubah karena nilai baru
+            # Write yang generation-nya belum tercatat di sini tetap membuat stamp basi
+            self.barang_index_stamp = (barang_generation, customers_generation)
+            rows = self.barang_formatter.format_rows(list(updated))
+
+            matched = self.barang_index.search(self.tree.source_filters)
+            if removed:
+                self.tree.remove_rows(removed)
+            elif self.tree.sort_column is not None or len(matched) != self.tree.total_items:
+                # Jumlah/urutan baris berubah: count dari index, hanya blok yang tampil di-query
+                self.tree.reload()
+            else:
+                self.tree.upsert_rows(rows)
+            self.update_barang_info_label()
+
+        except Exception as e:
+            print(f"Error applying barang changes, reloading list: {e}")
+            self.load_barang()
+
     def on_tab_changed(self, event):
         """Handle tab change event with lazy loading"""
         selected_tab = event.widget.select()
@@ -4212,11 +3992,10 @@ class BarangWindow:
 
         # If switching to barang list tab, use lazy loading
         if "Daftar Barang" in tab_text:
-            # Lazy load: only load data the first time tab is opened
-            if not self.list_tab_loaded:
-                print("First time loading barang list - fetching data...")
+            # Lazy load: hanya query ulang jika barang/customers ditulis sejak load terakhir
+            if self.barang_index_stamp != self.db.get_generations('barang', 'customers'):
+                print("Barang list stale or not loaded - fetching data...")
                 self.load_pengirim_penerima_filter()  # Load filter options first
                 self.load_barang()  # Then load the data
-                self.list_tab_loaded = True
             else:
-                print("Barang list already loaded - skipping database query")
\ No newline at end of file
+                print("Barang list up to date - skipping database query")
\ No newline at end of file
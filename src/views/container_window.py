@@ -7,9 +7,37 @@ import sqlite3
 from PIL import Image, ImageTk
 from tkcalendar import DateEntry
 
-from src.widget.paginated_tree_view import PaginatedTreeView
+from src.widget.paginated_tree_view import PaginatedTreeView, QueryDataSource, DECIMAL_POINT
+from src.utils.barang_search import AvailableBarangFilter
 from src.utils.helpers import format_ton, setup_window_restore_behavior
 
+# Kolom Barang Tersedia yang bisa di-sort di database (kolom TreeView -> BARANG_SORT_COLUMNS)
+AVAILABLE_BARANG_SORT_COLUMNS = {
+    'ID': 'barang_id',
+    'Pengirim': 'sender_name',
+    'Penerima': 'receiver_name',
+    'Nama': 'nama_barang',
+    'Volume': 'm3_barang',
+    'Berat': 'ton_barang',
+}
+
+# iid baris Barang di Container: prefix + detail_container.id
+DETAIL_IID_PREFIX = 'dc_'
+
+
+def detail_iid(detail_id):
+    """Treeview iid for a detail_container row"""
+    return f"{DETAIL_IID_PREFIX}{detail_id}"
+
+
+def detail_id_from_iid(iid):
+    """detail_container.id from a Treeview iid, None jika iid bukan baris detail"""
+    iid = str(iid)
+    if iid.startswith(DETAIL_IID_PREFIX) and iid[len(DETAIL_IID_PREFIX):].isdigit():
+        return int(iid[len(DETAIL_IID_PREFIX):])
+    return None
+
+
 class ContainerWindow:
     def __init__(self, parent, db, refresh_callback=None):
         self.parent = parent
@@ -1421,9 +1449,8 @@ class ContainerWindow:
         """Create container-barang management tab with pricing, sender/receiver selection, and tax management - OPTIMIZED"""
 
         # Initialize cache dan timer untuk debouncing
-        self._cached_barang_data = None
-        self._cache_invalid = True
-        self._cached_customers = {}
+        self._barang_filter = None  # AvailableBarangFilter, dibangun saat filter pertama
+        self._barang_filter_stamp = None  # Generation barang/customers saat filter dibangun
         self.filter_timer = None
         self.filter_delay = 300  # milliseconds
 
@@ -1614,7 +1641,8 @@ class ContainerWindow:
             columns=tax_columns,
             show='headings',
             height=5,
-            items_per_page=5
+            items_per_page=5,
+            decimal_marks={'Jumlah': DECIMAL_POINT}
         )
         self.tax_summary_tree.heading('Jenis_Tax', text='Jenis Pajak')
         self.tax_summary_tree.heading('Penerima', text='Penerima')
@@ -1675,6 +1703,7 @@ class ContainerWindow:
         # Muat data pelanggan/pengirim/barang
         self.original_pengirim_values = []
         self.original_barang_values = []
+        self._barang_names_generation = None  # Generation barang saat daftar nama dimuat
         self.load_customers()
         self.load_pengirim()
         self.load_barang()
@@ -1698,7 +1727,8 @@ class ContainerWindow:
         columns = ('ID', 'Pengirim', 'Penerima', 'Nama', 'Dimensi', 'Volume', 'Berat')
         self.available_tree = PaginatedTreeView(parent=available_tree_container,
                                                 columns=columns, show='headings',
-                                                height=8, items_per_page=15)
+                                                height=8, items_per_page=15,
+                                                decimal_marks={'Volume': DECIMAL_POINT, 'Berat': DECIMAL_POINT})
         self.available_tree.heading('ID', text='ID')
         self.available_tree.heading('Pengirim', text='Pengirim')
         self.available_tree.heading('Penerima', text='Penerima')
@@ -1731,7 +1761,9 @@ class ContainerWindow:
             columns=container_columns, 
             show='headings',
             height=8, 
-            items_per_page=20
+            items_per_page=20,
+            # Volume/Berat dari format_ton ('1.500' = 1,5 ton), harga '1,500,000'
+            decimal_marks={column: DECIMAL_POINT for column in ('Volume', 'Berat', 'Harga_Unit', 'Total_Harga')}
         )
         
         # Configure headings dengan width yang lebih kompak untuk 1366x768
@@ -1796,9 +1828,8 @@ class ContainerWindow:
         if typed == '':
             self.sender_search_combo['values'] = self.original_pengirim_values
         else:
-            filtered = [item for item in self.original_pengirim_values 
-                    if typed in item.lower()]
-            self.sender_search_combo['values'] = filtered
+            # Prefix search lewat FTS5 index, bukan scan seluruh daftar nama
+            self.sender_search_combo['values'] = self.db.search_names(typed, 'customer')
 
     def on_receiver_keyrelease(self, event):
         """Handle receiver combobox key release for dropdown filtering"""
@@ -1815,37 +1846,19 @@ class ContainerWindow:
         if typed == '':
             self.receiver_search_combo['values'] = self.original_receiver_values
         else:
-            filtered = [item for item in self.original_receiver_values
-                    if typed in item.lower()]
-            self.receiver_search_combo['values'] = filtered
+            # Prefix search lewat FTS5 index, bukan scan seluruh daftar nama
+            self.receiver_search_combo['values'] = self.db.search_names(typed, 'customer')
 
     def on_barang_keyrelease(self, event):
         """Handle barang combobox key release for dropdown filtering"""
         typed = self.barang_search_var.get().lower()
 
-        if not hasattr(self, 'original_barang_values') or not self.original_barang_values:
-            try:
-                barang_list = self.db.execute("SELECT DISTINCT nama_barang FROM barang ORDER BY nama_barang")
-                self.original_barang_values = [barang[0] for barang in barang_list if barang[0]]
-            except Exception as e:
-                print(f"Error loading barang: {e}")
-                self.original_barang_values = []
-
         if typed == '':
-            self.barang_search_combo['values'] = self.original_barang_values
+            self.barang_search_combo['values'] = self.get_barang_names()
         else:
-            filtered = [item for item in self.original_barang_values
-                    if typed in item.lower()]
-            self.barang_search_combo['values'] = filtered
-
-    # TAMBAHKAN method untuk invalidate cache
-    def invalidate_barang_cache(self):
-        """Invalidate cached barang data"""
-        self._cache_invalid = True
-        if hasattr(self, '_cached_customers'):
-            self._cached_customers.clear()
-    
-    
+            # Prefix search lewat FTS5 index, bukan scan seluruh daftar nama
+            self.barang_search_combo['values'] = self.db.search_names(typed, 'barang')
+
     def load_destinations(self, event=None):
         try:
             print("load_destinations dipanggil")
@@ -4981,6 +4994,10 @@ class ContainerWindow:
             # Get selected barang details
             selected_items = []
             for item in selection:
+                # Baris diidentifikasi lewat detail_container.id dari iid (assigned_at hanya untuk tampilan)
+                detail_id = detail_id_from_iid(item)
+                if detail_id is None:
+                    continue
                 values = self.container_barang_tree.item(item)['values']
                 
                 # **PERBAIKAN: Ambil barang_id langsung dari kolom pertama**
@@ -4994,6 +5011,7 @@ class ContainerWindow:
                 
                 selected_items.append({
                     'id': barang_id,  # ✅ Sudah pasti benar!
+                    'detail_id': detail_id,
                     'name': nama_barang,
                     'pengirim': pengirim,
                     'penerima': penerima,
@@ -5125,9 +5143,8 @@ class ContainerWindow:
             # Get current satuan from database
             try:
                 current_satuan_data = self.db.execute_one("""
-                    SELECT satuan FROM detail_container
-                    WHERE barang_id = ? AND container_id = ? AND assigned_at = ?
-                """, (item['id'], container_id, item['assigned_at']))
+                    SELECT satuan FROM detail_container WHERE id = ?
+                """, (item['detail_id'],))
 
                 current_satuan = current_satuan_data[0] if current_satuan_data and current_satuan_data[0] else 'pcs'
             except Exception as satuan_error:
@@ -5155,9 +5172,8 @@ class ContainerWindow:
             # Get current date from database (in YYYY-MM-DD format)
             try:
                 current_date_data = self.db.execute_one("""
-                    SELECT tanggal FROM detail_container
-                    WHERE barang_id = ? AND container_id = ? AND assigned_at = ?
-                """, (item['id'], container_id, item['assigned_at']))
+                    SELECT tanggal FROM detail_container WHERE id = ?
+                """, (item['detail_id'],))
 
                 current_date_db = current_date_data[0] if current_date_data and current_date_data[0] else datetime.now().strftime('%Y-%m-%d')
             except Exception as date_error:
@@ -5195,7 +5211,7 @@ class ContainerWindow:
             current_date_label.pack(side='left', padx=(10, 0))
             
             # ✅ SIMPAN REFERENCE
-            edit_entries[item['id']] = {
+            edit_entries[item['detail_id']] = {
                 'colli_var': colli_var,
                 'colli_entry': colli_entry,
                 'satuan_var': satuan_var,
@@ -5218,7 +5234,8 @@ class ContainerWindow:
                 tax_updated_count = 0
                 changes_made = []
                 
-                for barang_id, entry_data in edit_entries.items():
+                for detail_id, entry_data in edit_entries.items():
+                    barang_id = entry_data['item']['id']
                     try:
                         new_colli = int(entry_data['colli_var'].get())
                         old_colli = int(entry_data['item']['current_colli'])
@@ -5259,15 +5276,12 @@ class ContainerWindow:
                         
                         # Get old date for comparison
                         
-                        print("Checking Assign at: " + entry_data['item']['assigned_at'])
-                        
-                        
+                        print(f"Checking detail_container id: {detail_id}")
                         
                         try:
                             old_data = self.db.execute_one("""
-                                SELECT tanggal, satuan FROM detail_container
-                                WHERE barang_id = ? AND container_id = ? AND assigned_at = ?
-                            """, (barang_id, container_id, entry_data['item']['assigned_at']))
+                                SELECT tanggal, satuan FROM detail_container WHERE id = ?
+                            """, (detail_id,))
 
                             old_date_db = old_data[0] if old_data and old_data[0] else None
                             old_satuan = old_data[1] if old_data and len(old_data) > 1 and old_data[1] else 'pcs'
@@ -5294,8 +5308,8 @@ class ContainerWindow:
                                 SELECT b.*, dc.door_type
                                 FROM barang b
                                 JOIN detail_container dc ON b.barang_id = dc.barang_id
-                                WHERE b.barang_id = ? AND dc.container_id = ?
-                            """, (barang_id, container_id))
+                                WHERE dc.id = ?
+                            """, (detail_id,))
 
                             if barang_data:
                                 try:
@@ -5334,9 +5348,8 @@ class ContainerWindow:
                             self.db.execute("""
                                 UPDATE detail_container
                                 SET colli_amount = ?, total_harga = ?, tanggal = ?, satuan = ?
-                                WHERE barang_id = ? AND container_id = ? AND assigned_at = ?
-                            """, (new_colli, new_total, new_date_db, new_satuan, barang_id, container_id,
-                                entry_data['item']['assigned_at']))
+                                WHERE id = ?
+                            """, (new_colli, new_total, new_date_db, new_satuan, detail_id))
                             
                             print(f"   ✅ Database updated successfully!")
                             
@@ -5360,10 +5373,11 @@ class ContainerWindow:
                                     
                                     print(f"   PPN: {ppn_amount}, PPH23: {pph23_amount}")
                                     
+                                    # Pajak milik baris detail ini (barang yang sama bisa di-assign lebih dari sekali)
                                     existing_tax = self.db.execute_one("""
-                                        SELECT tax_id FROM barang_tax 
-                                        WHERE container_id = ? AND barang_id = ?
-                                    """, (container_id, barang_id))
+                                        SELECT tax_id FROM detail_container
+                                        WHERE id = ? AND tax_id IS NOT NULL
+                                    """, (detail_id,))
                                     
                                     if existing_tax:
                                         tax_id = existing_tax[0]
@@ -5378,29 +5392,21 @@ class ContainerWindow:
                                         self.db.execute("""
                                             UPDATE detail_container 
                                             SET tax_id = ?
-                                            WHERE barang_id = ? AND container_id = ? AND assigned_at = ?
-                                        """, (tax_id, barang_id, container_id, entry_data['item']['assigned_at']))
+                                            WHERE id = ?
+                                        """, (tax_id, detail_id))
                                     else:
                                         print(f"   ➕ Creating new tax record")
-                                        self.db.execute("""
+                                        tax_id = self.db.execute_insert("""
                                             INSERT INTO barang_tax (container_id, barang_id, penerima, ppn_amount, pph23_amount, created_at)
                                             VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
                                         """, (container_id, barang_id, receiver_name, ppn_amount, pph23_amount))
                                         
-                                        # Get the newly created tax_id
-                                        new_tax = self.db.execute_one("""
-                                            SELECT tax_id FROM barang_tax 
-                                            WHERE container_id = ? AND barang_id = ?
-                                            ORDER BY created_at DESC LIMIT 1
-                                        """, (container_id, barang_id))
-                                        
-                                        if new_tax:
-                                            tax_id = new_tax[0]
+                                        if tax_id:
                                             self.db.execute("""
                                                 UPDATE detail_container 
                                                 SET tax_id = ?
-                                                WHERE barang_id = ? AND container_id = ? AND assigned_at = ?
-                                            """, (tax_id, barang_id, container_id, entry_data['item']['assigned_at']))
+                                                WHERE id = ?
+                                            """, (tax_id, detail_id))
                                     
                                     tax_recalculated = True
                                     tax_updated_count += 1
@@ -5632,7 +5638,8 @@ class ContainerWindow:
                     'current_harga': parsed_current_harga,
                     'current_total': parsed_current_total,
                     'colli': parsed_colli,
-                    'assigned_at': assigned_at
+                    'assigned_at': assigned_at,
+                    'detail_id': detail_id_from_iid(item)
                 })
                 
                 print(f"Added item: {nama_barang}, barang_id: {barang_id}, harga: {parsed_current_harga}, total: {parsed_current_total}, colli: {parsed_colli}")
@@ -5645,148 +5652,21 @@ class ContainerWindow:
             edit_result = self.create_edit_pricing_dialog(selected_items, container_id)
             
             if edit_result and edit_result['confirmed']:
-                # Update prices in database with tax recalculation
-                success_count = 0
-                error_count = 0
-                tax_updated_count = 0
-                
+                # Update prices + pajak in database dalam satu transaksi
+                pricing_data = {}
                 for barang_id, price_data in edit_result['pricing_data'].items():
-                    try:
-                        # Find the corresponding item for assigned_at
-                        corresponding_item = next((item for item in selected_items if str(item['id']) == str(barang_id)), None)
-                        
-                        if corresponding_item:
-                            new_harga_unit = price_data['harga_per_unit']
-                            new_total_harga = price_data['total_harga']
-                            
-                            # Update dengan assigned_at untuk unique identification
-                            update_query = """
-                                UPDATE detail_container 
-                                SET harga_per_unit = ?, total_harga = ? 
-                                WHERE barang_id = ? AND container_id = ? AND assigned_at = ?
-                            """
-                            update_params = (
-                                new_harga_unit, 
-                                new_total_harga, 
-                                barang_id, 
-                                container_id,
-                                corresponding_item['assigned_at']
-                            )
-                            
-                            print(f"Updating price: {update_query}")
-                            print(f"Parameters: {update_params}")
-                            
-                            # Check if record exists
-                            check_query = "SELECT COUNT(*) FROM detail_container WHERE barang_id = ? AND container_id = ? AND assigned_at = ?"
-                            check_params = (barang_id, container_id, corresponding_item['assigned_at'])
-                            check_result = self.db.execute(check_query, check_params)
-                            count = check_result[0][0] if check_result else 0
-                            
-                            print(f"Records found to update: {count}")
-                            
-                            if count > 0:
-                                result = self.db.execute(update_query, update_params)
-                                print(f"✅ Updated price for barang {barang_id}")
-                            else:
-                                # Try fallback without assigned_at
-                                print(f"⚠️ Trying fallback update without assigned_at...")
-                                fallback_query = """
-                                    UPDATE detail_container 
-                                    SET harga_per_unit = ?, total_harga = ? 
-                                    WHERE barang_id = ? AND container_id = ?
-                                """
-                                fallback_params = (new_harga_unit, new_total_harga, barang_id, container_id)
-                                result = self.db.execute(fallback_query, fallback_params)
-                                print(f"✅ Updated price for barang {barang_id} (fallback method)")
-                            
-                            # TAMBAHAN: Recalculate tax if barang has tax
-                            tax_recalculated = False
-                            try:
-                                barang_tax_data = self.db.execute_one(
-                                    "SELECT pajak, penerima FROM barang WHERE barang_id = ?", 
-                                    (barang_id,)
-                                )
-                                
-                                if barang_tax_data and barang_tax_data[0] == 1:  # pajak = 1
-                                    penerima_id = barang_tax_data[1]
-                                    
-                                    # Get receiver name
-                                    receiver_data = self.db.get_customer_by_id(penerima_id)
-                                    receiver_name = receiver_data.get('nama_customer', 'Unknown') if receiver_data else 'Unknown'
-                                    
-                                    # Calculate new tax amounts based on new total
-                                    ppn_amount = new_total_harga * 0.011  # PPN 1.1%
-                                    pph23_amount = new_total_harga * 0.02  # PPH 23 2%
-                                    
-                                    # Check if tax record exists for this container and barang
-                                    existing_tax = self.db.execute_one("""
-                                        SELECT tax_id FROM barang_tax 
-                                        WHERE container_id = ? AND barang_id = ?
-                                    """, (container_id, barang_id))
-                                    
-                                    if existing_tax:
-                                        # Update existing tax record
-                                        tax_id = existing_tax[0]
-                                        self.db.execute("""
-                                            UPDATE barang_tax 
-                                            SET ppn_amount = ?, pph23_amount = ?
-                                            WHERE tax_id = ?
-                                        """, (ppn_amount, pph23_amount, tax_id))
-                                        
-                                        print(f"✅ Updated tax for barang {barang_id}: PPN={ppn_amount:,.0f}, PPH23={pph23_amount:,.0f}")
-                                    else:
-                                        # Create new tax record
-                                        self.db.execute("""
-                                            INSERT INTO barang_tax (container_id, barang_id, penerima, ppn_amount, pph23_amount, created_at)
-                                            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                                        """, (container_id, barang_id, receiver_name, ppn_amount, pph23_amount))
-                                        
-                                        print(f"✅ Created new tax for barang {barang_id}: PPN={ppn_amount:,.0f}, PPH23={pph23_amount:,.0f}")
-                                    
-                                    # Update tax_id in detail_container if needed
-                                    if existing_tax:
-                                        tax_id = existing_tax[0]
-                                        try:
-                                            self.db.execute("""
-                                                UPDATE detail_container 
-                                                SET tax_id = ?
-                                                WHERE barang_id = ? AND container_id = ? AND assigned_at = ?
-                                            """, (tax_id, barang_id, container_id, corresponding_item['assigned_at']))
-                                            print(f"✅ Linked tax_id {tax_id} to detail_container")
-                                        except Exception as tax_link_error:
-                                            print(f"⚠️ Warning: Could not link tax_id to detail_container: {tax_link_error}")
-                                    
-                                    tax_recalculated = True
-                                    tax_updated_count += 1
-                                    
-                            except Exception as tax_error:
-                                print(f"⚠️ Error recalculating tax for barang {barang_id}: {tax_error}")
-                                # Don't fail the whole operation if tax calculation fails
-                                pass
-                            
-                            success_count += 1
-                            
-                        else:
-                            # Fallback: update without assigned_at (should not happen with new approach)
-                            print(f"⚠️ No corresponding item found for barang_id {barang_id}, using fallback...")
-                            self.db.execute("""
-                                UPDATE detail_container 
-                                SET harga_per_unit = ?, total_harga = ? 
-                                WHERE barang_id = ? AND container_id = ?
-                            """, (
-                                price_data['harga_per_unit'], 
-                                price_data['total_harga'], 
-                                barang_id, 
-                                container_id
-                            ))
-                            success_count += 1
-                            print(f"✅ Updated price for barang {barang_id} (no assigned_at)")
-                            
-                    except Exception as e:
-                        error_count += 1
-                        print(f"❌ Error updating price for barang {barang_id}: {e}")
-                        import traceback
-                        traceback.print_exc()
+                    corresponding_item = next((item for item in selected_items if str(item['id']) == str(barang_id)), None)
+                    pricing_data[barang_id] = {
+                        'harga_per_unit': price_data['harga_per_unit'],
+                        'total_harga': price_data['total_harga'],
+                        'detail_id': corresponding_item.get('detail_id') if corresponding_item else None
+                    }
+                
+                update_result = self.db.bulk_update_container_pricing(container_id, pricing_data)
+                success_count = update_result['success']
+                error_count = update_result['error']
+                tax_updated_count = update_result['tax_updated']
+                print(f"✅ Bulk pricing update for container {container_id}: {update_result}")
                 
                 # Show enhanced result with tax information
                 if success_count > 0:
@@ -5841,121 +5721,40 @@ class ContainerWindow:
         except Exception as e:
             print(f"Error loading pengirim customers: {e}")
 
+    def get_barang_names(self):
+        """Distinct barang names, di-query ulang hanya jika tabel barang sudah berubah"""
+        generation = self.db.get_generation('barang')
+        if generation != self._barang_names_generation:
+            try:
+                barang_list = self.db.execute("SELECT DISTINCT nama_barang FROM barang ORDER BY nama_barang")
+                self.original_barang_values = [barang[0] for barang in barang_list if barang[0]]
+                self._barang_names_generation = generation
+            except Exception as e:
+                print(f"Error loading barang: {e}")
+        return self.original_barang_values
+
     def load_barang(self):
         """Load distinct barang names for search dropdown"""
-        try:
-            barang_list = self.db.execute("SELECT DISTINCT nama_barang FROM barang ORDER BY nama_barang")
-            barang_names = [barang[0] for barang in barang_list if barang[0]]
-            self.barang_search_combo['values'] = barang_names
-            self.original_barang_values = barang_names
-        except Exception as e:
-            print(f"Error loading barang: {e}")
+        self.barang_search_combo['values'] = self.get_barang_names()
 
     def load_customer_barang_tree(self, sender_name=None, receiver_name=None, barang_name=None):
         """Load barang based on sender, receiver, and/or barang name selection - OPTIMIZED"""
         try:
             print(f"Loading customer barang tree with sender: {sender_name}, receiver: {receiver_name}, barang: {barang_name}")
 
-            # PERBAIKAN: Cache data barang untuk menghindari query berulang
-            if not hasattr(self, '_cached_barang_data') or self._cache_invalid:
-                all_barang = self.db.get_all_barang()
-                all_barang = [barang for barang in all_barang if barang is not None]
-                self._cached_barang_data = all_barang
-                self._cache_invalid = False
-            else:
-                all_barang = self._cached_barang_data
-
-            # PERBAIKAN: Pre-load customer data untuk menghindari query berulang
-            if not hasattr(self, '_cached_customers'):
-                self._cached_customers = {}
-
-            # Filter data
-            filtered_data = []
-            sender_lower = sender_name.lower() if sender_name else None
-            receiver_lower = receiver_name.lower() if receiver_name else None
-            barang_lower = barang_name.lower() if barang_name else None
-            
-            for barang in all_barang:
-                try:
-                    if barang is None:
-                        continue
-                    
-                    # Get sender name (with caching)
-                    pengirim_id = barang.get('pengirim', '')
-                    if pengirim_id:
-                        if pengirim_id not in self._cached_customers:
-                            try:
-                                sender_data = self.db.get_sender_by_id(pengirim_id)
-                                if sender_data:
-                                    self._cached_customers[pengirim_id] = sender_data.get('nama_pengirim', '')
-                                else:
-                                    customer_data = self.db.get_customer_by_id(pengirim_id)
-                                    self._cached_customers[pengirim_id] = customer_data.get('nama_customer', '') if customer_data else ''
-                            except:
-                                self._cached_customers[pengirim_id] = barang.get('sender_name', '')
-                        
-                        pengirim = self._cached_customers.get(pengirim_id, '')
-                    else:
-                        pengirim = ''
-                    
-                    # Get receiver name (with caching)
-                    penerima_id = barang.get('penerima', '')
-                    if penerima_id:
-                        if penerima_id not in self._cached_customers:
-                            try:
-                                customer_data = self.db.get_customer_by_id(penerima_id)
-                                self._cached_customers[penerima_id] = customer_data.get('nama_customer', '') if customer_data else ''
-                            except:
-                                self._cached_customers[penerima_id] = barang.get('receiver_name', '')
-                        
-                        penerima = self._cached_customers.get(penerima_id, '')
-                    else:
-                        penerima = ''
-                    
-                    # Filter check
-                    show_item = True
-
-                    if sender_lower and sender_lower not in pengirim.lower():
-                        show_item = False
+            # Baris siap-filter dibangun dari get_all_barang (nama sudah di-join) dan
+            # hanya dibangun ulang jika tabel barang/customers ditulis sejak build terakhir
+            stamp = self.db.get_generations('barang', 'customers')
+            if self._barang_filter is None or stamp != self._barang_filter_stamp:
+                self._barang_filter = AvailableBarangFilter(self.db.get_all_barang(), self.format_available_barang_row)
+                self._barang_filter_stamp = stamp
 
-                    if receiver_lower and receiver_lower not in penerima.lower():
-                        show_item = False
-
-                    if barang_lower:
-                        nama_barang = str(barang.get('nama_barang', '')).lower()
-                        if barang_lower not in nama_barang:
-                            show_item = False
-                    
-                    if show_item:
-                        # Format for display
-                        panjang = barang.get('panjang_barang', '-')
-                        lebar = barang.get('lebar_barang', '-')
-                        tinggi = barang.get('tinggi_barang', '-')
-                        dimensi = f"{panjang}×{lebar}×{tinggi}"
-                        
-                        volume = str(barang.get('m3_barang', '-'))
-                        berat = str(barang.get('ton_barang', '-'))
-                        
-                        row_data = (
-                            str(barang.get('barang_id', '')),
-                            pengirim or '-',
-                            penerima or '-',
-                            str(barang.get('nama_barang', '-')),
-                            dimensi,
-                            volume,
-                            berat
-                        )
-                        
-                        filtered_data.append(row_data)
-                        
-                except Exception as e:
-                    print(f"Error processing barang: {e}")
-                    continue
+            filtered_data = self._barang_filter.filter(sender_name, receiver_name, barang_name)
             
             # Set filtered data to tree
             self.available_tree.set_data(filtered_data)
             
-            print(f"Filtered {len(filtered_data)} items from {len(all_barang)} total")
+            print(f"Filtered {len(filtered_data)} items from {len(self._barang_filter)} total")
             
         except Exception as e:
             print(f"Error loading customer barang tree: {e}")
@@ -5964,33 +5763,30 @@ class ContainerWindow:
             self.available_tree.set_data([])
         
         
+    def format_available_barang_row(self, barang):
+        """Format one barang record into a Barang Tersedia row tuple"""
+        return (
+            str(barang.get('barang_id', '')),
+            barang.get('sender_name') or '-',
+            barang.get('receiver_name') or '-',
+            str(barang.get('nama_barang', '')),
+            f"{barang.get('panjang_barang', '-')}×{barang.get('lebar_barang', '-')}×{barang.get('tinggi_barang', '-')}",
+            f"{float(barang.get('m3_barang', 0)):.4f}" if barang.get('m3_barang') else '0.0000',
+            format_ton(barang.get('ton_barang', 0)) if barang.get('ton_barang') else '0'
+        )
+
     def load_available_barang(self):
-        """Load available barang ke PaginatedTreeView"""
+        """Load available barang ke PaginatedTreeView (server-side paging)"""
         try:
-            # Ambil data dari database
-            barang_list = self.db.get_all_barang()
-
             # Refresh barang dropdown list
             self.load_barang()
 
-            # Format data
-            formatted_data = []
-            for barang in barang_list:
-                if barang is None:
-                    continue
-
-                row_data = (
-                    str(barang.get('barang_id', '')),
-                    str(barang.get('sender_name', '')),
-                    str(barang.get('receiver_name', '')),
-                    str(barang.get('nama_barang', '')),
-                    f"{barang.get('panjang_barang', '-')}×{barang.get('lebar_barang', '-')}×{barang.get('tinggi_barang', '-')}",
-                    f"{float(barang.get('m3_barang', 0)):.4f}" if barang.get('m3_barang') else '0.0000',
-                    format_ton(barang.get('ton_barang', 0)) if barang.get('ton_barang') else '0'
-                )
-                formatted_data.append(row_data)
-            self.available_tree.set_data(formatted_data)
-            print(f"Loaded {len(formatted_data)} items to PaginatedTreeView")
+            # Hanya halaman yang tampil yang di-query (COUNT + LIMIT/OFFSET)
+            available_source = QueryDataSource(self.db.count_barang, self.db.get_barang_page,
+                                               format_row=self.format_available_barang_row,
+                                               sort_columns=AVAILABLE_BARANG_SORT_COLUMNS)
+            self.available_tree.set_data_source(available_source)
+            print(f"Loaded {self.available_tree.total_items} items to PaginatedTreeView")
 
         except Exception as e:
             print(f"Error loading barang: {e}")
@@ -6118,85 +5914,61 @@ class ContainerWindow:
                 return  # User cancelled
             
             # ============================================
-            # STEP 8: Add Barang to Container with Pricing
+            # STEP 8: Add Barang to Container with Pricing (satu transaksi)
             # ============================================
-            success_count = 0
-            error_count = 0
-            tax_calculated_count = 0
+            # Get satuan from dropdown instead of pricing method
+            satuan_value = self.satuan_var.get()
+            
+            assign_items = []
+            for item in selected_items:
+                price_data = pricing_result['pricing_data'].get(item['id'], {
+                    'harga_per_unit': 0, 
+                    'total_harga': 0
+                })
+                assign_items.append({
+                    'barang_id': item['id'],
+                    'satuan': satuan_value,
+                    'door_type': price_data['metode_pricing'].split('_')[1] if 'metode_pricing' in price_data else 'manual',
+                    'colli_amount': colli_amount,
+                    'harga_per_unit': price_data['harga_per_unit'],
+                    'total_harga': price_data['total_harga'],
+                    'tanggal': tanggal_db  # ✅ KIRIM FORMAT DATABASE (YYYY-MM-DD)
+                })
+            
             success_details = []
             error_details = []
-            total_tax_amount = 0
             
-            for item in selected_items:
-                try:
-                    barang_id = item['id']
-                    price_data = pricing_result['pricing_data'].get(barang_id, {
-                        'harga_per_unit': 0, 
-                        'total_harga': 0
-                    })
-                    
-                    print(f"Processing item {barang_id}: {price_data}")
-
-                    # Get satuan from dropdown instead of pricing method
-                    satuan_value = self.satuan_var.get()
-
-                    # ✅ KIRIM TANGGAL DATABASE FORMAT (YYYY-MM-DD)
-                    success = self.db.assign_barang_to_container_with_pricing(
-                        barang_id,
-                        container_id,
-                        satuan_value,  # Use satuan from dropdown
-                        price_data['metode_pricing'].split('_')[1] if 'metode_pricing' in price_data else 'manual',
-                        colli_amount,
-                        price_data['harga_per_unit'],
-                        price_data['total_harga'],
-                        tanggal_db  # ✅ KIRIM FORMAT DATABASE (YYYY-MM-DD)
-                    )
-                    
-                    if success:
-                        success_count += 1
-                        success_details.append(f"✅ {item['name']} (ID: {barang_id})")
-                        print(f"✅ Added barang {barang_id} ({item['name']}) dengan tanggal {tanggal_indonesian}")
-                        
-                        # ============================================
-                        # STEP 9: Calculate Tax if Applicable
-                        # ============================================
-                        try:
-                            barang_data = self.db.execute_one(
-                                "SELECT pajak, penerima FROM barang WHERE barang_id = ?", 
-                                (barang_id,)
-                            )
-                            
-                            if barang_data and barang_data[0] == 1:  # pajak = 1
-                                penerima_id = barang_data[1]
-                                
-                                # Get receiver name
-                                receiver_data = self.db.get_customer_by_id(penerima_id)
-                                receiver_name = receiver_data.get('nama_customer', 'Unknown') if receiver_data else 'Unknown'
-                                
-                                # Calculate tax amounts
-                                total_nilai = price_data['total_harga']
-                                ppn_amount = total_nilai * 0.011  # PPN 1.1%
-                                pph23_amount = total_nilai * 0.02  # PPH 23 2%
-                                total_tax = ppn_amount + pph23_amount
-                                
-                                tax_calculated_count += 1
-                                total_tax_amount += total_tax
-                                
-                                print(f"✅ Tax calculated for barang {barang_id}: PPN={ppn_amount:,.0f}, PPH={pph23_amount:,.0f}")
-                                    
-                        except Exception as tax_error:
-                            print(f"⚠️ Error calculating tax for barang {barang_id}: {tax_error}")
-                            # Don't fail the whole process if tax calculation fails
-                            continue
-                        
-                    else:
-                        error_count += 1
-                        error_details.append(f"❌ {item['name']} (ID: {barang_id}) - Database operation failed")
-                        
-                except Exception as e:
-                    error_count += 1
-                    error_details.append(f"❌ {item['name']} (ID: {item['id']}) - {str(e)}")
-                    print(f"❌ Error adding barang {item['id']} ({item['name']}): {e}")
+            try:
+                # ============================================
+                # STEP 9: Insert detail + pajak, tax summary dihitung oleh database layer
+                # ============================================
+                batch_result = self.db.assign_barang_batch(container_id, assign_items)
+            except Exception as e:
+                batch_result = {
+                    'success_count': 0,
+                    'failed_count': len(assign_items),
+                    'assigned_ids': [],
+                    'errors': [],
+                    'tax_count': 0,
+                    'total_tax': 0
+                }
+                error_details.append(f"❌ Semua barang gagal ditambahkan - {str(e)}")
+                print(f"❌ Error adding barang batch to container {container_id}: {e}")
+            
+            items_by_id = {item['id']: item for item in selected_items}
+            for barang_id in batch_result['assigned_ids']:
+                success_details.append(f"✅ {items_by_id[barang_id]['name']} (ID: {barang_id})")
+            for error in batch_result['errors']:
+                name = items_by_id.get(error['barang_id'], {}).get('name', '-')
+                error_details.append(f"❌ {name} (ID: {error['barang_id']}) - {error['error']}")
+            
+            success_count = batch_result['success_count']
+            error_count = batch_result['failed_count']
+            tax_calculated_count = batch_result['tax_count']
+            total_tax_amount = batch_result['total_tax']
+            
+            print(f"✅ Added {success_count} barang dengan tanggal {tanggal_indonesian} "
+                  f"({tax_calculated_count} dengan pajak, total pajak Rp {total_tax_amount:,.0f})")
             
             # ============================================
             # STEP 10: Show Result Message
@@ -6250,7 +6022,7 @@ class ContainerWindow:
                 self.load_tax_summary_tree(container_id)
                 
                 # Refresh other lists
-                self.load_containers()  # Refresh container list to update item count
+                self.refresh_container_rows([container_id])  # Update item count container ini saja
                 self.load_customers()   # Refresh customer list
                 self.load_pengirim()    # Refresh pengirim list
                 
@@ -6368,12 +6140,12 @@ class ContainerWindow:
                 print(f"Pengirim    : '{pengirim}'")
                 print(f"Penerima    : '{penerima}'")
                 print(f"Assigned at : '{assigned_at}'")
-                print(f"Type        : {type(assigned_at)}")
-                print(f"Length      : {len(str(assigned_at))}")
+                print(f"Detail iid  : '{item}'")
                 
                 # **TIDAK PERLU QUERY LAGI! Langsung pakai barang_id**
                 selected_items.append({
                     'id': barang_id,  # ✅ Sudah pasti benar!
+                    'detail_id': detail_id_from_iid(item),
                     'nama': nama_barang,
                     'pengirim': pengirim,
                     'penerima': penerima,
@@ -6419,172 +6191,18 @@ class ContainerWindow:
             if not messagebox.askyesno("Konfirmasi Hapus", confirm_msg):
                 return
             
-            # Remove barang from container with tax cleanup
-            success_count = 0
-            error_count = 0
-            tax_cleaned_count = 0
+            # Remove barang from container with tax cleanup (by detail_container.id, satu transaksi)
+            detail_ids = [item['detail_id'] for item in selected_items if item['detail_id'] is not None]
+            error_count = len(selected_items) - len(detail_ids)
             
-            for item in selected_items:
-                print(f"\n{'='*60}")
-                print(f"🗑️ Processing removal for: {item['nama']} (ID: {item['id']})")
-                print(f"{'='*60}")
-
-                try:
-                    # ========================================
-                    # 🔍 DEBUG: CEK FORMAT DI DATABASE
-                    # ========================================
-                    print(f"\n📊 STEP 1: Checking database format...")
-                    debug_query = """
-                        SELECT 
-                            assigned_at,
-                            typeof(assigned_at) as type,
-                            length(assigned_at) as len,
-                            quote(assigned_at) as quoted
-                        FROM detail_container 
-                        WHERE barang_id = ? AND container_id = ?
-                    """
-                    debug_result = self.db.execute(debug_query, (item['id'], container_id))
-                    
-                    if debug_result:
-                        print(f"   Records found in DB: {len(debug_result)}")
-                        for idx, row in enumerate(debug_result):
-                            print(f"\n   Record {idx + 1}:")
-                            print(f"   ├─ Value in DB  : '{row[0]}'")
-                            print(f"   ├─ Type         : {row[1]}")
-                            print(f"   ├─ Length       : {row[2]}")
-                            print(f"   ├─ Quoted       : {row[3]}")
-                            print(f"   └─ Expected (UI): '{item['assigned_at']}'")
-                            print(f"   └─ Match?       : {str(row[0]) == str(item['assigned_at'])}")
-                    else:
-                        print(f"   ❌ No records found in database!")
-                    
-                    # ========================================
-                    # 🔍 STEP 2: GET TAX_ID
-                    # ========================================
-                    print(f"\n📊 STEP 2: Getting tax_id...")
-                    tax_id = None
-                    try:
-                        # Try dengan assigned_at exact match
-                        tax_query = "SELECT tax_id, assigned_at FROM detail_container WHERE barang_id = ? AND container_id = ? AND assigned_at = ?"
-                        tax_result = self.db.execute_one(tax_query, (item['id'], container_id, item['assigned_at']))
-                        
-                        if tax_result and tax_result[0]:
-                            tax_id = tax_result[0]
-                            print(f"   ✅ Found tax_id: {tax_id} (exact match)")
-                            print(f"   └─ assigned_at in record: '{tax_result[1]}'")
-                        else:
-                            # Try dengan LIKE pattern (untuk handle microseconds)
-                            assigned_at_pattern = str(item['assigned_at'])[:19] + '%'
-                            tax_query_like = "SELECT tax_id, assigned_at FROM detail_container WHERE barang_id = ? AND container_id = ? AND assigned_at LIKE ?"
-                            tax_result_like = self.db.execute_one(tax_query_like, (item['id'], container_id, assigned_at_pattern))
-                            
-                            if tax_result_like and tax_result_like[0]:
-                                tax_id = tax_result_like[0]
-                                print(f"   ✅ Found tax_id: {tax_id} (LIKE pattern match)")
-                                print(f"   └─ assigned_at in record: '{tax_result_like[1]}'")
-                            else:
-                                # Fallback tanpa assigned_at
-                                tax_query_fallback = "SELECT tax_id FROM detail_container WHERE barang_id = ? AND container_id = ?"
-                                tax_result_fallback = self.db.execute_one(tax_query_fallback, (item['id'], container_id))
-                                if tax_result_fallback and tax_result_fallback[0]:
-                                    tax_id = tax_result_fallback[0]
-                                    print(f"   ⚠️ Found tax_id: {tax_id} (fallback - no assigned_at)")
-                                else:
-                                    print(f"   ❌ No tax_id found")
-                            
-                    except Exception as tax_query_error:
-                        print(f"   ❌ Error getting tax_id: {tax_query_error}")
-                    
-                    # ========================================
-                    # 🔍 STEP 3: DELETE RECORD
-                    # ========================================
-                    print(f"\n📊 STEP 3: Attempting delete...")
-                    
-                    # Try 1: Exact match dengan assigned_at
-                    delete_query = "DELETE FROM detail_container WHERE barang_id = ? AND container_id = ? AND assigned_at = ?"
-                    delete_params = (item['id'], container_id, item['assigned_at'])
-                    
-                    print(f"   Query: {delete_query}")
-                    print(f"   Params: {delete_params}")
-                    
-                    check_query = "SELECT COUNT(*) FROM detail_container WHERE barang_id = ? AND container_id = ? AND assigned_at = ?"
-                    check_result = self.db.execute(check_query, delete_params)
-                    count = check_result[0][0] if check_result else 0
-                    
-                    print(f"   Records matching (exact): {count}")
-                    
-                    if count > 0:
-                        # Execute delete
-                        result = self.db.execute(delete_query, delete_params)
-                        print(f"   ✅ Deleted successfully (exact match)")
-                        success_count += 1
-                    else:
-                        # Try 2: LIKE pattern untuk handle microseconds
-                        print(f"\n   ⚠️ Trying LIKE pattern...")
-                        assigned_at_pattern = str(item['assigned_at'])[:19] + '%'
-                        delete_query_like = "DELETE FROM detail_container WHERE barang_id = ? AND container_id = ? AND assigned_at LIKE ?"
-                        delete_params_like = (item['id'], container_id, assigned_at_pattern)
-                        
-                        print(f"   Pattern: '{assigned_at_pattern}'")
-                        
-                        check_query_like = "SELECT COUNT(*) FROM detail_container WHERE barang_id = ? AND container_id = ? AND assigned_at LIKE ?"
-                        check_result_like = self.db.execute(check_query_like, delete_params_like)
-                        count_like = check_result_like[0][0] if check_result_like else 0
-                        
-                        print(f"   Records matching (LIKE): {count_like}")
-                        
-                        if count_like > 0:
-                            result = self.db.execute(delete_query_like, delete_params_like)
-                            print(f"   ✅ Deleted successfully (LIKE match)")
-                            success_count += 1
-                        else:
-                            # Try 3: Fallback tanpa assigned_at
-                            print(f"\n   ⚠️ Trying fallback (no assigned_at)...")
-                            alt_delete_query = "DELETE FROM detail_container WHERE barang_id = ? AND container_id = ?"
-                            alt_delete_params = (item['id'], container_id)
-                            
-                            alt_check_result = self.db.execute("SELECT COUNT(*) FROM detail_container WHERE barang_id = ? AND container_id = ?", alt_delete_params)
-                            alt_count = alt_check_result[0][0] if alt_check_result else 0
-                            
-                            print(f"   Records matching (fallback): {alt_count}")
-                            
-                            if alt_count > 0:
-                                result = self.db.execute(alt_delete_query, alt_delete_params)
-                                print(f"   ✅ Deleted successfully (fallback)")
-                                success_count += 1
-                            else:
-                                error_count += 1
-                                print(f"   ❌ No records found to delete!")
-                                continue
-                    
-                    # ========================================
-                    # 🔍 STEP 4: DELETE TAX RECORD
-                    # ========================================
-                    if tax_id:
-                        print(f"\n📊 STEP 4: Deleting tax record...")
-                        try:
-                            tax_delete_result = self.db.execute("DELETE FROM barang_tax WHERE tax_id = ?", (tax_id,))
-                            if tax_delete_result:
-                                tax_cleaned_count += 1
-                                print(f"   ✅ Deleted tax record: {tax_id}")
-                            else:
-                                print(f"   ⚠️ Tax record {tax_id} may not exist")
-                        except Exception as tax_delete_error:
-                            print(f"   ⚠️ Error deleting tax: {tax_delete_error}")
-                    
-                    print(f"\n{'='*60}")
-                    print(f"✅ Completed removal for: {item['nama']}")
-                    print(f"{'='*60}\n")
-                    
-                except Exception as e:
-                    error_count += 1
-                    print(f"\n{'='*60}")
-                    print(f"❌ FAILED for: {item['nama']}")
-                    print(f"{'='*60}")
-                    print(f"Error: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    print(f"{'='*60}\n")
+            removal = self.db.remove_barang_from_container(detail_ids) if detail_ids else {
+                'removed_count': 0, 'tax_removed_count': 0
+            }
+            success_count = removal['removed_count']
+            tax_cleaned_count = removal['tax_removed_count']
+            error_count += len(detail_ids) - success_count
+            
+            print(f"🗑️ Removed {success_count} detail rows, {tax_cleaned_count} tax records from container {container_id}")
             
             # Show result message with tax cleanup info
             result_msg = ""
@@ -6602,11 +6220,11 @@ class ContainerWindow:
                 result_msg += f"\nPeriksa log untuk detail error."
                 messagebox.showwarning("Sebagian Berhasil", result_msg)
             
-            # Refresh displays
+            # Refresh displays - baris detail yang dihapus dibuang langsung, tanpa memuat ulang container
             self.load_available_barang()
-            self.load_container_barang(container_id)
+            self.container_barang_tree.remove_rows([detail_iid(detail_id) for detail_id in removal.get('removed_ids', [])])
             self.load_tax_summary_tree(container_id)
-            self.load_containers()
+            self.refresh_container_rows([container_id])
             self.load_container_combo()
             self.load_customers()
             self.load_pengirim()
@@ -7366,7 +6984,7 @@ class ContainerWindow:
             # ============================================
             # STEP 6: INSERT ke Database
             # ============================================
-            self.db.execute_insert(
+            new_container_id = self.db.execute_insert(
                 "INSERT INTO containers (kapal_id, etd, party, container, seal, ref_joa) VALUES (?, ?, ?, ?, ?, ?)", 
                 (kapal_id, etd_db, party, container, seal, ref_joa)
             )
@@ -7386,7 +7004,7 @@ class ContainerWindow:
 
             # Refresh
             self.clear_form()
-            self.load_containers()
+            self.refresh_container_rows([new_container_id])
             self.load_container_combo()
             
             if self.refresh_callback:
@@ -7708,7 +7326,7 @@ class ContainerWindow:
                     messagebox.showinfo("Sukses", "✅ Container berhasil diupdate!")
                     
                     # Refresh
-                    self.load_containers()
+                    self.refresh_container_rows([container_id])
                     self.load_container_combo()
                     
                     if self.refresh_callback:
@@ -7796,7 +7414,7 @@ class ContainerWindow:
             
             messagebox.showinfo("Sukses", f"Container '{container_name}' berhasil dihapus!")
             
-            self.load_containers()
+            self.container_tree.remove_rows([str(container_id)])
             self.load_container_combo()
             self.load_available_barang()  # Refresh available barang
             self.load_customers()  # Refresh customers
@@ -7825,48 +7443,11 @@ class ContainerWindow:
     def load_containers(self):
         """Load containers into PaginatedTreeView with Indonesian date format"""
         try:
-            # SELECT dengan etd
-            containers = self.db.execute("""
-                SELECT 
-                    c.container_id,
-                    c.kapal_id,
-                    k.feeder as kapal_feeder,
-                    c.etd,
-                    c.party,
-                    c.container,
-                    c.seal,
-                    c.ref_joa,
-                    c.created_at,
-                    c.updated_at
-                FROM containers c
-                LEFT JOIN kapals k ON c.kapal_id = k.kapal_id
-                ORDER BY c.container_id DESC
-            """)
+            # Container + feeder + jumlah barang dalam satu query (tanpa query per container)
+            containers = self.db.get_containers_overview()
             
             # Format data untuk PaginatedTreeView
-            formatted_data = []
-            
-            for container in containers:
-                # Count barang in this container
-                container_barang = self.db.get_barang_in_container(container[0])
-                item_count = len(container_barang)
-                
-                # ✅ CONVERT ETD TO INDONESIAN FORMAT
-                etd_indonesian = self.format_date_indonesian(container[3]) if container[3] else '-'
-                
-                formatted_data.append({
-                    'iid': str(container[0]),
-                    'values': (
-                        container[0],  # container_id
-                        container[2] if container[2] else '-',  # kapal_feeder
-                        etd_indonesian,  # ✅ ETD in DD/MM/YYYY format
-                        container[4] if container[4] else '-',  # party
-                        container[5] if container[5] else '-',  # container
-                        container[6] if container[6] else '-',  # seal
-                        container[7] if container[7] else '-',  # ref_joa
-                        f"{item_count} items"
-                    )
-                })
+            formatted_data = [self.format_container_row(container) for container in containers]
             
             # Set data ke PaginatedTreeView
             self.container_tree.set_data(formatted_data)
@@ -7881,6 +7462,41 @@ class ContainerWindow:
             
         
     
+    def format_container_row(self, container):
+        """Format one get_containers_overview record into a container list row"""
+        # ✅ CONVERT ETD TO INDONESIAN FORMAT
+        etd_indonesian = self.format_date_indonesian(container['etd']) if container['etd'] else '-'
+        
+        return {
+            'iid': str(container['container_id']),
+            'values': (
+                container['container_id'],
+                container['kapal_feeder'] or '-',
+                etd_indonesian,  # ✅ ETD in DD/MM/YYYY format
+                container['party'] or '-',
+                container['container'] or '-',
+                container['seal'] or '-',
+                container['ref_joa'] or '-',
+                f"{container['item_count']} items"
+            )
+        }
+
+    def refresh_container_rows(self, container_ids):
+        """Refresh only the given containers in the container list (baru, diubah, atau dihapus)"""
+        try:
+            container_ids = [int(container_id) for container_id in container_ids]
+            containers = self.db.get_containers_overview(container_ids)
+            found = {container['container_id'] for container in containers}
+            
+            # Container baru tampil paling atas, sesuai ORDER BY container_id DESC
+            self.container_tree.upsert_rows([self.format_container_row(container) for container in containers],
+                                            insert_at=0)
+            self.container_tree.remove_rows([str(container_id) for container_id in container_ids
+                                             if container_id not in found])
+        except Exception as e:
+            print(f"Error refreshing container rows {container_ids}: {e}")
+            self.load_containers()
+    
     # Tambahkan fungsi helper di awal class ContainerWindow (setelah __init__)
 
     def format_date_indonesian(self, date_string):
@@ -8077,10 +7693,8 @@ class ContainerWindow:
                     # Assigned at (untuk unique ID)
                     assigned_at = safe_get(barang, 'assigned_at', '')
                     
-                    
-                    
-                    # Create unique iid
-                    unique_iid = f"{barang_id}_{assigned_at}"
+                    # iid = id baris detail_container (dipakai untuk hapus/edit per baris)
+                    unique_iid = detail_iid(safe_get(barang, 'detail_id', ''))
                     
                     # Append to formatted data
                     formatted_data.append({
@@ -15,7 +15,7 @@ class CustomerWindow:
         self.db = db
         self.refresh_callback = refresh_callback
         self.original_customer_data = []
-        self.list_tab_loaded = False  # Track if data has been loaded
+        self.list_tab_generation = None  # Generation tabel customers saat daftar terakhir dimuat
         self.create_window()
     
     def get_scale_factor(self):
@@ -506,9 +506,6 @@ class CustomerWindow:
     
     def filter_customers(self):
         """Filter customers based on search criteria"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
         search_name = self.search_name_var.get().strip()
         search_address = self.search_address_var.get().strip()
         
@@ -542,15 +539,22 @@ class CustomerWindow:
             
             filtered_data.append(customer)
         
+        formatted_data = []
         for customer in filtered_data:
             created_date = customer.get('created_at', '')[:10] if customer.get('created_at') else '-'
             
-            self.tree.insert('', tk.END, values=(
-                customer['customer_id'],
-                customer['nama_customer'],
-                customer['alamat_customer'] or '-',
-                created_date
-            ))
+            formatted_data.append({
+                'iid': str(customer['customer_id']),
+                'values': (
+                    customer['customer_id'],
+                    customer['nama_customer'],
+                    customer['alamat_customer'] or '-',
+                    created_date
+                )
+            })
+        
+        # Widget membersihkan tree sekali dan hanya menampilkan halaman aktif
+        self.tree.set_data(formatted_data)
         
         total_count = len(self.original_customer_data)
         filtered_count = len(filtered_data)
@@ -682,8 +686,6 @@ class CustomerWindow:
                 
                 messagebox.showinfo("Sukses", "Data customer berhasil diupdate!")
 
-                # Reset flag to ensure data reloads when switching tabs
-                self.list_tab_loaded = False
                 self.load_customers()
                 if self.refresh_callback:
                     self.refresh_callback()
@@ -763,8 +765,6 @@ class CustomerWindow:
             
             messagebox.showinfo("Sukses", f"Customer '{nama_customer}' berhasil dihapus!")
 
-            # Reset flag to ensure data reloads when switching tabs
-            self.list_tab_loaded = False
             self.load_customers()
             if self.refresh_callback:
                 self.refresh_callback()
@@ -1154,7 +1154,7 @@ class CustomerWindow:
                     alamat_col = 'Alamat'
                     df[alamat_col] = ''
             
-            existing_customers = {c['nama_customer'].upper() for c in self.db.get_all_customers()}
+            existing_customers = set(self.db.get_customer_name_map())
             
             valid_rows = df[df[nama_col].notna() & (df[nama_col].astype(str).str.strip() != '')]
             
@@ -1234,37 +1234,22 @@ class CustomerWindow:
             ):
                 return
             
-            existing_customers = {c['nama_customer'].upper(): c['customer_id'] for c in self.db.get_all_customers()}
+            # Satu transaksi untuk semua baris; nama yang sudah ada dilewati oleh database
+            names = valid_rows[nama_col].astype(str).str.strip()
+            if alamat_col in df.columns:
+                alamat = valid_rows[alamat_col].where(valid_rows[alamat_col].notna(), '').astype(str).str.strip()
+            else:
+                alamat = pd.Series('', index=valid_rows.index)
             
-            success_count = 0
-            errors = []
-            duplicate_list = []
+            customers = list(zip(names, alamat))
+            result = self.db.bulk_upsert_customers(customers)
             
-            for idx, (_, row) in enumerate(valid_rows.iterrows()):
-                try:
-                    nama = str(row[nama_col]).strip()
-                    alamat = str(row[alamat_col]).strip() if alamat_col in df.columns and pd.notna(row[alamat_col]) else ''
-                    
-                    if nama:
-                        if nama.upper() in existing_customers:
-                            duplicate_list.append({
-                                'nama_customer': nama,
-                                'alamat': alamat
-                            })
-                            continue
-                        
-                        customer_id = self.db.create_customer(nama, alamat)
-                        success_count += 1
-                        
-                        existing_customers[nama.upper()] = customer_id
-                
-                except Exception as e:
-                    error_detail = str(e)
-                    errors.append({
-                        'nama_customer': nama,
-                        'error': error_detail,
-                        'row_number': idx + 2
-                    })
+            success_count = result['inserted']
+            errors = []
+            duplicate_list = [
+                {'nama_customer': customers[idx][0], 'alamat': customers[idx][1]}
+                for idx in result['duplicate_indexes']
+            ]
             
             total_processed = len(valid_rows)
             
@@ -1278,8 +1263,6 @@ class CustomerWindow:
                     f"📊 Total diproses: {total_processed} baris data"
                 )
 
-            # Reset flag to ensure data reloads when switching tabs
-            self.list_tab_loaded = False
             self.load_customers()
             if self.refresh_callback:
                 self.refresh_callback()
@@ -1430,8 +1413,6 @@ class CustomerWindow:
             messagebox.showinfo("Sukses", f"Customer berhasil ditambahkan dengan ID: {customer_id}")
             self.clear_form()
 
-            # Reset flag to ensure data reloads when switching tabs
-            self.list_tab_loaded = False
             self.load_customers()
             if self.refresh_callback:
                 self.refresh_callback()
@@ -1455,6 +1436,7 @@ class CustomerWindow:
         try:
             print("Loading customers from database...")
             
+            generation = self.db.get_generation('customers')
             customers = self.db.get_all_customers()
             self.original_customer_data = customers
             print(f"Found {len(customers)} customers in database")
@@ -1475,6 +1457,7 @@ class CustomerWindow:
                 })
             
             self.tree.set_data(formatted_data)
+            self.list_tab_generation = generation
             
             print("Customer list loaded successfully with pagination")
             
@@ -1490,13 +1473,12 @@ class CustomerWindow:
         tab_text = event.widget.tab(selected_tab, "text")
 
         if "Daftar Customer" in tab_text:
-            # Lazy load: only load data the first time tab is opened
-            if not self.list_tab_loaded:
-                print("First time loading customer list - fetching data...")
+            # Lazy load: hanya query ulang jika tabel customers ditulis sejak load terakhir
+            if self.list_tab_generation != self.db.get_generation('customers'):
+                print("Customer list stale or not loaded - fetching data...")
                 self.load_customers()
-                self.list_tab_loaded = True
             else:
-                print("Customer list already loaded - skipping database query")
+                print("Customer list up to date - skipping database query")
 
 
 # Example usage and testing functions
@@ -1,3 +1,4 @@
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
@@ -6,6 +7,11 @@ from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 from tkinter import filedialog
 from src.utils.helpers import format_ton, setup_window_restore_behavior
 
+# Tabel yang membentuk daftar JOA (get_joa_catalog)
+JOA_CATALOG_TABLES = ('containers', 'kapals')
+# Tabel yang hanya memengaruhi angka JOA terpilih (get_joa_financials)
+JOA_FINANCIAL_TABLES = ('detail_container', 'container_delivery_costs', 'barang', 'customers')
+
 class JobOrderWindow:
     def __init__(self, parent, db):
         self.db = db
@@ -37,10 +43,79 @@ class JobOrderWindow:
         
         # Selected JOA
         self.selected_joa = None
+        self.joa_financials = None  # Hasil get_joa_financials() untuk JOA terpilih
         self.current_data = []
+        self.pending_db_changes = []  # (table, generation, ids) dari subscriber database
+        self.db_refresh_scheduled = False
         
         self.setup_ui()
         self.load_joa_list()
+
+        # Edit container/kapal/harga di window lain -> refresh_joa untuk JOA yang terdampak
+        self.unsubscribe_db = self.db.subscribe(self.on_db_changed,
+                                                tables=JOA_CATALOG_TABLES + JOA_FINANCIAL_TABLES)
+        self.window.bind('<Destroy>', self.on_window_destroy, add='+')
+
+    def on_db_changed(self, table, generation, ids):
+        """Subscriber generation database; bisa dipanggil dari worker thread, jadi hanya mencatat"""
+        self.pending_db_changes.append((table, generation, ids))
+        # Widget Tk hanya boleh dijadwalkan dari main thread; write dari worker diterapkan saat JOA dipilih
+        if threading.current_thread() is threading.main_thread() and not self.db_refresh_scheduled:
+            self.db_refresh_scheduled = True
+            self.window.after_idle(self.apply_db_changes)
+
+    def apply_db_changes(self, include_financials=True):
+        """Refresh only the JOAs touched by writes recorded since the last apply (main thread)
+
+        include_financials=False: perubahan angka diabaikan karena pemanggil akan
+        load_joa_details sendiri.
+        """
+        self.db_refresh_scheduled = False
+        changes = []
+        while self.pending_db_changes:
+            changes.append(self.pending_db_changes.pop(0))
+        if not changes:
+            return
+
+        affected = set()
+        for table, generation, ids in changes:
+            if table in JOA_FINANCIAL_TABLES:
+                if include_financials and self.selected_joa:
+                    affected.add(self.selected_joa)
+            elif ids is None:
+                # Baris mana pun bisa berubah (termasuk ref_joa): satu query catalog untuk semua JOA
+                self.load_joa_list()
+                if self.selected_joa not in self.joa_data:
+                    self.selected_joa = None
+                elif include_financials:
+                    self.load_joa_details(self.selected_joa)
+                return
+            else:
+                affected.update(self.joas_for_ids(table, ids))
+
+        for joa in sorted(affected):
+            self.refresh_joa(joa)
+
+    def joas_for_ids(self, table, ids):
+        """JOAs holding the given container/kapal ids, before and after the write"""
+        ids = set(ids)
+        placeholders = ','.join('?' for _ in ids)
+        if table == 'containers':
+            # Container yang pindah JOA atau dihapus masih tercatat di JOA lamanya
+            joas = {joa for joa, info in self.joa_data.items() if ids.intersection(info['container_ids'])}
+            query = f"SELECT DISTINCT ref_joa FROM containers WHERE container_id IN ({placeholders})"
+        else:
+            joas = set()
+            query = f"SELECT DISTINCT ref_joa FROM containers WHERE kapal_id IN ({placeholders})"
+        for row in self.db.execute(query, tuple(ids)):
+            if row['ref_joa']:
+                joas.add(row['ref_joa'])
+        return joas
+
+    def on_window_destroy(self, event):
+        if event.widget is self.window and self.unsubscribe_db:
+            self.unsubscribe_db()
+            self.unsubscribe_db = None
     
     def parse_party(self, party_text):
         import re
@@ -390,67 +465,8 @@ class JobOrderWindow:
     def load_joa_list(self):
         """Load list of JOAs"""
         try:
-            query = """
-                SELECT DISTINCT c.ref_joa, c.container_id, c.container, c.kapal_id, c.party
-                FROM containers c
-                WHERE c.ref_joa IS NOT NULL AND c.ref_joa != ''
-                ORDER BY c.ref_joa
-            """
-            
-            containers = self.db.execute(query)
-            
-            # Group containers by JOA
-            self.joa_data = {}
-            for row in containers:
-                joa = row['ref_joa']
-                if joa not in self.joa_data:
-                    self.joa_data[joa] = {
-                        'containers': [],
-                        'container': None,
-                        'feeder': None,
-                        'destination': None,
-                        'etd_sub': None,
-                        'kapal_id': None,
-                        'party': None,
-                        'shipping_line': None
-                    }
-                
-                container_id = row['container_id']
-                container = row['container']
-                kapal_id = row['kapal_id'] if row['kapal_id'] else None
-                party = row['party'] if row['party'] else None
-                
-                self.joa_data[joa]['containers'].append(container)
-                
-                if self.joa_data[joa]['kapal_id'] is None:
-                    self.joa_data[joa]['kapal_id'] = kapal_id
-                if self.joa_data[joa]['party'] is None:
-                    self.joa_data[joa]['party'] = party
-                
-                if kapal_id:
-                    try:
-                        kapal_query = """
-                            SELECT feeder, destination, etd_sub, cls, open, full, shipping_line
-                            FROM kapals
-                            WHERE kapal_id = ?
-                        """
-
-                        kapal_result = self.db.execute_one(kapal_query, (kapal_id,))
-
-                        if kapal_result:
-                            if self.joa_data[joa]['feeder'] is None:
-                                self.joa_data[joa]['feeder'] = kapal_result['feeder']
-                                self.joa_data[joa]['destination'] = kapal_result['destination']
-                                self.joa_data[joa]['etd_sub'] = kapal_result['etd_sub']
-                                self.joa_data[joa]['cls'] = kapal_result['cls']
-                                self.joa_data[joa]['open'] = kapal_result['open']
-                                self.joa_data[joa]['full'] = kapal_result['full']
-                                self.joa_data[joa]['shipping_line'] = kapal_result['shipping_line']
-                    except Exception as e:
-                        print(f"ERROR getting kapal info: {e}")
-                
-                if self.joa_data[joa]['container'] is None:
-                    self.joa_data[joa]['container'] = container
+            # Satu query: container per JOA + info kapal sudah di-join
+            self.joa_data = self.db.get_joa_catalog()
             
             # Populate listbox
             self.joa_listbox.delete(0, tk.END)
@@ -464,6 +480,32 @@ class JobOrderWindow:
             traceback.print_exc()
             messagebox.showerror("Error", f"Gagal memuat daftar JOA:\n{str(e)}")
     
+    def refresh_joa(self, joa):
+        """Reload a single JOA from the database instead of the whole list"""
+        try:
+            catalog = self.db.get_joa_catalog(joa)
+            
+            if joa in catalog:
+                is_new = joa not in self.joa_data
+                self.joa_data[joa] = catalog[joa]
+                if is_new:
+                    self.filter_joa_list()
+            else:
+                # JOA sudah tidak punya container lagi
+                self.joa_data.pop(joa, None)
+                self.filter_joa_list()
+                if self.selected_joa == joa:
+                    self.selected_joa = None
+                return
+            
+            if self.selected_joa == joa:
+                self.load_joa_details(joa)
+                
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            messagebox.showerror("Error", f"Gagal memuat ulang JOA:\n{str(e)}")
+    
     def filter_joa_list(self):
         """Filter JOA list based on search"""
         search_text = self.search_var.get().lower()
@@ -479,7 +521,11 @@ class JobOrderWindow:
         if selection:
             index = selection[0]
             self.selected_joa = self.joa_listbox.get(index)
-            self.load_joa_details(self.selected_joa)
+            if self.pending_db_changes:
+                # Write dari worker thread yang belum diterapkan; angka JOA di-load di bawah
+                self.apply_db_changes(include_financials=False)
+            if self.selected_joa:
+                self.load_joa_details(self.selected_joa)
     
     def load_joa_details(self, joa):
         """Load details for selected JOA (Sales + Purchase)"""
@@ -495,26 +541,14 @@ class JobOrderWindow:
             self.feeder_label.config(text=joa_info.get('feeder', '-') or '-')
             self.destination_label.config(text=joa_info.get('destination', '-') or '-')
 
-            # Ambil semua containers untuk JOA ini
-            query = """
-                SELECT container_id, container, party
-                FROM containers 
-                WHERE ref_joa = ?
-            """
-            containers = self.db.execute(query, (joa,))
-            container_ids = [c['container_id'] for c in containers]
+            # Semua angka JOA (party, sales per penerima, biaya POL/POD) dalam satu pemanggilan
+            financials = self.db.get_joa_financials(joa)
+            financials['ref_joa'] = joa
+            self.joa_financials = financials
 
-            # Hitung jumlah container per tipe (20', 21', 40'HC)
-            total_20, total_21, total_40 = 0, 0, 0
-            for cont in containers:
-                p = (cont['party'] or '').strip().upper()
-                # Prioritas: 40'HC > 21' > 20'
-                if '40' in p:
-                    total_40 += 1
-                elif '21' in p:
-                    total_21 += 1
-                elif '20' in p:
-                    total_20 += 1
+            total_20 = financials['party_count_20']
+            total_21 = financials['party_count_21']
+            total_40 = financials['party_count_40']
 
             # Buat string party
             party_parts = []
@@ -542,78 +576,28 @@ class JobOrderWindow:
 
             # Bersihkan treeview lama
             for tree in (self.sales_tree, self.pol_tree, self.pod_tree):
-                for item in tree.get_children():
-                    tree.delete(item)
+                tree.delete(*tree.get_children())
 
-            if not container_ids:
+            if not financials['container_count']:
                 print("No containers found!")
                 return
 
             # ============================================================
             # SALES INVOICE
             # ============================================================
-            sales_total, pol_total, pod_total = 0, 0, 0
-            placeholders = ','.join(['?' for _ in container_ids])
+            sales_total = financials['sales_total']
+            pol_total = financials['pol_total']
+            pod_total = financials['pod_total']
+            print(f"Found {len(financials['receivers'])} customers")
 
-            # Cari distinct customer (penerima)
-            customer_query = f"""
-                SELECT DISTINCT
-                    b.penerima as customer_id,
-                    COALESCE(c.nama_customer, b.penerima) as customer_name
-                FROM barang b
-                JOIN detail_container dc ON b.barang_id = dc.barang_id
-                JOIN customers c ON c.customer_id = b.penerima
-                WHERE dc.container_id IN ({placeholders})
-                ORDER BY customer_name
-            """
-            customers = self.db.execute(customer_query, tuple(container_ids))
-            print(f"Found {len(customers)} customers")
-
-            for customer in customers:
-                customer_id = customer['customer_id']
-                customer_name = customer['customer_name']
-
-                # Ambil barang untuk customer ini
-                barang_query = f"""
-                    SELECT
-                        b.barang_id,
-                        b.nama_barang,
-                        b.m3_barang,
-                        b.ton_barang,
-                        dc.door_type,
-                        dc.colli_amount,
-                        dc.total_harga
-                    FROM barang b
-                    JOIN detail_container dc ON b.barang_id = dc.barang_id
-                    WHERE b.penerima = ? AND dc.container_id IN ({placeholders})
-                """
-                barangs = self.db.execute(barang_query, (customer_id, *container_ids))
-
-                if not barangs:
-                    continue
-
-                total_m3, total_ton, total_colli, total_invoice = 0, 0, 0, 0
-                for b in barangs:
-                    total_colli += b['colli_amount']
-                    if b['m3_barang']:
-                        total_m3 += b['m3_barang'] * b['colli_amount']
-                    if b['ton_barang']:
-                        total_ton += b['ton_barang'] * b['colli_amount']
-                    total_invoice += b['total_harga'] if b['total_harga'] else 0
-
-                # Door type → tentukan POL / POD
-                door_type = barangs[0]['door_type'] if barangs[0]['door_type'] else 'PP'
-                if door_type == 'PP':
-                    pol_total += total_invoice
-                else:
-                    pod_total += total_invoice
-
-                sales_total += total_invoice
+            for receiver in financials['receivers']:
+                total_m3 = receiver['total_m3']
+                total_ton = receiver['total_ton']
 
                 # ✅ Insert ke sales_tree TANPA INVOICE
                 self.sales_tree.insert('', 'end', values=(
-                    customer_name,
-                    f"Rp {total_invoice:,.0f}",
+                    receiver['customer_name'],
+                    f"Rp {receiver['total_invoice']:,.0f}",
                     f"{total_m3:.4f}" if total_m3 else "-",
                     format_ton(total_ton) if total_ton else "-"
                 ))
@@ -624,92 +608,20 @@ class JobOrderWindow:
             # ============================================================
             # PURCHASE INVOICE - LOGIKA POL vs POD BERDASARKAN LOKASI
             # ============================================================
-            purchase_pol_total, purchase_pod_total, purchase_total = 0, 0, 0
-            
-            delivery_cost_query = f"""
-                SELECT 
-                    cdc.description as cost_type,
-                    cdc.delivery as delivery_type,
-                    cdc.cost as cost_amount,
-                    cdc.cost_description as notes,
-                    cont.party as party
-                FROM container_delivery_costs cdc
-                JOIN containers cont ON cont.container_id = cdc.container_id
-                WHERE cdc.container_id IN ({placeholders})
-            """
-            delivery_costs = self.db.execute(delivery_cost_query, tuple(container_ids))
+            # POL = Lokasi Surabaya (atau kosong), POD = Lokasi selain Surabaya
+            purchase = self.build_purchase_lines(financials)
+            purchase_pol_total = purchase['pol_total']
+            purchase_pod_total = purchase['pod_total']
+            purchase_total = purchase['total']
 
-            # ✅ LOGIKA: Pakai kolom delivery untuk tentukan POL vs POD
-            # POL = Lokasi Surabaya (atau kosong)
-            # POD = Lokasi selain Surabaya
-            
-            cost_summary_pol, cost_summary_pod = {}, {}
-            
-            for cost in delivery_costs:
-                cost_type = cost['cost_type'] or ''
-                delivery_type = cost['delivery_type'] or ''
-                amount = cost['cost_amount'] or 0
-                notes = cost['notes'] or ''
-                party = cost['party'] or ''
-
-                # Deteksi ukuran container
-                size = '40' if '40' in party else '21' if '21' in party else '20' if '20' in party else None
-                
-                # ✅ PERBAIKAN LOGIKA:
-                # Jika delivery_type kosong atau mengandung "Surabaya" → POL
-                # Jika delivery_type mengandung nama kota lain → POD
-                delivery_lower = delivery_type.lower()
-                
-                is_pol = (
-                    not delivery_type or  # Kosong = default Surabaya = POL
-                    'surabaya' in delivery_lower or 
-                    'sby' in delivery_lower or
-                    'sub' in delivery_lower
-                )
-                
-                print(f"DEBUG Cost: '{cost_type}' | Delivery: '{delivery_type}' | Lokasi: {'POL (Surabaya)' if is_pol else 'POD (Destination)'}")
-                
-                key = (cost_type, size)
-                target = cost_summary_pol if is_pol else cost_summary_pod
-                
-                if key not in target:
-                    target[key] = {'notes': notes, 'size': size, 'unit_cost': amount}
-
-            # POL costs
-            for (cost_type, size), data in cost_summary_pol.items():
-                # Determine quantity based on container size/type
-                qty_map = {'20': total_20, '21': total_21, '40': total_40}
-                qty = qty_map.get(size, 1)
-                unit = f"{qty}x {size}'" if size else "1 invoice"
-                total = data['unit_cost'] * qty
-                ket = f"{cost_type} {size}" if size else cost_type
-
-                purchase_pol_total += total
-                purchase_total += total
-                self.pol_tree.insert('', 'end', values=(
-                    ket,
-                    unit,
-                    f"Rp {data['unit_cost']:,.0f}",
-                    f"Rp {total:,.0f}"
-                ))
-
-            # POD costs
-            for (cost_type, size), data in cost_summary_pod.items():
-                # Determine quantity based on container size/type
-                qty_map = {'20': total_20, '21': total_21, '40': total_40}
-                qty = qty_map.get(size, 1)
-                unit = f"{qty}x {size}'" if size else "1 invoice"
-                total = data['unit_cost'] * qty
-                ket = f"{cost_type} {size}" if size else cost_type
-
-                purchase_pod_total += total
-                purchase_total += total
-                self.pod_tree.insert('', 'end', values=(
-                    ket,
-                    unit,
-                    f"Rp {data['unit_cost']:,.0f}",
-                    f"Rp {total:,.0f}"
-                ))
+            for bucket, tree in (('pol', self.pol_tree), ('pod', self.pod_tree)):
+                for line in purchase[bucket]:
+                    tree.insert('', 'end', values=(
+                        line['ket'],
+                        line['unit'],
+                        f"Rp {line['unit_cost']:,.0f}",
+                        f"Rp {line['total']:,.0f}"
+                    ))
 
             # Update purchase labels
             self.pol_purchase_total_label.config(text=f"Rp {purchase_pol_total:,.0f}")
@@ -733,10 +645,43 @@ class JobOrderWindow:
             print(f"ERROR in load_joa_details: {str(e)}")
             messagebox.showerror("Error", f"Gagal memuat detail JOA:\n{str(e)}")
 
+    @staticmethod
+    def build_purchase_lines(financials):
+        """Purchase invoice lines (POL/POD) from get_joa_financials(), dipakai tabel dan export Excel
+
+        Returns dict: {'pol': [...], 'pod': [...], 'pol_total', 'pod_total', 'total'}
+        dengan setiap line {ket, unit, unit_cost, total}
+        """
+        qty_map = {
+            '20': financials['party_count_20'],
+            '21': financials['party_count_21'],
+            '40': financials['party_count_40'],
+        }
+        purchase = {'pol': [], 'pod': [], 'pol_total': 0, 'pod_total': 0, 'total': 0}
+
+        for bucket in ('pol', 'pod'):
+            for cost in financials['delivery_costs'][bucket]:
+                cost_type = cost['cost_type']
+                size = cost['size']
+
+                # Determine quantity based on container size/type
+                qty = qty_map.get(size, 1)
+                total = cost['unit_cost'] * qty
+                purchase[bucket].append({
+                    'ket': f"{cost_type} {size}" if size else cost_type,
+                    'unit': f"{qty}x {size}'" if size else "1 invoice",
+                    'unit_cost': cost['unit_cost'],
+                    'total': total,
+                })
+                purchase[f'{bucket}_total'] += total
+                purchase['total'] += total
+
+        return purchase
+
     def refresh_current_joa(self):
         """Refresh current JOA data"""
         if self.selected_joa:
-            self.load_joa_details(self.selected_joa)
+            self.refresh_joa(self.selected_joa)
     
     def export_to_excel(self):
         """Export current JOA to Excel"""
@@ -780,8 +725,13 @@ class JobOrderWindow:
                 'party_display': self.party_label.cget('text'),
             }
             
+            # Angka export sama dengan yang tampil: hasil get_joa_financials() JOA terpilih
+            financials = self.joa_financials
+            if not financials or financials.get('ref_joa') != self.selected_joa:
+                financials = self.db.get_joa_financials(self.selected_joa)
+
             # Create side-by-side layout
-            self._create_side_by_side_from_ui(ws, joa_info)
+            self._create_side_by_side(ws, joa_info, financials)
             
             # Save
             wb.save(filename)
@@ -815,8 +765,8 @@ class JobOrderWindow:
             for col in range(start_col, end_col + 1):
                 ws.cell(row=row, column=col).border = border
 
-    def _create_side_by_side_from_ui(self, ws, joa_info):
-        """Create Sales and Purchase Invoice side by side"""
+    def _create_side_by_side(self, ws, joa_info, financials):
+        """Create Sales and Purchase Invoice side by side from get_joa_financials() numbers"""
         # Styling
         header_font = Font(bold=True, size=10)
         title_font = Font(bold=True, size=12)
@@ -877,50 +827,30 @@ class JobOrderWindow:
             cell.border = border_thin
             cell.alignment = Alignment(horizontal='center', vertical='center')
         
-        # Ambil Sales Data dari Treeview
+        # Sales per penerima langsung dari financials (angka mentah, bukan teks Treeview)
         row += 1
         sales_start_row = row
         
-        for item in self.sales_tree.get_children():
-            values = self.sales_tree.item(item)['values']
-            
+        for receiver in financials['receivers']:
             # Customer name
-            cell = ws.cell(row=row, column=1, value=values[0])
+            cell = ws.cell(row=row, column=1, value=receiver['customer_name'])
             cell.border = border_thin
             cell.alignment = Alignment(horizontal='left', vertical='center')
             
             # Rp
-            rp_str = str(values[1]).replace('Rp', '').replace(',', '').strip()
-            try:
-                rp_val = float(rp_str)
-            except:
-                rp_val = 0
-            
-            cell = ws.cell(row=row, column=2, value=rp_val)
+            cell = ws.cell(row=row, column=2, value=receiver['total_invoice'] or 0)
             cell.border = border_thin
             cell.number_format = '"Rp "#,##0'
             cell.alignment = Alignment(horizontal='right', vertical='center')
             
             # Kubikasi
-            kubikasi_str = str(values[2]).replace('-', '0')
-            try:
-                kubikasi = float(kubikasi_str)
-            except:
-                kubikasi = 0
-            
-            cell = ws.cell(row=row, column=3, value=kubikasi)
+            cell = ws.cell(row=row, column=3, value=receiver['total_m3'] or 0)
             cell.border = border_thin
             cell.number_format = '0.0000'
             cell.alignment = Alignment(horizontal='right', vertical='center')
             
             # Tonase
-            tonase_str = str(values[3]).replace('-', '0')
-            try:
-                tonase = float(tonase_str)
-            except:
-                tonase = 0
-            
-            cell = ws.cell(row=row, column=4, value=tonase)
+            cell = ws.cell(row=row, column=4, value=receiver['total_ton'] or 0)
             cell.border = border_thin
             cell.number_format = '0.00'
             cell.alignment = Alignment(horizontal='right', vertical='center')
@@ -930,6 +860,7 @@ class JobOrderWindow:
         sales_end_row = row
         
         # ==================== RIGHT SIDE: PURCHASE INVOICE ====================
+        purchase = self.build_purchase_lines(financials)
         
         # Title Purchase
         ws.merge_cells('F1:I1')
@@ -987,43 +918,29 @@ class JobOrderWindow:
             cell.border = border_thin
             cell.alignment = Alignment(horizontal='center', vertical='center')
         
-        # Ambil POL Data dari Treeview
+        # POL lines dari build_purchase_lines
         row += 1
         pol_start_row = row
         
-        for item in self.pol_tree.get_children():
-            values = self.pol_tree.item(item)['values']
-            
+        for line in purchase['pol']:
             # Keterangan
-            cell = ws.cell(row=row, column=6, value=values[0])
+            cell = ws.cell(row=row, column=6, value=line['ket'])
             cell.border = border_thin
             cell.alignment = Alignment(horizontal='left', vertical='center')
             
             # Unit
-            cell = ws.cell(row=row, column=7, value=values[1])
+            cell = ws.cell(row=row, column=7, value=line['unit'])
             cell.border = border_thin
             cell.alignment = Alignment(horizontal='center', vertical='center')
             
             # Biaya POL
-            biaya_str = str(values[2]).replace('Rp', '').replace(',', '').strip()
-            try:
-                biaya = float(biaya_str)
-            except:
-                biaya = 0
-            
-            cell = ws.cell(row=row, column=8, value=biaya)
+            cell = ws.cell(row=row, column=8, value=line['unit_cost'])
             cell.border = border_thin
             cell.number_format = '"Rp "#,##0'
             cell.alignment = Alignment(horizontal='right', vertical='center')
             
             # Total
-            total_str = str(values[3]).replace('Rp', '').replace(',', '').strip()
-            try:
-                total = float(total_str)
-            except:
-                total = 0
-            
-            cell = ws.cell(row=row, column=9, value=total)
+            cell = ws.cell(row=row, column=9, value=line['total'])
             cell.border = border_thin
             cell.number_format = '"Rp "#,##0'
             cell.alignment = Alignment(horizontal='right', vertical='center')
@@ -1051,43 +968,29 @@ class JobOrderWindow:
             cell.border = border_thin
             cell.alignment = Alignment(horizontal='center', vertical='center')
         
-        # Ambil POD Data dari Treeview
+        # POD lines dari build_purchase_lines
         row += 1
         pod_start_row = row
         
-        for item in self.pod_tree.get_children():
-            values = self.pod_tree.item(item)['values']
-            
+        for line in purchase['pod']:
             # Keterangan
-            cell = ws.cell(row=row, column=6, value=values[0])
+            cell = ws.cell(row=row, column=6, value=line['ket'])
             cell.border = border_thin
             cell.alignment = Alignment(horizontal='left', vertical='center')
             
             # Unit
-            cell = ws.cell(row=row, column=7, value=values[1])
+            cell = ws.cell(row=row, column=7, value=line['unit'])
             cell.border = border_thin
             cell.alignment = Alignment(horizontal='center', vertical='center')
             
             # Biaya POD
-            biaya_str = str(values[2]).replace('Rp', '').replace(',', '').strip()
-            try:
-                biaya = float(biaya_str)
-            except:
-                biaya = 0
-            
-            cell = ws.cell(row=row, column=8, value=biaya)
+            cell = ws.cell(row=row, column=8, value=line['unit_cost'])
             cell.border = border_thin
             cell.number_format = '"Rp "#,##0'
             cell.alignment = Alignment(horizontal='right', vertical='center')
             
             # Total
-            total_str = str(values[3]).replace('Rp', '').replace(',', '').strip()
-            try:
-                total = float(total_str)
-            except:
-                total = 0
-            
-            cell = ws.cell(row=row, column=9, value=total)
+            cell = ws.cell(row=row, column=9, value=line['total'])
             cell.border = border_thin
             cell.number_format = '"Rp "#,##0'
             cell.alignment = Alignment(horizontal='right', vertical='center')
@@ -1105,11 +1008,7 @@ class JobOrderWindow:
         cell.font = Font(bold=True, size=11)
         cell.alignment = Alignment(horizontal='right', vertical='center')
         
-        pol_total_str = self.pol_purchase_total_label.cget('text').replace('Rp', '').replace(',', '').strip()
-        try:
-            pol_total_val = float(pol_total_str)
-        except:
-            pol_total_val = 0
+        pol_total_val = purchase['pol_total'] or 0
         
         cell = ws.cell(row=row, column=9, value=pol_total_val)
         cell.font = Font(bold=True, size=11)
@@ -1122,11 +1021,7 @@ class JobOrderWindow:
         cell.font = Font(bold=True, size=11)
         cell.alignment = Alignment(horizontal='right', vertical='center')
         
-        pod_total_str = self.pod_purchase_total_label.cget('text').replace('Rp', '').replace(',', '').strip()
-        try:
-            pod_total_val = float(pod_total_str)
-        except:
-            pod_total_val = 0
+        pod_total_val = purchase['pod_total'] or 0
         
         cell = ws.cell(row=row, column=9, value=pod_total_val)
         cell.font = Font(bold=True, size=11)
@@ -1139,11 +1034,7 @@ class JobOrderWindow:
         cell.font = Font(bold=True, size=12)
         cell.alignment = Alignment(horizontal='right', vertical='center')
         
-        purchase_total_str = self.purchase_total_label.cget('text').replace('Rp', '').replace(',', '').strip()
-        try:
-            purchase_total_val = float(purchase_total_str)
-        except:
-            purchase_total_val = 0
+        purchase_total_val = purchase['total'] or 0
         
         cell = ws.cell(row=row, column=9, value=purchase_total_val)
         cell.font = Font(bold=True, size=12)
@@ -1156,11 +1047,7 @@ class JobOrderWindow:
         cell.font = Font(bold=True, size=12)
         cell.alignment = Alignment(horizontal='left', vertical='center')
         
-        sales_total_str = self.sales_total_label.cget('text').replace('Rp', '').replace(',', '').strip()
-        try:
-            sales_total_val = float(sales_total_str)
-        except:
-            sales_total_val = 0
+        sales_total_val = financials['sales_total'] or 0
         
         cell = ws.cell(row=row, column=2, value=sales_total_val)
         cell.font = Font(bold=True, size=12)
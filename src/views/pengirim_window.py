@@ -1175,40 +1175,13 @@ class SenderWindow:
             ):
                 return
             
-            # Get existing senders for duplicate check
-            existing_senders = {s['nama_pengirim'].upper(): s['pengirim_id'] for s in self.db.get_all_senders()}
+            # Satu transaksi untuk semua baris; nama yang sudah ada dilewati oleh database
+            names = valid_rows[nama_col].astype(str).str.strip().tolist()
+            result = self.db.bulk_upsert_senders(names)
             
-            # Initialize tracking variables
-            success_count = 0
+            success_count = result['inserted']
             errors = []
-            duplicate_list = []
-            
-            for idx, (_, row) in enumerate(valid_rows.iterrows()):
-                try:
-                    nama = str(row[nama_col]).strip()
-                    
-                    if nama:
-                        # Check if sender already exists
-                        if nama.upper() in existing_senders:
-                            duplicate_list.append({
-                                'nama_pengirim': nama
-                            })
-                            continue
-                        
-                        # Create new sender
-                        sender_id = self.db.create_sender(nama)
-                        success_count += 1
-                        
-                        # Add to existing senders to prevent duplicates in this batch
-                        existing_senders[nama.upper()] = sender_id
-                
-                except Exception as e:
-                    error_detail = str(e)
-                    errors.append({
-                        'nama_pengirim': nama,
-                        'error': error_detail,
-                        'row_number': idx + 2
-                    })
+            duplicate_list = [{'nama_pengirim': names[idx]} for idx in result['duplicate_indexes']]
             
             # Show results
             total_processed = len(valid_rows)
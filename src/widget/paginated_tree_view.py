@@ -1,16 +1,197 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import math
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+# Nama bulan Indonesia (dan singkatannya) untuk parsing tanggal saat sorting
+INDONESIAN_MONTHS = {
+    'januari': 1, 'februari': 2, 'maret': 3, 'april': 4, 'mei': 5, 'juni': 6,
+    'juli': 7, 'agustus': 8, 'september': 9, 'oktober': 10, 'november': 11, 'desember': 12,
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'jun': 6, 'jul': 7, 'agu': 8, 'agt': 8,
+    'aug': 8, 'sep': 9, 'okt': 10, 'oct': 10, 'nov': 11, 'des': 12, 'dec': 12,
+}
+
+_NUMBER_PATTERN = re.compile(r'^(rp\.?\s*)?(-?[\d.,]*\d)\s*([^\d\s]{0,6})$', re.IGNORECASE)
+_NUMERIC_DATE_PATTERN = re.compile(r'^(\d{1,4})[/-](\d{1,2})[/-](\d{1,4})(?:[ T](\d{1,2}):(\d{2})(?::(\d{2}))?)?')
+_TEXT_DATE_PATTERN = re.compile(r'^(\d{1,2})\s+([a-z]+)\s+(\d{4})$', re.IGNORECASE)
+
+
+# Tanda desimal per kolom untuk PaginatedTreeView(decimal_marks=...): '.' untuk
+# format Python/format_ton ('1,500.25', '1.500' = 1,5), ',' untuk format Indonesia/
+# format_berat ('1.500,25', '0,125'). Kolom tanpa hint memakai tebakan otomatis.
+DECIMAL_POINT = '.'
+DECIMAL_COMMA = ','
+
+
+def _parse_number(text, rupiah=False, decimal_mark=None):
+    """Parse '1,500,000', '1.500.000', '1,5' or '9.929' into float
+
+    decimal_mark ('.' atau ',') menentukan arti separator secara pasti; tanpa
+    itu separator ditebak dari bentuk angka.
+    """
+    if decimal_mark is not None:
+        thousands_mark = ',' if decimal_mark == DECIMAL_POINT else '.'
+        return float(text.replace(thousands_mark, '').replace(decimal_mark, '.'))
+    
+    if ',' in text and '.' in text:
+        # Separator terakhir adalah desimal
+        if text.rfind(',') > text.rfind('.'):
+            text = text.replace('.', '').replace(',', '.')
+        else:
+            text = text.replace(',', '')
+    elif ',' in text:
+        # Koma tunggal dengan bukan 3 digit di belakangnya = desimal (mis. berat '1,5')
+        parts = text.split(',')
+        if len(parts) == 2 and len(parts[1]) != 3:
+            text = text.replace(',', '.')
+        else:
+            text = text.replace(',', '')
+    elif text.count('.') > 1 or (rupiah and len(text.split('.')[-1]) == 3):
+        # Titik sebagai pemisah ribuan (format Rupiah Indonesia)
+        text = text.replace('.', '')
+    return float(text)
+
+
+def _parse_date(text):
+    """Parse DD/MM/YYYY, YYYY-MM-DD[ HH:MM[:SS]] or '15 Januari 2025' into a sortable number"""
+    match = _NUMERIC_DATE_PATTERN.match(text)
+    if match:
+        first, month, last = match.group(1), int(match.group(2)), match.group(3)
+        if len(first) == 4:
+            year, day = int(first), int(last)
+        elif len(last) == 4:
+            year, day = int(last), int(first)
+        else:
+            return None
+        hour, minute, second = (int(part or 0) for part in match.group(4, 5, 6))
+    else:
+        match = _TEXT_DATE_PATTERN.match(text)
+        if not match or match.group(2).lower() not in INDONESIAN_MONTHS:
+            return None
+        day, month, year = int(match.group(1)), INDONESIAN_MONTHS[match.group(2).lower()], int(match.group(3))
+        hour = minute = second = 0
+    
+    try:
+        date_value = datetime(year, month, day, hour, minute, second)
+    except ValueError:
+        return None
+    return date_value.toordinal() * 86400 + hour * 3600 + minute * 60 + second
+
+
+def make_sort_key(value, decimal_mark=None):
+    """Typed sort key for a cell value: numbers/Rupiah/dates before text, empty last
+
+    decimal_mark: tanda desimal kolom (DECIMAL_POINT/DECIMAL_COMMA), None = tebak otomatis
+    """
+    if value is None:
+        return (2, 0, '')
+    if isinstance(value, (int, float)):
+        return (0, float(value), '')
+    
+    text = str(value).strip()
+    if not text or text == '-':
+        return (2, 0, '')
+    
+    date_value = _parse_date(text)
+    if date_value is not None:
+        return (0, date_value, '')
+    
+    match = _NUMBER_PATTERN.match(text)
+    if match:
+        try:
+            return (0, _parse_number(match.group(2), rupiah=bool(match.group(1)),
+                                     decimal_mark=decimal_mark), '')
+        except ValueError:
+            pass
+    
+    return (1, 0, text.lower())
+
+
+class TreeDataSource(ABC):
+    """Server-side data source protocol for PaginatedTreeView
+
+    Implementasi wajib menyediakan count() dan fetch_page(); widget hanya
+    meminta baris untuk halaman yang sedang tampil, jadi data lengkap tidak
+    perlu dimuat ke memory. Baris hasil fetch_page memakai format yang sama
+    dengan set_data (dict {'iid', 'values', 'tags'} atau tuple values).
+    """
+
+    @abstractmethod
+    def count(self, filters=None):
+        """Return total number of rows matching filters"""
+
+    @abstractmethod
+    def fetch_page(self, offset, limit, sort=None, filters=None):
+        """Return rows for one page; sort is (column, descending) or None"""
+
+    def can_sort(self, column):
+        """Whether fetch_page can order by this TreeView column"""
+        return False
+
+
+class QueryDataSource(TreeDataSource):
+    """TreeDataSource built from database callables
+
+    count_func(filters) dan fetch_func(offset, limit, sort, filters) biasanya
+    method AppDatabase yang memakai COUNT(*) dan LIMIT/OFFSET. format_row
+    (opsional) mengubah setiap record database menjadi baris Treeview.
+    sort_columns memetakan kolom TreeView ke kunci sort yang dipahami
+    fetch_func (diteruskan sebagai ORDER BY di database).
+    """
+
+    def __init__(self, count_func, fetch_func, format_row=None, sort_columns=None):
+        self.count_func = count_func
+        self.fetch_func = fetch_func
+        self.format_row = format_row
+        self.sort_columns = sort_columns or {}
+
+    def count(self, filters=None):
+        return self.count_func(filters)
+
+    def can_sort(self, column):
+        return column in self.sort_columns
+
+    def fetch_page(self, offset, limit, sort=None, filters=None):
+        if sort and sort[0] in self.sort_columns:
+            sort = (self.sort_columns[sort[0]], sort[1])
+        else:
+            sort = None
+        records = self.fetch_func(offset, limit, sort, filters)
+        if self.format_row:
+            return [self.format_row(record) for record in records]
+        return list(records)
+
 
 class PaginatedTreeView:
-    """Custom TreeView with pagination support"""
+    """Custom TreeView with pagination support
+
+    Dengan virtual=True widget tidak memakai halaman: Treeview hanya berisi
+    sejumlah slot tetap (sebanyak baris yang terlihat) dan nilai slot diganti
+    saat scrollbar/mouse wheel bergerak, sehingga jumlah item Tk tetap konstan
+    berapa pun panjang data.
+    """
+    
+    # Halaman lebih besar dari ini di-insert bertahap lewat after_idle; harus di
+    # bawah ukuran halaman terbesar (100) supaya halaman penuh tampil per chunk
+    INSERT_CHUNK_SIZE = 50
     
-    def __init__(self, parent, columns, show='headings', height=10, items_per_page=20):
+    # Ukuran blok baris yang diambil sekaligus dari data source di mode virtual
+    VIRTUAL_BLOCK_SIZE = 200
+    VIRTUAL_BLOCK_CACHE = 8
+    
+    def __init__(self, parent, columns, show='headings', height=10, items_per_page=20, virtual=False,
+                 sortable=True, decimal_marks=None):
         self.parent = parent
         self.columns = columns
         self.show = show
         self.height = height
         self.items_per_page = items_per_page
+        self.virtual = virtual
+        self.sortable = sortable
+        # Kolom -> tanda desimal (DECIMAL_POINT/DECIMAL_COMMA) untuk sort kolom angka
+        self.decimal_marks = decimal_marks or {}
         
         # Pagination state
         self.current_page = 0
@@ -19,6 +200,32 @@ class PaginatedTreeView:
         self.all_data = []  # Store all data
         self.filtered_data = []  # Store filtered data
         
+        # Server-side mode (lihat TreeDataSource)
+        self.data_source = None
+        self.source_filters = None
+        
+        # Sorting: kolom aktif, arah, dan cache sort key per kolom (sejajar dengan all_data)
+        self.sort_column = None
+        self.sort_descending = False
+        self._sort_keys = {}
+        self._filtered_indices = None  # Index all_data yang lolos filter (None = semua)
+        self._filter_func = None  # filter_func dari set_data, dipakai lagi saat upsert/remove
+        self._key_index = None  # key baris -> index all_data, dibangun saat upsert pertama
+        self._page_rows = []  # Baris halaman aktif sesuai urutan item Tk (mode halaman)
+        self._heading_texts = {}
+        
+        # Jumlah refresh tampilan (dipakai untuk pengecekan/test) dan callback insert bertahap
+        self.redraw_count = 0
+        self._pending_insert = None
+        
+        # Virtual scrolling state
+        self.virtual_offset = 0  # Index baris data pada slot pertama
+        self._virtual_slots = []  # iid slot Treeview yang dipakai ulang
+        self._slot_rows = {}  # slot iid -> (row index, row key)
+        self._virtual_selected = {}  # row index -> row key (termasuk yang sedang tidak terlihat)
+        self._virtual_blocks = {}  # block index -> rows dari data source
+        self._virtual_replace_selection = False  # Klik/keyboard biasa mengganti seluruh pilihan
+        
         self.create_widgets()
     
     def create_widgets(self):
@@ -43,6 +250,21 @@ class PaginatedTreeView:
         self.tree.configure(yscrollcommand=self.v_scrollbar.set, 
                            xscrollcommand=self.h_scrollbar.set)
         
+        if self.virtual:
+            # Scrollbar vertikal menggerakkan offset data, bukan isi Treeview
+            self.v_scrollbar.configure(command=self.on_virtual_scroll)
+            self.tree.configure(yscrollcommand='')
+            self.tree.bind('<MouseWheel>', self.on_virtual_mousewheel)
+            self.tree.bind('<Button-4>', self.on_virtual_mousewheel)
+            self.tree.bind('<Button-5>', self.on_virtual_mousewheel)
+            self.tree.bind('<Up>', self.on_virtual_key)
+            self.tree.bind('<Down>', self.on_virtual_key)
+            self.tree.bind('<Prior>', self.on_virtual_key)
+            self.tree.bind('<Next>', self.on_virtual_key)
+            self.tree.bind('<ButtonPress-1>', self.on_virtual_click, add='+')
+            self.tree.bind('<<TreeviewSelect>>', self.on_virtual_select, add='+')
+            self.tree.bind('<Configure>', self.on_virtual_configure, add='+')
+        
         # Pack TreeView and scrollbars
         self.tree.grid(row=0, column=0, sticky='nsew')
         self.v_scrollbar.grid(row=0, column=1, sticky='ns')
@@ -68,6 +290,10 @@ class PaginatedTreeView:
                                        font=('Arial', 9))
         self.page_info_label.pack(side='left', padx=(0, 20), pady=8)
         
+        if self.virtual:
+            # Mode virtual tidak memakai navigasi halaman
+            return
+        
         # Center - Navigation buttons
         nav_frame = tk.Frame(self.pagination_frame, bg='#ecf0f1')
         nav_frame.pack(side='left', fill='y')
@@ -132,7 +358,13 @@ class PaginatedTreeView:
         self.container.grid(**kwargs)
     
     def heading(self, column, **kwargs):
-        """Set column heading"""
+        """Set column heading (clickable for sorting unless a command is given)"""
+        if 'text' in kwargs:
+            self._heading_texts[column] = kwargs['text']
+            if column == self.sort_column:
+                kwargs['text'] = self._sort_heading_text(column)
+        if self.sortable and 'command' not in kwargs:
+            kwargs['command'] = lambda c=column: self.sort_by(c)
         self.tree.heading(column, **kwargs)
     
     def column(self, column, **kwargs):
@@ -141,14 +373,29 @@ class PaginatedTreeView:
     
     def bind(self, event, callback):
         """Bind event to TreeView"""
-        self.tree.bind(event, callback)
+        # add='+' agar handler internal mode virtual tidak tertimpa
+        self.tree.bind(event, callback, add='+' if self.virtual else '')
     
     def selection(self):
         """Get selected items"""
+        if self.virtual:
+            return tuple(self._virtual_selected[index] for index in sorted(self._virtual_selected))
         return self.tree.selection()
     
     def item(self, item, option=None):
         """Get item details"""
+        if self.virtual:
+            for slot, (index, key) in self._slot_rows.items():
+                if key == item:
+                    return self.tree.item(slot, option)
+            
+            # Baris terpilih yang sedang di luar area tampil
+            for index, key in self._virtual_selected.items():
+                if key == item:
+                    iid, values, tags = self._normalize_row(self.get_virtual_row(index))
+                    details = {'text': '', 'image': '', 'values': list(values),
+                               'open': 0, 'tags': list(tags) if tags else ''}
+                    return details[option] if option else details
         return self.tree.item(item, option)
     
     def insert(self, parent, index, **kwargs):
@@ -163,19 +410,38 @@ class PaginatedTreeView:
         """Get children of item"""
         return self.tree.get_children(item)
     
+    def clear_tree(self):
+        """Remove all TreeView items with a single delete call"""
+        self.cancel_pending_insert()
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+    
+    def cancel_pending_insert(self):
+        """Cancel chunked inserts still scheduled from a previous refresh"""
+        if self._pending_insert is not None:
+            self.tree.after_cancel(self._pending_insert)
+            self._pending_insert = None
+    
     def set_data(self, data, filter_func=None):
         """Set all data and refresh display"""
-        # Clear existing tree data first to prevent duplicates
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
+        # Tree dibersihkan sekali oleh refresh_display
+        self.data_source = None
+        self.source_filters = None
+        self.reset_virtual_state()
         self.all_data = data
+        self._sort_keys = {}  # Sort key lama tidak berlaku untuk data baru
+        self._key_index = None
+        self._filter_func = filter_func
 
         # Apply filter if provided
         if filter_func:
-            self.filtered_data = [item for item in data if filter_func(item)]
+            self._filtered_indices = [i for i, item in enumerate(data) if filter_func(item)]
         else:
-            self.filtered_data = data[:]
+            self._filtered_indices = None
+        
+        # Urutan sort yang aktif tetap dipakai untuk data baru
+        self.apply_sort()
 
         self.total_items = len(self.filtered_data)
         self.total_pages = max(1, math.ceil(self.total_items / self.items_per_page))
@@ -184,38 +450,501 @@ class PaginatedTreeView:
         self.current_page = 0
         self.refresh_display()
     
-    def refresh_display(self):
-        """Refresh TreeView display for current page"""
-        # Clear TreeView
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def set_data_source(self, data_source, filters=None, sort=None):
+        """Back the TreeView with a TreeDataSource instead of in-memory data
+
+        sort: (column, descending); tanpa sort, kolom sort aktif dipertahankan
+        jika data source bisa mengurutkannya.
+        """
+        self.all_data = []
+        self.filtered_data = []
+        self._sort_keys = {}
+        self._filtered_indices = None
+        self._filter_func = None
+        self._key_index = None
+        self.data_source = data_source
+        self.source_filters = filters
+        if sort:
+            self.sort_column, self.sort_descending = sort
+        if self.sort_column is not None and not data_source.can_sort(self.sort_column):
+            self.sort_column, self.sort_descending = None, False
+        self.update_sort_indicators()
+        self.current_page = 0
+        self.reset_virtual_state()
+        self.reload()
+    
+    def set_filters(self, filters):
+        """Update data source filters and go back to the first page"""
+        self.source_filters = filters
+        self.current_page = 0
+        self.reset_virtual_state()
+        self.reload()
+    
+    def reload(self):
+        """Re-count the data source and refresh the current page"""
+        if self.data_source is None:
+            self.refresh_display()
+            return
         
-        # Calculate page bounds
+        self._virtual_blocks.clear()
+        self.total_items = self.data_source.count(self.source_filters)
+        self.total_pages = max(1, math.ceil(self.total_items / self.items_per_page))
+        if self.current_page >= self.total_pages:
+            self.current_page = self.total_pages - 1
+        self.refresh_display()
+    
+    def get_page_rows(self):
+        """Get rows for the current page from data source or filtered data"""
         start_idx = self.current_page * self.items_per_page
+        
+        if self.data_source is not None:
+            return self.data_source.fetch_page(start_idx, self.items_per_page,
+                                               sort=self.get_sort(),
+                                               filters=self.source_filters)
+        
         end_idx = min(start_idx + self.items_per_page, self.total_items)
+        return self.filtered_data[start_idx:end_idx]
+    
+    # ------------------------------------------------------------------
+    # Sorting
+    # ------------------------------------------------------------------
+    
+    def get_sort(self):
+        """Current sort as (column, descending) or None"""
+        if self.sort_column is None:
+            return None
+        return (self.sort_column, self.sort_descending)
+    
+    def get_sort_keys(self, column):
+        """Typed sort keys for column, aligned with all_data and cached until set_data"""
+        keys = self._sort_keys.get(column)
+        if keys is None:
+            col_index = list(self.columns).index(column)
+            decimal_mark = self.decimal_marks.get(column)
+            keys = []
+            for item_data in self.all_data:
+                values = self._normalize_row(item_data)[1]
+                keys.append(make_sort_key(values[col_index] if len(values) > col_index else None,
+                                          decimal_mark))
+            self._sort_keys[column] = keys
+        return keys
+    
+    def apply_sort(self):
+        """Rebuild filtered_data from all_data in the active sort order"""
+        indices = self._filtered_indices
         
-        # Add items for current page
-        for i in range(start_idx, end_idx):
-            item_data = self.filtered_data[i]
-            if isinstance(item_data, dict):
-                # Handle dictionary data
-                if 'values' in item_data:
-                    values = item_data['values']
-                else:
-                    values = list(item_data.values())
-                
-                iid = item_data.get('iid', '')
-                tags = item_data.get('tags', ())
-                
+        if self.sort_column is None:
+            if indices is None:
+                self.filtered_data = self.all_data[:]
+            else:
+                self.filtered_data = [self.all_data[i] for i in indices]
+            return
+        
+        keys = self.get_sort_keys(self.sort_column)
+        if indices is None:
+            indices = range(len(self.all_data))
+        ordered = sorted((i for i in indices if keys[i][0] != 2), key=keys.__getitem__,
+                         reverse=self.sort_descending)
+        # Sel kosong selalu di akhir, apa pun arah sort-nya
+        ordered.extend(i for i in indices if keys[i][0] == 2)
+        self.filtered_data = [self.all_data[i] for i in ordered]
+    
+    def sort_by(self, column):
+        """Sort full dataset by column; clicking the same column again reverses the order"""
+        if self.data_source is not None and not self.data_source.can_sort(column):
+            return
+        
+        if column == self.sort_column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column = column
+            self.sort_descending = False
+        self.update_sort_indicators()
+        
+        self.current_page = 0
+        self.reset_virtual_state()
+        if self.data_source is not None:
+            # ORDER BY dijalankan di database
+            self.reload()
+        else:
+            self.apply_sort()
+            self.refresh_display()
+    
+    def _sort_heading_text(self, column):
+        """Heading text with sort direction arrow"""
+        return f"{self._heading_texts.get(column, column)} {'▼' if self.sort_descending else '▲'}"
+    
+    def update_sort_indicators(self):
+        """Show sort arrow on the active column heading only"""
+        for column, text in self._heading_texts.items():
+            if column == self.sort_column:
+                self.tree.heading(column, text=self._sort_heading_text(column))
+            else:
+                self.tree.heading(column, text=text)
+    
+    @staticmethod
+    def _normalize_row(item_data):
+        """Split a data row into (iid, values, tags)"""
+        if isinstance(item_data, dict):
+            # Handle dictionary data
+            if 'values' in item_data:
+                values = item_data['values']
+            else:
+                values = list(item_data.values())
+            return item_data.get('iid', ''), values, item_data.get('tags', ())
+        
+        # Handle tuple/list data
+        return '', item_data, ()
+    
+    def refresh_display(self):
+        """Refresh TreeView display for current page"""
+        if self.virtual:
+            self.refresh_virtual()
+            return
+        
+        self.redraw_count += 1
+        self.clear_tree()
+        
+        # Add items for current page - halaman besar di-insert per chunk saat idle
+        self._page_rows = list(self.get_page_rows())
+        self.insert_rows(0)
+        
+        self.update_pagination_controls()
+    
+    def insert_rows(self, start):
+        """Insert one chunk of _page_rows and schedule the next chunk via after_idle
+        
+        Baris dibaca dari _page_rows saat callback berjalan, jadi baris yang
+        diganti upsert_rows sebelum chunk-nya ter-insert ikut versi terbaru.
+        """
+        self._pending_insert = None
+        rows = self._page_rows
+        end = min(start + self.INSERT_CHUNK_SIZE, len(rows))
+        
+        for item_data in rows[start:end]:
+            iid, values, tags = self._normalize_row(item_data)
+            if iid:
                 self.tree.insert('', tk.END, iid=iid, values=values, tags=tags)
             else:
-                # Handle tuple/list data
-                self.tree.insert('', tk.END, values=item_data)
+                self.tree.insert('', tk.END, values=values, tags=tags)
+        
+        if end < len(rows):
+            self._pending_insert = self.tree.after_idle(self.insert_rows, end)
+    
+    # ------------------------------------------------------------------
+    # Row-level update
+    # ------------------------------------------------------------------
+    
+    @classmethod
+    def row_key(cls, item_data):
+        """Key of a row for upsert/remove: iid, atau nilai kolom pertama jika baris tanpa iid"""
+        iid, values, tags = cls._normalize_row(item_data)
+        if iid:
+            return iid
+        return values[0] if len(values) else None
+    
+    def _row_sort_key(self, item_data, column):
+        values = self._normalize_row(item_data)[1]
+        col_index = list(self.columns).index(column)
+        return make_sort_key(values[col_index] if len(values) > col_index else None,
+                             self.decimal_marks.get(column))
+    
+    def _get_key_index(self):
+        """Mapping key baris -> index all_data (di-cache sampai data berubah posisi)"""
+        if self._key_index is None:
+            self._key_index = {self.row_key(row): index for index, row in enumerate(self.all_data)}
+        return self._key_index
+    
+    def upsert_rows(self, rows, insert_at=None):
+        """Replace rows with the same key in place and add rows whose key is new
+        
+        Mode in-memory: hanya baris yang berubah yang disentuh; urutan sort dihitung
+        ulang dari sort key yang sudah di-cache hanya jika ada baris baru atau nilai
+        kolom sort berubah. insert_at: posisi baris baru di data (None = akhir).
+        Mode data source: baris yang sedang di-cache/tampil diganti langsung tanpa
+        query; baris lain diambil dari data source seperti biasa saat ditampilkan.
+        """
+        if not rows:
+            return
+        if self.data_source is not None:
+            self._replace_loaded_rows({self.row_key(row): row for row in rows})
+            return
+        
+        key_index = self._get_key_index()
+        replaced = {}  # id(baris lama) -> baris baru
+        old_rows = []  # Jaga baris lama tetap hidup selama id()-nya dipakai sebagai key
+        added = []
+        reorder = self._filter_func is not None
+        for row in rows:
+            index = key_index.get(self.row_key(row))
+            if index is None:
+                added.append(row)
+                continue
+            old_rows.append(self.all_data[index])
+            replaced[id(self.all_data[index])] = row
+            self.all_data[index] = row
+            for column, keys in self._sort_keys.items():
+                sort_key = self._row_sort_key(row, column)
+                if column == self.sort_column and sort_key != keys[index]:
+                    reorder = True
+                keys[index] = sort_key
+        
+        if added:
+            reorder = True
+            if insert_at is None:
+                insert_at = len(self.all_data)
+            self.all_data[insert_at:insert_at] = added
+            for column, keys in self._sort_keys.items():
+                keys[insert_at:insert_at] = [self._row_sort_key(row, column) for row in added]
+            self._key_index = None
+        
+        if self._filter_func is not None:
+            self._filtered_indices = [i for i, item in enumerate(self.all_data) if self._filter_func(item)]
+        elif added and self._filtered_indices is not None:
+            shift = len(added)
+            self._filtered_indices = [i + shift if i >= insert_at else i for i in self._filtered_indices]
+            self._filtered_indices.extend(range(insert_at, insert_at + shift))
+        
+        if reorder:
+            self.apply_sort()
+            self.total_items = len(self.filtered_data)
+            self.total_pages = max(1, math.ceil(self.total_items / self.items_per_page))
+            self.refresh_display()
+        else:
+            # Posisi tidak berubah: ganti baris di filtered_data dan item yang sedang tampil saja
+            self.filtered_data = [replaced.get(id(row), row) for row in self.filtered_data]
+            self._replace_loaded_rows(replaced, by_identity=True)
+    
+    def _replace_loaded_rows(self, new_rows, by_identity=False):
+        """Swap rows in the block cache / visible page and update their Tk items in place
+        
+        new_rows: key baris -> baris baru, atau id(baris lama) -> baris baru jika by_identity
+        """
+        def lookup(row):
+            return new_rows.get(id(row) if by_identity else self.row_key(row))
+        
+        if self.virtual:
+            for block in self._virtual_blocks.values():
+                for position, row in enumerate(block):
+                    new_row = lookup(row)
+                    if new_row is not None:
+                        block[position] = new_row
+            # Slot yang terlihat di-bind ulang dari data/cache, tanpa fetch
+            self.refresh_virtual()
+            return
+        
+        children = self.tree.get_children()
+        for position, row in enumerate(self._page_rows):
+            new_row = lookup(row)
+            if new_row is None:
+                continue
+            self._page_rows[position] = new_row
+            if position < len(children):
+                iid, values, tags = self._normalize_row(new_row)
+                self.tree.item(children[position], values=values, tags=tags)
+    
+    def remove_rows(self, keys):
+        """Remove rows by key (lihat row_key)
+        
+        Mode in-memory: baris dibuang dari data tanpa sort/format ulang, lalu hanya
+        halaman aktif yang digambar ulang. Mode data source: data source sudah tidak
+        mengembalikan baris tersebut, jadi cukup count + halaman aktif di-query ulang.
+        """
+        keys = set(keys)
+        if not keys:
+            return
+        self._virtual_selected = {}  # Index baris bergeser setelah penghapusan
+        
+        if self.data_source is not None:
+            self.reload()
+            return
+        
+        key_index = self._get_key_index()
+        removed = {key_index[key] for key in keys if key in key_index}
+        if not removed:
+            return
+        removed_rows = {id(self.all_data[index]) for index in removed}
+        keep = [index for index in range(len(self.all_data)) if index not in removed]
+        
+        if self._filtered_indices is not None:
+            new_index = {old: new for new, old in enumerate(keep)}
+            self._filtered_indices = [new_index[i] for i in self._filtered_indices if i in new_index]
+        self.filtered_data = [row for row in self.filtered_data if id(row) not in removed_rows]
+        self.all_data = [self.all_data[index] for index in keep]
+        self._sort_keys = {column: [sort_keys[index] for index in keep]
+                           for column, sort_keys in self._sort_keys.items()}
+        self._key_index = None
+        
+        self.total_items = len(self.filtered_data)
+        self.total_pages = max(1, math.ceil(self.total_items / self.items_per_page))
+        if self.current_page >= self.total_pages:
+            self.current_page = self.total_pages - 1
+        self.refresh_display()
+    
+    # ------------------------------------------------------------------
+    # Virtual scrolling
+    # ------------------------------------------------------------------
+    
+    def reset_virtual_state(self):
+        """Reset scroll offset, selection and block cache for new data"""
+        self.virtual_offset = 0
+        self._virtual_selected = {}
+        self._virtual_blocks = {}
+    
+    def get_virtual_row(self, index):
+        """Get row at absolute index from data source blocks or filtered data"""
+        if self.data_source is None:
+            return self.filtered_data[index]
+        
+        block_index, position = divmod(index, self.VIRTUAL_BLOCK_SIZE)
+        block = self._virtual_blocks.get(block_index)
+        if block is None:
+            block = self.data_source.fetch_page(block_index * self.VIRTUAL_BLOCK_SIZE,
+                                                self.VIRTUAL_BLOCK_SIZE,
+                                                sort=self.get_sort(),
+                                                filters=self.source_filters)
+            if len(self._virtual_blocks) >= self.VIRTUAL_BLOCK_CACHE:
+                # Buang blok paling lama (dict menjaga urutan insert)
+                self._virtual_blocks.pop(next(iter(self._virtual_blocks)))
+            self._virtual_blocks[block_index] = block
+        return block[position] if position < len(block) else ()
+    
+    def get_visible_row_count(self):
+        """Number of rows that fit in the TreeView area"""
+        rows = self.height
+        if self._virtual_slots and self.tree.exists(self._virtual_slots[0]):
+            bbox = self.tree.bbox(self._virtual_slots[0])
+            tree_height = self.tree.winfo_height()
+            if bbox and bbox[3] > 0 and tree_height > 1:
+                rows = max(1, (tree_height - bbox[1]) // bbox[3])
+        return rows
+    
+    def refresh_virtual(self):
+        """Rebind the fixed slot pool to rows starting at virtual_offset"""
+        self.redraw_count += 1
+        slot_count = self.get_visible_row_count()
+        
+        # Jaga jumlah slot tetap (buat ulang slot yang terhapus dari luar)
+        self._virtual_slots = [slot for slot in self._virtual_slots if self.tree.exists(slot)]
+        while len(self._virtual_slots) < slot_count:
+            self._virtual_slots.append(self.tree.insert('', tk.END, values=()))
+        while len(self._virtual_slots) > slot_count:
+            self.tree.delete(self._virtual_slots.pop())
+        
+        max_offset = max(0, self.total_items - slot_count)
+        self.virtual_offset = min(max(0, self.virtual_offset), max_offset)
+        
+        self._slot_rows = {}
+        selected_slots = []
+        for position, slot in enumerate(self._virtual_slots):
+            index = self.virtual_offset + position
+            if index >= self.total_items:
+                self.tree.detach(slot)
+                continue
+            
+            iid, values, tags = self._normalize_row(self.get_virtual_row(index))
+            key = iid or f"row_{index}"
+            self.tree.move(slot, '', position)
+            self.tree.item(slot, values=values, tags=tags)
+            self._slot_rows[slot] = (index, key)
+            if index in self._virtual_selected:
+                self._virtual_selected[index] = key
+                selected_slots.append(slot)
+        
+        self.tree.selection_set(selected_slots)
+        
+        if self.total_items > 0:
+            first = self.virtual_offset / self.total_items
+            last = min(1.0, (self.virtual_offset + slot_count) / self.total_items)
+        else:
+            first, last = 0.0, 1.0
+        self.v_scrollbar.set(first, last)
         
         self.update_pagination_controls()
     
+    def scroll_virtual_to(self, offset):
+        """Move virtual window to offset and rebind slots if it changed"""
+        max_offset = max(0, self.total_items - len(self._virtual_slots))
+        offset = min(max(0, int(offset)), max_offset)
+        if offset != self.virtual_offset:
+            self.virtual_offset = offset
+            self.refresh_virtual()
+    
+    def on_virtual_scroll(self, action, amount, unit=None):
+        """Scrollbar command in virtual mode (moveto / scroll units|pages)"""
+        if action == 'moveto':
+            self.scroll_virtual_to(float(amount) * self.total_items)
+        elif action == 'scroll':
+            step = len(self._virtual_slots) if unit == 'pages' else 1
+            self.scroll_virtual_to(self.virtual_offset + int(amount) * step)
+    
+    def on_virtual_mousewheel(self, event):
+        """Scroll three rows per wheel notch"""
+        if event.num == 4 or event.delta > 0:
+            self.scroll_virtual_to(self.virtual_offset - 3)
+        else:
+            self.scroll_virtual_to(self.virtual_offset + 3)
+        return 'break'
+    
+    def on_virtual_key(self, event):
+        """Keep keyboard navigation going past the first/last visible slot"""
+        focus = self.tree.focus()
+        if focus not in self._slot_rows:
+            return None
+        
+        index = self._slot_rows[focus][0]
+        step = len(self._virtual_slots) if event.keysym in ('Prior', 'Next') else 1
+        target = index - step if event.keysym in ('Up', 'Prior') else index + step
+        target = min(max(0, target), self.total_items - 1)
+        
+        if self.virtual_offset <= target < self.virtual_offset + len(self._virtual_slots):
+            self._virtual_replace_selection = True
+            return None  # Masih di area tampil, biarkan Treeview menangani
+        
+        self.scroll_virtual_to(target if target < self.virtual_offset
+                               else target - len(self._virtual_slots) + 1)
+        for slot, (slot_index, key) in self._slot_rows.items():
+            if slot_index == target:
+                self._virtual_selected = {target: key}
+                self.tree.selection_set(slot)
+                self.tree.focus(slot)
+                break
+        return 'break'
+    
+    def on_virtual_click(self, event):
+        """Plain click replaces the selection, Shift/Control click extends it"""
+        self._virtual_replace_selection = not (event.state & 0x0005)
+    
+    def on_virtual_select(self, event=None):
+        """Track selection by row index so it survives slot rebinding"""
+        # Pilihan di luar area tampil dipertahankan kecuali pilihan diganti oleh klik biasa
+        visible = {index for index, key in self._slot_rows.values()}
+        selected = {}
+        if not self._virtual_replace_selection:
+            selected = {index: key for index, key in self._virtual_selected.items() if index not in visible}
+        self._virtual_replace_selection = False
+        for slot in self.tree.selection():
+            if slot in self._slot_rows:
+                index, key = self._slot_rows[slot]
+                selected[index] = key
+        self._virtual_selected = selected
+    
+    def on_virtual_configure(self, event=None):
+        """Resize the slot pool when the TreeView height changes"""
+        if self.get_visible_row_count() != len(self._virtual_slots):
+            self.refresh_virtual()
+    
     def update_pagination_controls(self):
         """Update pagination control states and labels"""
+        if self.virtual:
+            if self.total_items > 0:
+                end_item = min(self.virtual_offset + len(self._virtual_slots), self.total_items)
+                info_text = f"Menampilkan {self.virtual_offset + 1}-{end_item} dari {self.total_items} items"
+            else:
+                info_text = "Tidak ada data"
+            self.page_info_label.config(text=info_text)
+            return
+        
         # Update page info
         if self.total_items > 0:
             start_item = (self.current_page * self.items_per_page) + 1
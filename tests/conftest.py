@@ -0,0 +1,168 @@
+"""Shared test helpers: repo root on sys.path and a headless PaginatedTreeView"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.database import AppDatabase  # noqa: E402
+from src.widget.paginated_tree_view import PaginatedTreeView  # noqa: E402
+
+
+class FakeTree:
+    """Minimal ttk.Treeview stand-in so the widget logic runs without a display"""
+
+    ROW_HEIGHT = 20
+
+    def __init__(self, height=10):
+        self.items = {}  # iid -> {'values', 'tags'}
+        self.order = []  # iid yang ter-attach, urut tampilan
+        self.detached = set()
+        self.selected = ()
+        self.focused = ''
+        self.insert_calls = 0
+        self.delete_calls = 0
+        self.idle_callbacks = []  # (after id, callback, args) dari after_idle
+        self._next_iid = 0
+        self._next_after = 0
+        self._height = height
+
+    def get_children(self, item=''):
+        return tuple(self.order)
+
+    def insert(self, parent, index, iid=None, values=(), tags=()):
+        self.insert_calls += 1
+        if iid is None:
+            self._next_iid += 1
+            iid = f"I{self._next_iid:03d}"
+        self.items[iid] = {'values': tuple(values), 'tags': tuple(tags)}
+        self.order.append(iid)
+        return iid
+
+    def delete(self, *items):
+        self.delete_calls += 1
+        for iid in items:
+            self.items.pop(iid)
+            if iid in self.order:
+                self.order.remove(iid)
+            self.detached.discard(iid)
+
+    def exists(self, iid):
+        return iid in self.items
+
+    def item(self, iid, option=None, **kwargs):
+        if kwargs:
+            self.items[iid].update({key: tuple(value) for key, value in kwargs.items()})
+            return None
+        return self.items[iid][option] if option else dict(self.items[iid])
+
+    def move(self, iid, parent, index):
+        if iid in self.order:
+            self.order.remove(iid)
+        self.detached.discard(iid)
+        self.order.insert(index, iid)
+
+    def detach(self, iid):
+        if iid in self.order:
+            self.order.remove(iid)
+        self.detached.add(iid)
+
+    def index(self, iid):
+        return self.order.index(iid)
+
+    def selection(self):
+        return self.selected
+
+    def selection_set(self, items):
+        self.selected = (items,) if isinstance(items, str) else tuple(items)
+
+    def focus(self, iid=None):
+        if iid is None:
+            return self.focused
+        self.focused = iid
+
+    def bbox(self, iid):
+        return (0, 0, 100, self.ROW_HEIGHT)
+
+    def winfo_height(self):
+        return self._height * self.ROW_HEIGHT
+
+    def after_idle(self, callback, *args):
+        self._next_after += 1
+        after_id = f"after#{self._next_after}"
+        self.idle_callbacks.append((after_id, callback, args))
+        return after_id
+
+    def after_cancel(self, after_id):
+        self.idle_callbacks = [entry for entry in self.idle_callbacks if entry[0] != after_id]
+
+    def run_idle(self):
+        """Jalankan callback after_idle sampai antrian kosong (seperti event loop Tk)"""
+        while self.idle_callbacks:
+            _, callback, args = self.idle_callbacks.pop(0)
+            callback(*args)
+
+    def heading(self, *args, **kwargs):
+        pass
+
+    def column(self, *args, **kwargs):
+        pass
+
+    def configure(self, **kwargs):
+        pass
+
+    def bind(self, *args, **kwargs):
+        pass
+
+
+class FakeControl:
+    """Label/Entry/Button stand-in for the pagination controls"""
+
+    def config(self, **kwargs):
+        pass
+
+    configure = config
+
+    def delete(self, *args):
+        pass
+
+    def insert(self, *args):
+        pass
+
+    def set(self, *args):
+        self.last_set = args
+
+
+class HeadlessTreeView(PaginatedTreeView):
+    """PaginatedTreeView with FakeTree instead of Tk widgets"""
+
+    def create_widgets(self):
+        self.tree = FakeTree(self.height)
+        self.v_scrollbar = FakeControl()
+        self.h_scrollbar = FakeControl()
+        for name in ('page_info_label', 'page_entry', 'first_btn', 'prev_btn',
+                     'next_btn', 'last_btn'):
+            setattr(self, name, FakeControl())
+
+
+@pytest.fixture
+def make_tree_view():
+    """Factory for headless PaginatedTreeView instances"""
+    def factory(columns=('id', 'nama', 'jumlah'), **kwargs):
+        return HeadlessTreeView(None, columns, **kwargs)
+    return factory
+
+
+@pytest.fixture
+def app_db(tmp_path):
+    """Fresh AppDatabase on a temp file (singleton di-reset sebelum dan sesudah test)"""
+    AppDatabase._instance = None
+    AppDatabase._initialized = False
+    db = AppDatabase(str(tmp_path / 'app.db'))
+    yield db
+    db.close()
+    AppDatabase._instance = None
+    AppDatabase._initialized = False
+
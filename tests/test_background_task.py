@@ -0,0 +1,141 @@
+"""BackgroundTask: worker thread events delivered by polling, cancel and cleanup"""
+
+import threading
+
+import pytest
+
+from src.models.database import BarangDatabase, OperationCancelled
+from src.utils.background_task import BackgroundTask
+
+
+class FakeWidget:
+    """after()/winfo_exists() stand-in; poll() menjalankan callback after seperti event loop Tk"""
+
+    def __init__(self):
+        self.scheduled = []
+        self.exists = True
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+
+    def winfo_exists(self):
+        return self.exists
+
+    def poll(self, task):
+        task._thread.join(5.0)
+        while self.scheduled:
+            self.scheduled.pop(0)()
+
+
+@pytest.fixture(autouse=True)
+def no_leaked_threads():
+    yield
+    assert not [thread for thread in threading.enumerate() if thread.name == 'background-task' and thread.is_alive()]
+
+
+def run(widget, target, **callbacks):
+    events = []
+    handlers = {
+        name: (lambda *args, name=name: events.append((name, *args)))
+        for name in ('on_progress', 'on_done', 'on_error', 'on_cancelled')
+    }
+    handlers.update(callbacks)
+    task = BackgroundTask(widget, target, **handlers).start()
+    widget.poll(task)
+    return task, events
+
+
+def test_done_delivers_progress_result_and_stage_timings():
+    cleanup_threads = []
+
+    def target(task):
+        with task.stage('validate'):
+            task.report(1, 2)
+            task.report(2, 2)
+        with task.stage('insert'):
+            pass
+        return 'ok'
+
+    widget = FakeWidget()
+    task, events = run(widget, target, cleanup=lambda: cleanup_threads.append(threading.current_thread().name))
+
+    assert events[:4] == [('on_progress', 'validate', None, None), ('on_progress', 'validate', 1, 2),
+                          ('on_progress', 'validate', 2, 2), ('on_progress', 'insert', None, None)]
+    name, result, timings = events[-1]
+    assert (name, result) == ('on_done', 'ok')
+    assert [stage for stage, _ in timings] == ['validate', 'insert']
+    assert cleanup_threads == ['background-task']
+    assert not task.is_running()
+
+
+def test_exception_without_cancel_is_an_error():
+    def target(task):
+        raise ValueError("file rusak")
+
+    _, events = run(FakeWidget(), target)
+
+    assert events[-1][0] == 'on_error'
+    assert str(events[-1][1]) == "file rusak"
+
+
+def test_cancel_rolls_back_the_database_batch(tmp_path):
+    db = BarangDatabase(str(tmp_path / 'app.db'))
+    db.execute_many("INSERT INTO customers (nama_customer, alamat_customer) VALUES (?, ?)",
+                    [('PT Sinar', '-'), ('CV Maju', '-')])
+    records = [{'pengirim': 1, 'penerima': 2, 'nama_barang': f'Barang {i}'} for i in range(500)]
+    worker_started = threading.Event()
+
+    def target(task):
+        worker_started.set()
+        # Cancel tiba saat batch sedang berjalan
+        return db.create_barang_batch(records, cancel_event=task.cancel_event,
+                                      progress_callback=lambda done, total: done and task.cancel())
+
+    try:
+        task, events = run(FakeWidget(), target, cleanup=db.pool.release)
+
+        assert worker_started.is_set()
+        assert task.cancelled()
+        assert [event[0] for event in events if event[0] != 'on_progress'] == ['on_cancelled']
+        assert db.execute_one("SELECT COUNT(*) FROM barang")[0] == 0
+    finally:
+        db.close()
+
+
+def test_cancel_before_target_checks_is_reported_as_cancelled():
+    release = threading.Event()
+
+    def target(task):
+        release.wait(5.0)
+        if task.cancelled():
+            raise OperationCancelled("dibatalkan")
+        return 'selesai'
+
+    widget = FakeWidget()
+    events = []
+    task = BackgroundTask(widget, target, on_done=lambda *args: events.append('done'),
+                          on_cancelled=lambda timings: events.append('cancelled')).start()
+    task.cancel()
+    release.set()
+    widget.poll(task)
+
+    assert events == ['cancelled']
+
+
+def test_destroyed_widget_cancels_without_callbacks():
+    release = threading.Event()
+
+    def target(task):
+        release.wait(5.0)
+        return 'selesai'
+
+    widget = FakeWidget()
+    events = []
+    task = BackgroundTask(widget, target, on_done=lambda *args: events.append('done')).start()
+    widget.exists = False
+    release.set()
+    widget.poll(task)
+
+    assert task.cancelled()
+    assert events == []
+    assert widget.scheduled == []
@@ -0,0 +1,66 @@
+"""BarangRowFormatter memo and the column-wise price formatting helpers"""
+
+from src.utils.barang_format import (BARANG_PRICE_FIELDS, BarangRowFormatter, format_berat, format_rupiah,
+                                     format_rupiah_column)
+
+
+def make_record(barang_id, nama='Semen', **prices):
+    record = {'barang_id': barang_id, 'nama_barang': nama, 'sender_name': 'PT Sinar', 'receiver_name': 'CV Maju',
+              'panjang_barang': 1, 'lebar_barang': 2, 'tinggi_barang': 3, 'm3_barang': 0.006,
+              'ton_barang': 1.5, 'pajak': 1, 'created_at': '2025-01-01 08:00:00'}
+    record.update(prices)
+    return record
+
+
+def test_rupiah_column_matches_single_value_format():
+    values = [1500000, 2500.5, '750000', None, 0, '-', 'abc']
+
+    assert format_rupiah_column(values) == [format_rupiah(value) for value in values]
+    assert format_rupiah_column(values)[:3] == ['Rp 1,500,000', 'Rp 2,500', 'Rp 750,000']
+    assert format_berat(1.5) == '1,5'
+
+
+def test_row_layout():
+    row = BarangRowFormatter().format_row(make_record(7, m3_pp=100000, ton_dd='-'))
+
+    assert row[:7] == (7, 'PT Sinar', 'CV Maju', 'Semen', '1×2×3', 0.006, '1,5')
+    prices = dict(zip(BARANG_PRICE_FIELDS, row[7:7 + len(BARANG_PRICE_FIELDS)]))
+    assert prices['m3_pp'] == 'Rp 100,000'
+    assert prices['ton_dd'] == '-'
+    assert row[-2:] == (1, '2025-01-01')
+
+
+def test_memoised_rows_are_reused_until_invalidated():
+    formatter = BarangRowFormatter()
+    first = formatter.format_rows([make_record(1), make_record(2, 'Besi')])
+
+    # Record berubah tapi memo belum dibuang: baris lama tetap dipakai (objek yang sama)
+    again = formatter.format_rows([make_record(2, 'Besi Baru'), make_record(1)])
+    assert again[0] is first[1] and again[1] is first[0]
+    assert len(formatter) == 2
+
+    formatter.invalidate([2])
+    assert formatter.get_cached(2) is None
+    assert formatter.format_row(make_record(2, 'Besi Baru'))[3] == 'Besi Baru'
+    assert formatter.get_cached(1) is first[0]
+
+    formatter.invalidate()
+    assert len(formatter) == 0
+
+
+def test_only_missing_records_are_formatted(monkeypatch):
+    from src.utils import barang_format
+
+    formatted = []
+    original = barang_format.format_dimensi
+
+    def counting_dimensi(record):
+        formatted.append(record['barang_id'])
+        return original(record)
+
+    monkeypatch.setattr(barang_format, 'format_dimensi', counting_dimensi)
+    formatter = BarangRowFormatter()
+    formatter.format_rows([make_record(1), make_record(2)])
+    formatter.format_rows([make_record(1), make_record(2), make_record(3)])
+
+    assert formatted == [1, 2, 3]
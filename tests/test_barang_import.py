@@ -0,0 +1,102 @@
+"""Barang import pipeline: chunked CSV/xlsx reader and column-wise validation"""
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from src.utils.barang_import import (prepare_import_frame, read_import_chunks, read_import_preview,  # noqa: E402
+                                     validate_import_frame)
+
+
+HEADER = ['Pengirim', 'Penerima', 'Nama Barang', 'M3', 'Harga M3 PP']
+MAPPING = {'pengirim': 'Pengirim', 'penerima': 'Penerima', 'nama_barang': 'Nama Barang',
+           'm3': 'M3', 'harga_m3_pp': 'Harga M3 PP'}
+CUSTOMERS = {'PT SINAR': 1, 'CV MAJU': 2}
+
+
+def write_csv(path, rows, header=HEADER):
+    lines = [','.join(header)] + [','.join(f'"{value}"' for value in row) for row in rows]
+    # Excel "Save As CSV" menulis BOM di awal file
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8-sig')
+    return str(path)
+
+
+def test_csv_is_read_in_chunks_with_file_row_index(tmp_path):
+    filename = write_csv(tmp_path / 'barang.csv',
+                         [('PT Sinar', 'CV Maju', f'Barang {i}', '1', '') for i in range(7)])
+
+    chunks = list(read_import_chunks(filename, chunk_rows=3))
+
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert [list(chunk.index) for chunk in chunks] == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(chunks[0].columns) == HEADER
+    assert chunks[2]['Nama Barang'].tolist() == ['Barang 6']
+
+
+def test_preview_reads_only_the_first_rows(tmp_path):
+    filename = write_csv(tmp_path / 'barang.csv',
+                         [('PT Sinar', 'CV Maju', f'Barang {i}', '1', '') for i in range(20)])
+
+    preview = read_import_preview(filename, rows=5)
+
+    assert preview['Nama Barang'].tolist() == [f'Barang {i}' for i in range(5)]
+
+
+def test_xlsx_is_streamed_with_pandas_style_headers(tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(['Nama', 'Harga', 'Harga', None])
+    sheet.append(['Semen', 100, 200, 'x'])
+    sheet.append(['Besi', 300])
+    sheet.append(['Cat', 400, 500, 'y'])
+    filename = str(tmp_path / 'barang.xlsx')
+    workbook.save(filename)
+
+    chunks = list(read_import_chunks(filename, chunk_rows=2))
+
+    assert [list(chunk.index) for chunk in chunks] == [[0, 1], [2]]
+    assert list(chunks[0].columns) == ['Nama', 'Harga', 'Harga.1', 'Unnamed: 3']
+    # Baris pendek dilengkapi nilai kosong sampai lebar header
+    assert chunks[0].loc[1, ['Harga.1', 'Unnamed: 3']].isna().all()
+    assert chunks[1].loc[2, 'Harga.1'] == 500
+
+
+def test_validation_reports_excel_row_numbers_across_chunks(tmp_path):
+    filename = write_csv(tmp_path / 'barang.csv', [
+        ('PT Sinar', 'CV Maju', 'Semen', '1.5', 'Rp 100,000'),
+        ('', '', '', '', ''),
+        ('PT Sinar', 'Toko Baru', 'Besi', '2', ''),
+        ('PT Sinar', 'CV Maju', 'Cat', 'abc', ''),
+        ('PT Sinar', 'pt sinar', 'Pipa', '1', ''),
+    ])
+
+    records, validation_errors, customer_not_found = [], [], []
+    for chunk in read_import_chunks(filename, chunk_rows=2):
+        frame, _ = prepare_import_frame(chunk, MAPPING)
+        result = validate_import_frame(frame, MAPPING, CUSTOMERS)
+        records += result['records']
+        validation_errors += result['validation_errors']
+        customer_not_found += result['customer_not_found']
+
+    assert len(records) == 1
+    record = records[0]
+    assert (record['pengirim'], record['penerima'], record['nama_barang']) == (1, 2, 'Semen')
+    assert (record['m3_barang'], record['m3_pp'], record['row_number']) == (1.5, 100000.0, 2)
+    assert record['lebar_barang'] is None
+
+    # Header = baris 1, jadi baris data pertama = baris Excel 2
+    assert [(error['row_number'], error['penerima']) for error in customer_not_found] == [(4, 'Toko Baru')]
+    assert [error['row_number'] for error in validation_errors] == [5, 6]
+    assert 'Volume M³ harus berupa angka valid' in validation_errors[0]['error']
+    assert validation_errors[1]['error'] == 'Pengirim dan Penerima tidak boleh sama'
+
+
+def test_missing_required_mapping_is_rejected(tmp_path):
+    filename = write_csv(tmp_path / 'barang.csv', [('PT Sinar', 'CV Maju', 'Semen', '1', '')])
+    chunk = next(read_import_chunks(filename))
+
+    with pytest.raises(ValueError, match='nama_barang'):
+        prepare_import_frame(chunk, {'pengirim': 'Pengirim', 'penerima': 'Penerima'})
+    with pytest.raises(ValueError, match='Kolom mapped tidak ada'):
+        prepare_import_frame(chunk, dict(MAPPING, nama_barang='Nama'))
@@ -0,0 +1,91 @@
+"""BarangSearchIndex / BarangIndexDataSource tests"""
+
+from src.utils.barang_format import BarangRowFormatter
+from src.utils.barang_search import BarangIndexDataSource, BarangSearchIndex, search_row
+
+
+CUSTOMERS = {1: 'Toko Émas', 2: 'CV Maju', 3: 'PT Sinar'}
+
+
+def make_record(barang_id, nama, pengirim, penerima, ton):
+    return {'barang_id': barang_id, 'nama_barang': nama, 'pengirim': pengirim, 'penerima': penerima,
+            'sender_name': CUSTOMERS[pengirim], 'receiver_name': CUSTOMERS[penerima],
+            'ton_barang': ton, 'm3_barang': 1.0, 'created_at': '2025-01-01 00:00:00'}
+
+
+class FakeBarangDb:
+    """get_barang_sorted_ids/get_barang_by_ids over a dict of records"""
+
+    def __init__(self, records):
+        self.records = {record['barang_id']: record for record in records}
+        self.sorted_calls = []
+
+    def count_barang(self, filters=None):
+        raise AssertionError("count must come from the index")
+
+    def get_barang_page(self, offset, limit, sort=None, filters=None):
+        raise AssertionError("pages must come from the index ids")
+
+    def get_barang_sorted_ids(self, sort=None):
+        self.sorted_calls.append(sort)
+        column, descending = sort
+        present = [record for record in self.records.values() if record[column] is not None]
+        ordered = sorted(present, key=lambda record: (record[column], record['barang_id']), reverse=descending)
+        return [record['barang_id'] for record in ordered] + sorted(
+            record['barang_id'] for record in self.records.values() if record[column] is None)
+
+    def get_barang_by_ids(self, barang_ids):
+        return [self.records[barang_id] for barang_id in barang_ids if barang_id in self.records]
+
+
+def make_source(records):
+    db = FakeBarangDb(records)
+    index = BarangSearchIndex([search_row(record) for record in records])
+    source = BarangIndexDataSource(db, index, BarangRowFormatter(),
+                                   sort_columns={'Nama': 'nama_barang', 'Berat': 'ton_barang'})
+    return source, db
+
+
+RECORDS = [
+    make_record(1, 'Meja Kayu', 1, 2, 3.0),
+    make_record(2, 'Kursi Plastik', 2, 3, 1.0),
+    make_record(3, 'Meja Besi', 3, 1, None),
+    make_record(4, 'Lemari', 1, 3, 2.0),
+    make_record(5, 'meja lipat', 2, 1, 0.5),
+]
+
+
+def test_sorted_pages_use_index_matches():
+    source, db = make_source(RECORDS)
+    filters = {'nama': 'meja', 'pengirim': '', 'penerima': ''}
+
+    assert source.count(filters) == 3
+    rows = source.fetch_page(0, 10, sort=('Berat', False), filters=filters)
+    assert [row[0] for row in rows] == [5, 1, 3]  # Berat kosong di akhir
+
+    rows = source.fetch_page(1, 1, sort=('Berat', False), filters=filters)
+    assert [row[0] for row in rows] == [1]
+    assert db.sorted_calls == [('ton_barang', False)]  # Urutan database di-cache per sort
+
+
+def test_non_ascii_customer_filter_matches_count():
+    source, _ = make_source(RECORDS)
+    filters = {'nama': '', 'pengirim': 'émas', 'penerima': ''}
+
+    assert source.count(filters) == 2
+    assert [row[0] for row in source.fetch_page(0, 10, sort=('Nama', True), filters=filters)] == [1, 4]
+
+
+def test_invalidate_after_index_upsert():
+    source, db = make_source(RECORDS)
+    source.fetch_page(0, 10, sort=('Nama', False))
+
+    renamed = dict(RECORDS[3], nama_barang='Almari')
+    db.records[4] = renamed
+    source.index.upsert([search_row(renamed)])
+    source.formatter.invalidate([4])
+    source.invalidate()
+
+    rows = source.fetch_page(0, 10, sort=('Nama', False))
+    assert [row[0] for row in rows] == [4, 2, 3, 1, 5]
+    assert len(db.sorted_calls) == 2
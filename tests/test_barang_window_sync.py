@@ -0,0 +1,136 @@
+"""BarangWindow cache sync with database write generations (headless, tanpa Tk window)"""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('pandas')
+pytest.importorskip('PIL')
+
+from src.models.database import BarangDatabase  # noqa: E402
+from src.utils.barang_format import BarangRowFormatter  # noqa: E402
+from src.views.barang_window import BarangWindow  # noqa: E402
+
+
+COLUMNS = ('ID', 'Pengirim', 'Penerima', 'Nama')
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = BarangDatabase(str(tmp_path / 'app.db'))
+    database.execute_many("INSERT INTO customers (nama_customer, alamat_customer) VALUES (?, ?)",
+                          [('PT Sinar', '-'), ('CV Maju', '-')])
+    database.create_barang_batch([{'pengirim': 1, 'penerima': 2, 'nama_barang': nama}
+                                  for nama in ('Semen', 'Besi', 'Cat')])
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def window(db, make_tree_view):
+    """BarangWindow tanpa create_window: state cache + PaginatedTreeView headless"""
+    win = BarangWindow.__new__(BarangWindow)
+    win.db = db
+    win.barang_index = None
+    win.barang_source = None
+    win.barang_formatter = BarangRowFormatter()
+    win.barang_index_stamp = None
+    win.pending_db_changes = []
+    win.unsubscribe_db = db.subscribe(win.on_db_changed, tables=('barang', 'customers'))
+    win.tree = make_tree_view(columns=COLUMNS, virtual=True)
+    empty = SimpleNamespace(get=lambda: '')
+    win.search_name_var = win.filter_pengirim_var = win.filter_penerima_var = empty
+    win.update_barang_info_label = lambda: None
+    win.load_barang()
+    yield win
+    win.unsubscribe_db()
+
+
+def shown_rows(win):
+    fake = win.tree.tree
+    return {values[0]: values for values in (fake.items[slot]['values'] for slot in fake.get_children())}
+
+
+def test_customers_write_drops_index_stamp_and_row_memo(window, db):
+    assert window.barang_index_stamp == db.get_generations('barang', 'customers')
+    assert len(window.barang_formatter) == 3
+
+    db.execute("UPDATE customers SET nama_customer = 'CV Maju Jaya' WHERE customer_id = 2")
+
+    assert window.barang_index_stamp is None
+    assert [change[0] for change in window.apply_db_changes()] == ['customers']
+    assert len(window.barang_formatter) == 0
+
+    window.load_barang()
+    assert window.barang_index_stamp == db.get_generations('barang', 'customers')
+    assert {row[2] for row in shown_rows(window).values()} == {'CV Maju Jaya'}
+    assert window.barang_index.search({'penerima': 'jaya'}) == [1, 2, 3]
+
+
+@pytest.fixture
+def full_loads(window):
+    """Hitung load_barang penuh yang dipicu apply_barang_write"""
+    calls = []
+    original = window.load_barang
+
+    def counting_load():
+        calls.append(True)
+        original()
+
+    window.load_barang = counting_load
+    return calls
+
+
+def edit(db, barang_id, nama):
+    return db.update_barang({'barang_id': barang_id, 'pengirim': 1, 'penerima': 2, 'nama_barang': nama})
+
+
+def test_own_edit_updates_row_in_place(window, db, full_loads):
+    record = edit(db, 1, 'Semen Gresik')
+
+    window.apply_barang_write(updated=[record])
+
+    assert full_loads == []
+    assert shown_rows(window)[1][3] == 'Semen Gresik'
+    assert window.barang_index_stamp == db.get_generations('barang', 'customers')
+    assert window.barang_index.search({'nama': 'gresik'}) == [1]
+
+
+def test_other_barang_written_meanwhile_forces_full_load(window, db, full_loads):
+    edit(db, 2, 'Besi Beton')
+    record = edit(db, 1, 'Semen Gresik')
+
+    window.apply_barang_write(updated=[record])
+
+    assert full_loads == [True]
+    assert shown_rows(window)[2][3] == 'Besi Beton'
+
+
+def test_write_without_ids_forces_full_load(window, db, full_loads):
+    db.execute("UPDATE barang SET nama_barang = 'Cat Tembok' WHERE barang_id = 3")
+    record = edit(db, 1, 'Semen Gresik')
+
+    window.apply_barang_write(updated=[record])
+
+    assert full_loads == [True]
+    assert shown_rows(window)[3][3] == 'Cat Tembok'
+
+
+def test_customers_write_meanwhile_forces_full_load(window, db, full_loads):
+    db.execute("UPDATE customers SET nama_customer = 'PT Sinar Baru' WHERE customer_id = 1")
+    record = edit(db, 1, 'Semen Gresik')
+
+    window.apply_barang_write(updated=[record])
+
+    assert full_loads == [True]
+    assert {row[1] for row in shown_rows(window).values()} == {'PT Sinar Baru'}
+
+
+def test_own_delete_removes_row_without_full_load(window, db, full_loads):
+    db.delete_barang(2)
+
+    window.apply_barang_write(removed=[2])
+
+    assert full_loads == []
+    assert sorted(shown_rows(window)) == [1, 3]
+    assert window.barang_index.search({}) == [1, 3]
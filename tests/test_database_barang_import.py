@@ -0,0 +1,117 @@
+"""create_barang_chunks: staged import, atomic publish, cancel and per-row errors"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from src.models.database import BarangDatabase, DatabaseError, OperationCancelled
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = BarangDatabase(str(tmp_path / 'app.db'))
+    database.execute_many("INSERT INTO customers (nama_customer, alamat_customer) VALUES (?, ?)",
+                          [('PT Sinar', '-'), ('CV Maju', '-')])
+    yield database
+    database.close()
+
+
+def barang(nama, pengirim=1, penerima=2):
+    return {'nama_barang': nama, 'pengirim': pengirim, 'penerima': penerima}
+
+
+def barang_count(db):
+    return db.execute_one("SELECT COUNT(*) FROM barang")[0]
+
+
+def test_chunks_are_read_outside_the_write_transaction(db):
+    writes_between_chunks = []
+
+    def chunks():
+        for number in range(3):
+            yield [barang(f"Barang {number}-{i}") for i in range(4)]
+            # Koneksi lain bisa menulis saat chunk berikutnya dibaca/divalidasi
+            other = sqlite3.connect(db.db_path, timeout=0.1)
+            try:
+                other.execute("UPDATE customers SET alamat_customer = ? WHERE customer_id = 1", (str(number),))
+                other.commit()
+                writes_between_chunks.append(number)
+            finally:
+                other.close()
+
+    result = db.create_barang_chunks(chunks(), total=12)
+
+    assert writes_between_chunks == [0, 1, 2]
+    assert result['success_count'] == 12
+    assert len(result['created_ids']) == 12
+    assert barang_count(db) == 12
+
+
+def test_invalid_rows_reported_per_index(db):
+    result = db.create_barang_chunks([[barang('A'), barang('', 1, 2)], [barang('B', None, 2)]])
+
+    assert result['success_count'] == 1
+    assert [error['index'] for error in result['errors']] == [1, 2]
+
+
+def test_staged_rows_invisible_until_publish(db):
+    seen_by_other = []
+
+    def chunks():
+        yield [barang(f"Barang {i}") for i in range(3)]
+        other = sqlite3.connect(db.db_path)
+        try:
+            seen_by_other.append(other.execute("SELECT COUNT(*) FROM barang").fetchone()[0])
+        finally:
+            other.close()
+        yield [barang('Terakhir')]
+
+    result = db.create_barang_chunks(chunks())
+
+    assert seen_by_other == [0]
+    assert result['created_ids'] == [row[0] for row in db.execute("SELECT barang_id FROM barang ORDER BY barang_id")]
+    assert barang_count(db) == 4
+
+
+def test_cancel_publishes_nothing(db):
+    cancel_event = threading.Event()
+
+    def chunks():
+        yield [barang(f"Barang {i}") for i in range(5)]
+        yield [barang(f"Barang lagi {i}") for i in range(5)]
+        cancel_event.set()
+        yield [barang('Tidak masuk')]
+
+    with pytest.raises(OperationCancelled):
+        db.create_barang_chunks(chunks(), cancel_event=cancel_event)
+
+    assert barang_count(db) == 0
+    # Staging dibuang, import berikutnya mulai bersih
+    assert db.create_barang_chunks([[barang('Baru')]])['success_count'] == 1
+
+
+def test_reader_failure_publishes_nothing(db):
+    def chunks():
+        yield [barang('Barang 1'), barang('Barang 2')]
+        raise ValueError("file rusak")
+
+    with pytest.raises(DatabaseError):
+        db.create_barang_chunks(chunks())
+
+    assert barang_count(db) == 0
+
+
+def test_rejected_row_reported_and_others_published(db):
+    db.get_connection().execute("""
+        CREATE TRIGGER reject_bad_barang BEFORE INSERT ON barang WHEN NEW.nama_barang = 'BAD'
+        BEGIN SELECT RAISE(ABORT, 'rejected'); END
+    """)
+    rows = [barang('A'), dict(barang('BAD'), row_number=7), barang('C')]
+
+    result = db.create_barang_chunks([rows[:2], rows[2:]])
+
+    assert result['success_count'] == 2
+    assert [(error['index'], error['data']['row_number']) for error in result['errors']] == [(1, 7)]
+    names = [row[0] for row in db.execute("SELECT nama_barang FROM barang ORDER BY barang_id")]
+    assert names == ['A', 'C']
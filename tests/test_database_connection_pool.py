@@ -0,0 +1,76 @@
+"""ConnectionPool: one reused connection per thread, release and close_all"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from src.models.database import ConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    connection_pool = ConnectionPool(str(tmp_path / 'pool.db'), timeout=1.0)
+    yield connection_pool
+    connection_pool.close_all()
+
+
+def in_thread(target):
+    result = {}
+
+    def run():
+        result['value'] = target()
+
+    worker = threading.Thread(target=run)
+    worker.start()
+    worker.join()
+    return result['value']
+
+
+def test_same_thread_reuses_its_connection(pool):
+    first = pool.get()
+
+    assert pool.get() is first
+    assert first.row_factory is sqlite3.Row
+    assert pool.size() == 1
+
+
+def test_each_thread_gets_its_own_connection(pool):
+    main_conn = pool.get()
+
+    worker_conns = in_thread(lambda: (pool.get(), pool.get()))
+
+    assert worker_conns[0] is worker_conns[1]
+    assert worker_conns[0] is not main_conn
+    assert pool.size() == 2
+
+
+def test_release_closes_only_the_current_threads_connection(pool):
+    main_conn = pool.get()
+
+    def use_and_release():
+        conn = pool.get()
+        pool.release()
+        return conn
+
+    worker_conn = in_thread(use_and_release)
+
+    assert pool.size() == 1
+    with pytest.raises(sqlite3.ProgrammingError):
+        worker_conn.execute("SELECT 1")
+    assert main_conn.execute("SELECT 1").fetchone()[0] == 1
+
+
+def test_close_all_closes_every_connection_and_reopens_on_demand(pool):
+    main_conn = pool.get()
+    worker_conn = in_thread(pool.get)
+
+    pool.close_all()
+
+    assert pool.size() == 0
+    for conn in (main_conn, worker_conn):
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    reopened = pool.get()
+    assert reopened is not main_conn
+    assert reopened.execute("SELECT 1").fetchone()[0] == 1
@@ -0,0 +1,95 @@
+"""assign_barang_batch: detail/tax linkage, atomic rollback and repeated assignments"""
+
+import pytest
+
+from src.models.database import PPN_RATE, PPH23_RATE, DatabaseError
+
+
+@pytest.fixture
+def seeded(app_db):
+    app_db.execute_many("INSERT INTO customers (nama_customer, alamat_customer) VALUES (?, ?)",
+                        [('PT Sinar', '-'), ('CV Maju', '-')])
+    result = app_db.create_barang_batch([
+        {'pengirim': 1, 'penerima': 2, 'nama_barang': 'Semen', 'pajak': 1},
+        {'pengirim': 1, 'penerima': 2, 'nama_barang': 'Besi', 'pajak': 0},
+        {'pengirim': 1, 'penerima': 2, 'nama_barang': 'Cat', 'pajak': 1},
+    ])
+    container_id = app_db.execute_insert("INSERT INTO containers (container, party) VALUES (?, ?)",
+                                         ('TEMU1234567', '1x20'))
+    return app_db, container_id, result['created_ids']
+
+
+def item(barang_id, total_harga, colli_amount=1):
+    return {
+        'barang_id': barang_id, 'satuan': 'm3', 'door_type': 'DD', 'colli_amount': colli_amount,
+        'harga_per_unit': total_harga / colli_amount, 'total_harga': total_harga, 'tanggal': '2026-01-05'
+    }
+
+
+def detail_rows(db, container_id):
+    return db.execute("""
+        SELECT dc.id, dc.barang_id, dc.tax_id, dc.total_harga,
+               bt.barang_id AS tax_barang_id, bt.total_nilai_barang, bt.ppn_amount, bt.pph23_amount
+        FROM detail_container dc
+        LEFT JOIN barang_tax bt ON bt.tax_id = dc.tax_id
+        WHERE dc.container_id = ?
+        ORDER BY dc.id
+    """, (container_id,))
+
+
+def test_each_detail_row_links_its_own_tax_row(seeded):
+    db, container_id, (semen, besi, cat) = seeded
+
+    result = db.assign_barang_batch(container_id, [item(semen, 1000), item(besi, 2000), item(cat, 3000)])
+
+    assert result['success_count'] == 3
+    assert result['tax_count'] == 2
+    assert result['total_ppn'] == pytest.approx(4000 * PPN_RATE)
+
+    rows = {row['barang_id']: row for row in detail_rows(db, container_id)}
+    assert rows[besi]['tax_id'] is None
+    for barang_id, total in ((semen, 1000), (cat, 3000)):
+        row = rows[barang_id]
+        assert row['tax_barang_id'] == barang_id
+        assert row['total_nilai_barang'] == total
+        assert row['ppn_amount'] == pytest.approx(total * PPN_RATE)
+        assert row['pph23_amount'] == pytest.approx(total * PPH23_RATE)
+    assert db.execute_one("SELECT COUNT(*) FROM barang_tax")[0] == 2
+
+
+def test_failure_mid_batch_rolls_back_every_row(seeded):
+    db, container_id, (semen, besi, cat) = seeded
+    db.execute("""
+        CREATE TRIGGER reject_negative_colli BEFORE INSERT ON detail_container
+        WHEN NEW.colli_amount < 0
+        BEGIN SELECT RAISE(ABORT, 'colli tidak valid'); END
+    """)
+
+    with pytest.raises(DatabaseError):
+        db.assign_barang_batch(container_id, [item(semen, 1000), item(besi, 2000, colli_amount=-1), item(cat, 3000)])
+
+    assert detail_rows(db, container_id) == []
+    # Tax row yang sempat di-insert sebelum baris gagal ikut di-rollback
+    assert db.execute_one("SELECT COUNT(*) FROM barang_tax")[0] == 0
+
+
+def test_same_barang_twice_gives_two_detail_rows(seeded):
+    db, container_id, (semen, _, _) = seeded
+
+    db.assign_barang_batch(container_id, [item(semen, 1000), item(semen, 2500)])
+
+    rows = detail_rows(db, container_id)
+    assert [row['barang_id'] for row in rows] == [semen, semen]
+    assert rows[0]['id'] != rows[1]['id']
+    assert rows[0]['tax_id'] != rows[1]['tax_id']
+    assert [row['total_nilai_barang'] for row in rows] == [1000, 2500]
+
+
+def test_unknown_barang_is_reported_without_blocking_the_rest(seeded):
+    db, container_id, (semen, _, _) = seeded
+
+    result = db.assign_barang_batch(container_id, [item(999, 1000), item(semen, 1000)])
+
+    assert result['assigned_ids'] == [semen]
+    assert result['errors'][0]['index'] == 0
+    assert len(detail_rows(db, container_id)) == 1
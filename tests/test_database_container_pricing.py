@@ -0,0 +1,125 @@
+"""bulk_update_container_pricing: per-detail tax sync, atomic rollback and repeated assignments"""
+
+import pytest
+
+from src.models.database import PPN_RATE
+
+
+@pytest.fixture
+def seeded(app_db):
+    app_db.execute_many("INSERT INTO customers (nama_customer, alamat_customer) VALUES (?, ?)",
+                        [('PT Sinar', '-'), ('CV Maju', '-')])
+    result = app_db.create_barang_batch([
+        {'pengirim': 1, 'penerima': 2, 'nama_barang': 'Semen', 'pajak': 1},
+        {'pengirim': 1, 'penerima': 2, 'nama_barang': 'Besi', 'pajak': 0},
+        {'pengirim': 1, 'penerima': 2, 'nama_barang': 'Cat', 'pajak': 1},
+    ])
+    container_id = app_db.execute_insert("INSERT INTO containers (container, party) VALUES (?, ?)",
+                                         ('TEMU1234567', '1x20'))
+    return app_db, container_id, result['created_ids']
+
+
+def assign(db, container_id, barang_id, total_harga):
+    """Detail row tanpa tax_id, seperti data sebelum harga diisi"""
+    return db.execute_insert("""
+        INSERT INTO detail_container (barang_id, container_id, satuan, door_type, colli_amount,
+                                      harga_per_unit, total_harga, tanggal)
+        VALUES (?, ?, 'm3', 'DD', 1, ?, ?, '2026-01-05')
+    """, (barang_id, container_id, total_harga, total_harga))
+
+
+def detail_rows(db, container_id):
+    return db.execute("""
+        SELECT dc.id, dc.barang_id, dc.tax_id, dc.total_harga,
+               bt.barang_id AS tax_barang_id, bt.total_nilai_barang, bt.ppn_amount
+        FROM detail_container dc
+        LEFT JOIN barang_tax bt ON bt.tax_id = dc.tax_id
+        WHERE dc.container_id = ?
+        ORDER BY dc.id
+    """, (container_id,))
+
+
+def price(total_harga, detail_id=None):
+    data = {'harga_per_unit': total_harga, 'total_harga': total_harga}
+    if detail_id is not None:
+        data['detail_id'] = detail_id
+    return data
+
+
+def test_new_tax_rows_are_linked_to_their_detail_rows(seeded):
+    db, container_id, (semen, besi, cat) = seeded
+    for barang_id in (semen, besi, cat):
+        assign(db, container_id, barang_id, 100)
+
+    result = db.bulk_update_container_pricing(container_id, {
+        semen: price(1000), besi: price(2000), str(cat): price(3000)
+    })
+
+    assert result == {'success': 3, 'error': 0, 'tax_updated': 2}
+    rows = {row['barang_id']: row for row in detail_rows(db, container_id)}
+    assert rows[besi]['tax_id'] is None
+    assert rows[besi]['total_harga'] == 2000
+    for barang_id, total in ((semen, 1000), (cat, 3000)):
+        assert rows[barang_id]['tax_barang_id'] == barang_id
+        assert rows[barang_id]['total_nilai_barang'] == total
+        assert rows[barang_id]['ppn_amount'] == pytest.approx(total * PPN_RATE)
+
+
+def test_existing_and_unlinked_tax_rows_are_reused(seeded):
+    db, container_id, (semen, _, cat) = seeded
+    assign(db, container_id, semen, 100)
+    assign(db, container_id, cat, 100)
+    db.bulk_update_container_pricing(container_id, {semen: price(500)})
+    linked_tax = detail_rows(db, container_id)[0]['tax_id']
+    # Record pajak lama untuk Cat yang belum punya tax_id di detail_container
+    legacy_tax = db.execute_insert("""
+        INSERT INTO barang_tax (container_id, barang_id, penerima, total_nilai_barang,
+                                ppn_rate, pph23_rate, ppn_amount, pph23_amount, total_tax)
+        VALUES (?, ?, 'CV Maju', 100, 0.011, 0.02, 1.1, 2, 3.1)
+    """, (container_id, cat))
+
+    db.bulk_update_container_pricing(container_id, {semen: price(1500), cat: price(2500)})
+
+    rows = detail_rows(db, container_id)
+    assert [row['tax_id'] for row in rows] == [linked_tax, legacy_tax]
+    assert [row['total_nilai_barang'] for row in rows] == [1500, 2500]
+    assert db.execute_one("SELECT COUNT(*) FROM barang_tax")[0] == 2
+
+
+def test_failure_mid_batch_rolls_back_every_row(seeded):
+    db, container_id, (semen, besi, cat) = seeded
+    for barang_id in (semen, besi, cat):
+        assign(db, container_id, barang_id, 100)
+    # Gagal di tax insert terakhir: update harga + tax Semen sudah jalan di transaksi yang sama
+    db.execute(f"""
+        CREATE TRIGGER reject_cat_tax BEFORE INSERT ON barang_tax
+        WHEN NEW.barang_id = {cat}
+        BEGIN SELECT RAISE(ABORT, 'pajak ditolak'); END
+    """)
+
+    result = db.bulk_update_container_pricing(container_id, {
+        semen: price(1000), besi: price(2000), cat: price(3000)
+    })
+
+    assert result == {'success': 0, 'error': 3, 'tax_updated': 0}
+    rows = detail_rows(db, container_id)
+    assert [row['total_harga'] for row in rows] == [100, 100, 100]
+    assert [row['tax_id'] for row in rows] == [None, None, None]
+    assert db.execute_one("SELECT COUNT(*) FROM barang_tax")[0] == 0
+
+
+def test_same_barang_twice_keeps_separate_detail_and_tax_rows(seeded):
+    db, container_id, (semen, _, _) = seeded
+    first = assign(db, container_id, semen, 100)
+    second = assign(db, container_id, semen, 100)
+
+    db.bulk_update_container_pricing(container_id, {semen: price(1000)})
+    db.bulk_update_container_pricing(container_id, {semen: price(4000, detail_id=second)})
+
+    rows = {row['id']: row for row in detail_rows(db, container_id)}
+    assert rows[first]['tax_id'] != rows[second]['tax_id']
+    assert rows[first]['total_harga'] == 1000
+    assert rows[first]['total_nilai_barang'] == 1000
+    assert rows[second]['total_harga'] == 4000
+    assert rows[second]['total_nilai_barang'] == 4000
+    assert db.execute_one("SELECT COUNT(*) FROM barang_tax")[0] == 2
@@ -0,0 +1,37 @@
+"""CustomerDirectory-backed customer lookups"""
+
+import pytest
+
+from src.models.database import CustomerDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = CustomerDatabase(str(tmp_path / 'app.db'))
+    database.execute_many("INSERT INTO customers (nama_customer, alamat_customer) VALUES (?, ?)",
+                          [('PT Sinar', '-'), ('CV Maju', '-')])
+    yield database
+    database.close()
+
+
+def test_customer_id_by_name_matches_exact_name_only(db):
+    assert db.get_customer_id_by_name('PT Sinar') == 1
+    assert db.get_customer_id_by_name('CV Maju') == 2
+    assert db.get_customer_id_by_name('PT SINAR') is None
+    assert db.get_customer_id_by_name('pt sinar') is None
+    assert db.get_customer_id_by_name('PT Baru') is None
+
+
+def test_name_map_is_case_insensitive_for_imports(db):
+    assert db.get_customer_name_map() == {'PT SINAR': 1, 'CV MAJU': 2}
+
+
+def test_writes_invalidate_the_cached_directory(db):
+    assert db.get_customer_id_by_name('PT Sinar') == 1
+
+    db.execute("UPDATE customers SET nama_customer = ? WHERE customer_id = 1", ('PT Sinar Jaya',))
+    db.execute("DELETE FROM customers WHERE customer_id = 2")
+
+    assert db.get_customer_id_by_name('PT Sinar') is None
+    assert db.get_customer_id_by_name('PT Sinar Jaya') == 1
+    assert db.get_customer_names() == {1: 'PT Sinar Jaya'}
@@ -0,0 +1,96 @@
+"""Per-table write generations and the subscribe API"""
+
+import pytest
+
+from src.models.database import CustomerDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = CustomerDatabase(str(tmp_path / 'app.db'))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def recorded(db):
+    events = []
+    unsubscribe = db.subscribe(lambda table, generation, ids: events.append((table, generation, ids)))
+    yield events
+    unsubscribe()
+
+
+def test_writes_bump_their_table_and_reads_do_not(db, recorded):
+    before = db.get_generations('customers', 'barang')
+
+    customer_id = db.execute_insert("INSERT INTO customers (nama_customer, alamat_customer) VALUES (?, ?)",
+                                    ('PT Sinar', '-'))
+    db.execute("UPDATE customers SET alamat_customer = ? WHERE customer_id = ?", ('Surabaya', customer_id))
+    db.execute("SELECT * FROM customers")
+    db.execute_one("SELECT COUNT(*) FROM barang")
+
+    assert db.get_generations('customers', 'barang') == (before[0] + 2, before[1])
+    # execute_insert tahu id baris baru, execute tidak
+    assert recorded == [('customers', before[0] + 1, [customer_id]), ('customers', before[0] + 2, None)]
+
+
+@pytest.mark.parametrize('query, table', [
+    ("INSERT OR REPLACE INTO kapals (feeder) VALUES ('X')", 'kapals'),
+    ("REPLACE INTO kapals (feeder) VALUES ('X')", 'kapals'),
+    ("  update OR IGNORE containers SET seal = 'S'", 'containers'),
+    ('DELETE FROM "barang_tax" WHERE 1 = 0', 'barang_tax'),
+    ("DELETE FROM [pengirim] WHERE 1 = 0", 'pengirim'),
+])
+def test_write_query_pattern_detects_table(db, recorded, query, table):
+    db._bump_for_query(query)
+
+    assert [event[0] for event in recorded] == [table]
+
+
+@pytest.mark.parametrize('query', [
+    "SELECT * FROM customers",
+    "WITH x AS (SELECT 1) SELECT * FROM x",
+    "PRAGMA table_info(customers)",
+])
+def test_non_write_queries_do_not_bump(db, recorded, query):
+    db._bump_for_query(query)
+
+    assert recorded == []
+
+
+def test_subscribe_filters_tables_and_unsubscribe_stops_delivery(db):
+    events = []
+    unsubscribe = db.subscribe(lambda table, generation, ids: events.append(table), tables=('barang',))
+
+    db.bump_generation('customers')
+    db.bump_generation('barang', [1, 2])
+    unsubscribe()
+    db.bump_generation('barang')
+    unsubscribe()  # Aman dipanggil dua kali
+
+    assert events == ['barang']
+
+
+def test_failing_subscriber_does_not_block_others(db, caplog):
+    events = []
+
+    def broken(table, generation, ids):
+        raise RuntimeError("subscriber rusak")
+
+    db.subscribe(broken)
+    db.subscribe(lambda table, generation, ids: events.append((table, ids)))
+
+    assert db.bump_generation('barang', [7]) == db.get_generation('barang')
+    assert events == [('barang', [7])]
+    assert 'subscriber rusak' in caplog.text
+
+
+def test_customers_write_invalidates_customer_directory(db):
+    db.execute("INSERT INTO customers (nama_customer, alamat_customer) VALUES ('PT Sinar', '-')")
+    assert db.get_customer_names() == {1: 'PT Sinar'}
+
+    # Write langsung lewat execute (bukan method CustomerDatabase) tetap membuang cache
+    db.execute("UPDATE customers SET nama_customer = 'PT Sinar Jaya' WHERE customer_id = 1")
+
+    assert db.get_customer_names() == {1: 'PT Sinar Jaya'}
+    assert db.get_customer_by_id(1)['nama_customer'] == 'PT Sinar Jaya'
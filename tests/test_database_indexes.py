@@ -0,0 +1,41 @@
+"""Secondary indexes for the join/filter columns used by the views"""
+
+import pytest
+
+from src.models.database import SCHEMA_INDEXES, SQLiteDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = SQLiteDatabase(str(tmp_path / 'app.db'))
+    yield database
+    database.close()
+
+
+def query_plan(db, query, params=()):
+    return ' | '.join(row['detail'] for row in db.execute(f"EXPLAIN QUERY PLAN {query}", params))
+
+
+def test_every_schema_index_exists_on_its_table(db):
+    indexes = {
+        row['name']: row['tbl_name']
+        for row in db.execute("SELECT name, tbl_name FROM sqlite_master WHERE type = 'index'")
+    }
+
+    for name, target in SCHEMA_INDEXES:
+        assert indexes.get(name) == target.split('(')[0]
+
+
+@pytest.mark.parametrize('query, index_name', [
+    ("SELECT * FROM detail_container WHERE container_id = ? ORDER BY assigned_at",
+     'idx_detail_container_container'),
+    ("SELECT id FROM detail_container WHERE barang_id = ? AND container_id = ?",
+     'idx_detail_container_barang'),
+    ("SELECT barang_id FROM barang WHERE penerima = ?", 'idx_barang_penerima'),
+    ("SELECT container_id FROM containers WHERE ref_joa = ?", 'idx_containers_ref_joa'),
+    ("SELECT * FROM barang_tax WHERE container_id = ? AND barang_id = ?", 'idx_barang_tax_container'),
+])
+def test_view_queries_use_the_indexes(db, query, index_name):
+    params = (1,) * query.count('?')
+
+    assert index_name in query_plan(db, query, params)
@@ -0,0 +1,78 @@
+"""get_joa_financials: per-receiver totals and first-row door type / unit cost"""
+
+import pytest
+
+
+@pytest.fixture
+def joa(app_db):
+    db = app_db
+    db.execute_many("INSERT INTO customers (nama_customer, alamat_customer) VALUES (?, ?)",
+                    [('PT Sinar', '-'), ('CV Maju', '-'), ('UD Abadi', '-')])
+    semen, besi, cat = db.create_barang_batch([
+        {'pengirim': 1, 'penerima': 2, 'nama_barang': 'Semen', 'm3_barang': 1.5, 'ton_barang': 2},
+        {'pengirim': 1, 'penerima': 2, 'nama_barang': 'Besi', 'm3_barang': 0.5, 'ton_barang': 1},
+        {'pengirim': 1, 'penerima': 3, 'nama_barang': 'Cat', 'm3_barang': 1, 'ton_barang': 1},
+    ])['created_ids']
+    c20 = db.execute_insert("INSERT INTO containers (container, party, ref_joa) VALUES (?, ?, ?)",
+                            ('TEMU0000020', '1x20', 'JOA-1'))
+    c40 = db.execute_insert("INSERT INTO containers (container, party, ref_joa) VALUES (?, ?, ?)",
+                            ('TEMU0000040', '1x40', 'JOA-1'))
+    other = db.execute_insert("INSERT INTO containers (container, party, ref_joa) VALUES (?, ?, ?)",
+                              ('TEMU0000099', '1x20', 'JOA-2'))
+
+    details = [
+        # Detail pertama CV Maju ada di container 40', baris berikutnya door type lain
+        (besi, c40, 'DD', 2, 300),
+        (semen, c20, 'PP', 1, 100),
+        (semen, c40, 'PD', 3, 200),
+        (cat, c20, '', 1, 50),
+        (cat, other, 'DD', 10, 9999),
+    ]
+    db.execute_many("""
+        INSERT INTO detail_container (barang_id, container_id, door_type, colli_amount, total_harga, tanggal, satuan)
+        VALUES (?, ?, ?, ?, ?, '2026-01-05', 'm3')
+    """, details)
+    db.execute_many("""
+        INSERT INTO container_delivery_costs (container_id, delivery, description, cost_description, cost, created_date)
+        VALUES (?, ?, ?, ?, ?, '2026-01-05')
+    """, [
+        (c20, 'Surabaya', 'Trucking', 'tarif awal', 500),
+        (c20, 'Surabaya', 'Trucking', 'tarif susulan', 700),
+        (c40, 'Jakarta', 'Trucking', 'bongkar', 900),
+        (other, 'Jakarta', 'Trucking', 'JOA lain', 1),
+    ])
+    return db
+
+
+def test_receivers_are_totalled_per_penerima(joa):
+    financials = joa.get_joa_financials('JOA-1')
+
+    assert financials['container_count'] == 2
+    assert (financials['party_count_20'], financials['party_count_40']) == (1, 1)
+    receivers = {row['customer_name']: row for row in financials['receivers']}
+    assert set(receivers) == {'CV Maju', 'UD Abadi'}
+    maju = receivers['CV Maju']
+    assert maju['total_colli'] == 6
+    assert maju['total_m3'] == pytest.approx(0.5 * 2 + 1.5 * 1 + 1.5 * 3)
+    assert maju['total_invoice'] == 600
+    assert receivers['UD Abadi']['total_invoice'] == 50
+    assert financials['sales_total'] == 650
+
+
+def test_door_type_comes_from_each_receivers_first_detail(joa):
+    receivers = {row['customer_name']: row for row in joa.get_joa_financials('JOA-1')['receivers']}
+
+    assert receivers['CV Maju']['door_type'] == 'DD'
+    # Door type kosong di detail pertama dianggap PP
+    assert receivers['UD Abadi']['door_type'] == 'PP'
+
+
+def test_delivery_cost_uses_first_row_per_type_and_size(joa):
+    financials = joa.get_joa_financials('JOA-1')
+
+    assert financials['delivery_costs']['pol'] == [
+        {'cost_type': 'Trucking', 'size': '20', 'notes': 'tarif awal', 'unit_cost': 500}
+    ]
+    assert financials['delivery_costs']['pod'] == [
+        {'cost_type': 'Trucking', 'size': '40', 'notes': 'bongkar', 'unit_cost': 900}
+    ]
@@ -0,0 +1,77 @@
+"""Schema migration runner and the schema_version table"""
+
+import pytest
+
+from src.models.database import SQLiteDatabase, DatabaseError
+
+
+LATEST_VERSION = SQLiteDatabase.MIGRATIONS[-1][0]
+
+
+def open_db(path, cls=SQLiteDatabase):
+    return cls(str(path))
+
+
+def applied_versions(db):
+    return [(row['version'], row['description'])
+            for row in db.execute("SELECT version, description FROM schema_version ORDER BY version")]
+
+
+def test_new_database_applies_every_migration_once(tmp_path):
+    db = open_db(tmp_path / 'app.db')
+    try:
+        assert db.get_schema_version() == LATEST_VERSION
+        assert applied_versions(db) == [(version, description)
+                                        for version, description, _ in SQLiteDatabase.MIGRATIONS]
+    finally:
+        db.close()
+
+
+def test_reopening_runs_no_migration(tmp_path, caplog):
+    open_db(tmp_path / 'app.db').close()
+    caplog.clear()
+
+    db = open_db(tmp_path / 'app.db')
+    try:
+        assert len(applied_versions(db)) == len(SQLiteDatabase.MIGRATIONS)
+        assert 'Applied migration' not in caplog.text
+        assert f"up to date (version {LATEST_VERSION})" in caplog.text
+    finally:
+        db.close()
+
+
+def test_only_pending_migrations_run_on_an_older_schema(tmp_path):
+    db = open_db(tmp_path / 'app.db')
+    db.execute("DELETE FROM schema_version WHERE version >= 3")
+    db.get_connection().execute("DROP INDEX idx_barang_penerima")
+    db.get_connection().commit()
+    db.close()
+
+    db = open_db(tmp_path / 'app.db')
+    try:
+        assert db.get_schema_version() == LATEST_VERSION
+        assert db.execute_one("SELECT 1 FROM sqlite_master WHERE name = 'idx_barang_penerima'") is not None
+    finally:
+        db.close()
+
+
+class BrokenMigrationDatabase(SQLiteDatabase):
+    MIGRATIONS = SQLiteDatabase.MIGRATIONS + [(LATEST_VERSION + 1, "Broken step", "_migration_broken")]
+
+    def _migration_broken(self):
+        self.get_connection().execute("CREATE TABLE half_done (id INTEGER)")
+        raise RuntimeError("migration gagal")
+
+
+def test_failed_migration_rolls_back_to_the_previous_version(tmp_path):
+    open_db(tmp_path / 'app.db').close()
+
+    with pytest.raises(DatabaseError):
+        open_db(tmp_path / 'app.db', BrokenMigrationDatabase)
+
+    db = open_db(tmp_path / 'app.db')
+    try:
+        assert db.get_schema_version() == LATEST_VERSION
+        assert db.execute_one("SELECT 1 FROM sqlite_master WHERE name = 'half_done'") is None
+    finally:
+        db.close()
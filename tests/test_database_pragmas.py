@@ -0,0 +1,84 @@
+"""PRAGMA profile on pooled connections and the periodic WAL checkpoint thread"""
+
+import threading
+
+import pytest
+
+from src.models import database as database_module
+from src.models.database import SQLiteDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = SQLiteDatabase(str(tmp_path / 'app.db'))
+    yield database
+    database.close()
+
+
+def pragma(conn, name):
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def test_pragma_profile_is_applied_to_every_pooled_connection(db):
+    connections = [db.get_connection()]
+    worker = threading.Thread(target=lambda: connections.append(db.get_connection()))
+    worker.start()
+    worker.join()
+
+    for conn in connections:
+        assert pragma(conn, 'journal_mode') == 'wal'
+        assert pragma(conn, 'synchronous') == 1  # NORMAL
+        assert pragma(conn, 'cache_size') == database_module.DATABASE_CONFIG['pragmas']['cache_size']
+        assert pragma(conn, 'temp_store') == 2  # MEMORY
+
+
+def test_invalid_pragma_is_logged_not_fatal(tmp_path, monkeypatch, caplog):
+    pragmas = dict(database_module.DATABASE_CONFIG['pragmas'], cache_size='1 1')  # syntax error
+    monkeypatch.setitem(database_module.DATABASE_CONFIG, 'pragmas', pragmas)
+    monkeypatch.setitem(database_module.DATABASE_CONFIG, 'checkpoint_interval', 0)
+
+    database = SQLiteDatabase(str(tmp_path / 'app.db'))
+    try:
+        assert pragma(database.get_connection(), 'journal_mode') == 'wal'
+    finally:
+        database.close()
+    assert 'Failed to apply PRAGMA cache_size=1 1' in caplog.text
+
+
+def test_checkpoint_thread_runs_periodically_and_stops_on_close(tmp_path, monkeypatch):
+    monkeypatch.setitem(database_module.DATABASE_CONFIG, 'checkpoint_interval', 0.01)
+    checkpoint_threads = []
+    checkpointed = threading.Event()
+    original_checkpoint = SQLiteDatabase.checkpoint
+
+    def recording_checkpoint(self, mode='PASSIVE'):
+        checkpoint_threads.append((threading.current_thread().name, mode))
+        if mode == 'PASSIVE':
+            checkpointed.set()
+        return original_checkpoint(self, mode)
+
+    monkeypatch.setattr(SQLiteDatabase, 'checkpoint', recording_checkpoint)
+
+    database = SQLiteDatabase(str(tmp_path / 'app.db'))
+    thread = database._checkpoint_thread
+    assert thread is not None and thread.daemon
+    assert checkpointed.wait(2.0)
+    assert ('wal-checkpoint', 'PASSIVE') in checkpoint_threads
+
+    database.close()
+
+    assert not thread.is_alive()
+    assert database._checkpoint_thread is None
+    assert database.pool.size() == 0
+    # close() men-truncate WAL dari thread pemanggil
+    assert checkpoint_threads[-1] == (threading.current_thread().name, 'TRUNCATE')
+
+
+def test_no_checkpoint_thread_when_interval_is_zero(tmp_path, monkeypatch):
+    monkeypatch.setitem(database_module.DATABASE_CONFIG, 'checkpoint_interval', 0)
+
+    database = SQLiteDatabase(str(tmp_path / 'app.db'))
+    try:
+        assert database._checkpoint_thread is None
+    finally:
+        database.close()
@@ -0,0 +1,42 @@
+"""search()/search_names() with and without the FTS5 search_index"""
+
+import pytest
+
+from src.models.database import BarangDatabase
+
+
+NAMES = ['PT Sinar Jaya', 'CV Sinar Abadi', 'Toko Jaya Makmur', 'Koperasi Sinarmas']
+
+
+def make_db(path, monkeypatch, fts5):
+    if not fts5:
+        monkeypatch.setattr(BarangDatabase, 'fts5_available', lambda self: False)
+    db = BarangDatabase(str(path))
+    db.execute_many("INSERT INTO customers (nama_customer, alamat_customer) VALUES (?, ?)",
+                    [(name, "-") for name in NAMES])
+    return db
+
+
+@pytest.mark.parametrize('fts5', [True, False])
+def test_search_names_prefix_match(tmp_path, monkeypatch, fts5):
+    db = make_db(tmp_path / 'app.db', monkeypatch, fts5)
+    try:
+        assert db.has_search_index() is fts5
+        assert sorted(db.search_names('sinar', 'customer')) == ['CV Sinar Abadi', 'Koperasi Sinarmas', 'PT Sinar Jaya']
+        assert db.search_names('jaya sin', 'customer') == ['PT Sinar Jaya']
+        assert db.search_names('inar', 'customer') == []  # Hanya awal kata, bukan substring
+        assert db.search_names('  ', 'customer') == []
+    finally:
+        db.close()
+
+
+def test_migration_skipped_without_fts5(tmp_path, monkeypatch):
+    db = make_db(tmp_path / 'app.db', monkeypatch, fts5=False)
+    try:
+        assert db.get_schema_version() == db.MIGRATIONS[-1][0]
+        triggers = db.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%search%'")
+        assert triggers == []
+        results = db.search('makmur')
+        assert [(result['kind'], result['name']) for result in results] == [('customer', 'Toko Jaya Makmur')]
+    finally:
+        db.close()
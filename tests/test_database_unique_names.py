@@ -0,0 +1,82 @@
+"""Unique UPPER(name) indexes and the in-database dedupe of bulk customer/sender upserts"""
+
+import sqlite3
+
+import pytest
+
+from src.models.database import AppDatabase, UNIQUE_NAME_INDEXES
+
+
+def index_is_unique(db, index_name):
+    table = UNIQUE_NAME_INDEXES[index_name][0]
+    return {row['name']: row['unique'] for row in db.execute(f"PRAGMA index_list({table})")}.get(index_name)
+
+
+def test_unique_indexes_reject_case_variants(app_db):
+    for index_name in UNIQUE_NAME_INDEXES:
+        assert index_is_unique(app_db, index_name) == 1
+
+    app_db.execute("INSERT INTO customers (nama_customer, alamat_customer) VALUES ('PT Sinar', '-')")
+    with pytest.raises(sqlite3.IntegrityError):
+        app_db.get_connection().execute(
+            "INSERT INTO customers (nama_customer, alamat_customer) VALUES ('pt SINAR', '-')")
+    app_db.get_connection().rollback()
+
+
+def test_bulk_upsert_customers_skips_existing_and_repeated_names(app_db):
+    app_db.execute("INSERT INTO customers (nama_customer, alamat_customer) VALUES ('PT Sinar', 'Surabaya')")
+    assert app_db.get_customer_name_map() == {'PT SINAR': 1}
+
+    result = app_db.bulk_upsert_customers([
+        ('pt sinar', 'alamat baru'), ('CV Baru', 'Jakarta'), ('cv baru', 'Bandung'), ('UD Lain', None)
+    ])
+
+    assert result == {'inserted': 2, 'duplicates': 2, 'duplicate_indexes': [0, 2]}
+    rows = app_db.execute("SELECT nama_customer, alamat_customer FROM customers ORDER BY customer_id")
+    assert [tuple(row) for row in rows] == [('PT Sinar', 'Surabaya'), ('CV Baru', 'Jakarta'), ('UD Lain', '')]
+    # Write lewat insert_unique_names ikut membuang cache CustomerDirectory
+    assert set(app_db.get_customer_name_map()) == {'PT SINAR', 'CV BARU', 'UD LAIN'}
+
+
+def test_bulk_upsert_customers_requires_names(app_db):
+    with pytest.raises(ValueError):
+        app_db.bulk_upsert_customers([('CV Baru', '-'), ('', '-')])
+    assert app_db.execute_one("SELECT COUNT(*) FROM customers")[0] == 0
+
+
+def test_bulk_upsert_senders(app_db):
+    first = app_db.bulk_upsert_senders(['PT Sinar', 'CV Maju'])
+    second = app_db.bulk_upsert_senders(['CV MAJU', 'Toko Baru', 'toko baru'])
+
+    assert first['inserted'] == 2
+    assert second == {'inserted': 1, 'duplicates': 2, 'duplicate_indexes': [0, 2]}
+    names = [row[0] for row in app_db.execute("SELECT nama_pengirim FROM pengirim ORDER BY pengirim_id")]
+    assert names == ['PT Sinar', 'CV Maju', 'Toko Baru']
+
+
+def test_legacy_duplicates_get_a_non_unique_index_and_still_dedupe(tmp_path):
+    path = str(tmp_path / 'app.db')
+    AppDatabase._instance = None
+    AppDatabase._initialized = False
+    db = AppDatabase(path)
+    try:
+        # Database lama: duplikat nama sudah ada sebelum migration 5
+        db.execute("DROP INDEX idx_customers_nama_upper")
+        db.execute_many("INSERT INTO customers (nama_customer, alamat_customer) VALUES (?, ?)",
+                        [('PT Sinar', '-'), ('PT SINAR', '-')])
+        db.execute("DELETE FROM schema_version WHERE version = 5")
+        db.close()
+
+        AppDatabase._instance = None
+        AppDatabase._initialized = False
+        db = AppDatabase(path)
+        assert index_is_unique(db, 'idx_customers_nama_upper') == 0
+        assert index_is_unique(db, 'idx_pengirim_nama_upper') == 1
+
+        result = db.bulk_upsert_customers([('pt sinar', '-'), ('CV Baru', '-')])
+        assert result['inserted'] == 1
+        assert result['duplicate_indexes'] == [0]
+    finally:
+        db.close()
+        AppDatabase._instance = None
+        AppDatabase._initialized = False
@@ -0,0 +1,254 @@
+"""PaginatedTreeView tests: page redraw/chunked insert and QueryDataSource against in-memory SQLite"""
+
+import sqlite3
+
+import pytest
+
+from src.widget.paginated_tree_view import (DECIMAL_COMMA, DECIMAL_POINT, QueryDataSource, TreeDataSource,
+                                           make_sort_key)
+
+
+SORT_SQL = {'nama': 'nama', 'jumlah': 'jumlah'}
+
+
+@pytest.fixture
+def barang_db():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE barang (id INTEGER PRIMARY KEY, nama TEXT, jumlah INTEGER)")
+    conn.executemany("INSERT INTO barang (id, nama, jumlah) VALUES (?, ?, ?)",
+                     [(i, f"{'kursi' if i % 3 else 'meja'} {i:04d}", (i * 7) % 50) for i in range(1, 1001)])
+    yield conn
+    conn.close()
+
+
+def _where(filters):
+    if filters and filters.get('nama'):
+        return " WHERE nama LIKE ?", [f"%{filters['nama']}%"]
+    return "", []
+
+
+class CountingSource:
+    """count_func/fetch_func in AppDatabase style, recording every fetch"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.fetches = []
+
+    def count(self, filters=None):
+        where, params = _where(filters)
+        return self.conn.execute(f"SELECT COUNT(*) FROM barang{where}", params).fetchone()[0]
+
+    def fetch(self, offset, limit, sort=None, filters=None):
+        self.fetches.append((offset, limit, sort, filters))
+        where, params = _where(filters)
+        order = "id"
+        if sort:
+            order = f"{SORT_SQL[sort[0]]} {'DESC' if sort[1] else 'ASC'}, id"
+        return self.conn.execute(f"SELECT id, nama, jumlah FROM barang{where} ORDER BY {order} LIMIT ? OFFSET ?",
+                                 params + [limit, offset]).fetchall()
+
+
+def format_row(record):
+    return {'iid': str(record[0]), 'values': record, 'tags': ()}
+
+
+def make_source(conn, sort_columns=None):
+    backend = CountingSource(conn)
+    source = QueryDataSource(backend.count, backend.fetch, format_row=format_row,
+                             sort_columns=sort_columns or {'nama': 'nama', 'jumlah': 'jumlah'})
+    return source, backend
+
+
+def shown_values(view):
+    return [view.tree.items[iid]['values'] for iid in view.tree.get_children()]
+
+
+def test_tree_data_source_is_abstract():
+    with pytest.raises(TypeError):
+        TreeDataSource()
+
+    class CountOnly(TreeDataSource):
+        def count(self, filters=None):
+            return 0
+
+    with pytest.raises(TypeError):
+        CountOnly()
+
+
+def test_query_data_source_count_and_fetch(barang_db):
+    source, backend = make_source(barang_db)
+
+    assert source.count() == 1000
+    assert source.count({'nama': 'meja'}) == 333
+
+    rows = source.fetch_page(20, 5)
+    assert [row['iid'] for row in rows] == ['21', '22', '23', '24', '25']
+
+    # Kolom TreeView dipetakan ke kunci sort data source; kolom lain diabaikan
+    source.fetch_page(0, 5, sort=('jumlah', True))
+    source.fetch_page(0, 5, sort=('id', False))
+    assert backend.fetches[-2][2] == ('jumlah', True)
+    assert backend.fetches[-1][2] is None
+    assert source.can_sort('nama') and not source.can_sort('id')
+
+
+def test_paged_view_fetches_only_current_page(barang_db, make_tree_view):
+    source, backend = make_source(barang_db)
+    view = make_tree_view(items_per_page=20)
+    view.set_data_source(source)
+
+    assert view.total_items == 1000
+    assert view.total_pages == 50
+    assert [call[:2] for call in backend.fetches] == [(0, 20)]
+    assert shown_values(view)[0] == (1, 'kursi 0001', 7)
+
+    view.current_page = 3
+    view.refresh_display()
+    assert backend.fetches[-1][:2] == (60, 20)
+    assert shown_values(view)[0][0] == 61
+
+
+def test_set_filters_recounts_and_resets_page(barang_db, make_tree_view):
+    source, backend = make_source(barang_db)
+    view = make_tree_view(items_per_page=50)
+    view.set_data_source(source)
+    view.current_page = 4
+    view.refresh_display()
+
+    view.set_filters({'nama': 'meja'})
+
+    assert view.current_page == 0
+    assert view.total_items == 333
+    assert view.total_pages == 7
+    assert backend.fetches[-1] == (0, 50, None, {'nama': 'meja'})
+    assert all(values[1].startswith('meja') for values in shown_values(view))
+
+
+def test_sorted_source_page(barang_db, make_tree_view):
+    source, backend = make_source(barang_db)
+    view = make_tree_view(items_per_page=10)
+    view.set_data_source(source, sort=('jumlah', True))
+
+    assert backend.fetches[-1][2] == ('jumlah', True)
+    assert [values[2] for values in shown_values(view)] == [49] * 10
+
+
+def test_virtual_block_cache(barang_db, make_tree_view):
+    source, backend = make_source(barang_db)
+    view = make_tree_view(virtual=True, height=15)
+    view.set_data_source(source)
+
+    block = view.VIRTUAL_BLOCK_SIZE
+    assert view.total_items == 1000
+    assert len(view.tree.get_children()) == 15
+    assert [call[:2] for call in backend.fetches] == [(0, block)]
+
+    # Scroll di dalam blok yang sama tidak mengambil data lagi
+    view.scroll_virtual_to(100)
+    assert len(backend.fetches) == 1
+    assert shown_values(view)[0][0] == 101
+
+    # Slot melewati batas blok: blok berikutnya diambil sekali lalu di-cache
+    view.scroll_virtual_to(block - 5)
+    assert [call[:2] for call in backend.fetches[1:]] == [(block, block)]
+    view.scroll_virtual_to(block - 10)
+    assert len(backend.fetches) == 2
+
+    # Cache dibatasi VIRTUAL_BLOCK_CACHE, blok paling lama dibuang
+    view.VIRTUAL_BLOCK_CACHE = 2
+    for block_index in range(4):
+        view.get_virtual_row(block_index * block)
+    assert list(view._virtual_blocks) == [2, 3]
+
+    # Filter baru membuang cache dan kembali ke awal
+    fetches_before = len(backend.fetches)
+    view.set_filters({'nama': 'meja'})
+    assert view.virtual_offset == 0
+    assert view.total_items == 333
+    assert backend.fetches[fetches_before] == (0, block, None, {'nama': 'meja'})
+    assert list(view._virtual_blocks) == [0]
+
+
+def make_rows(count, label='barang'):
+    return [{'iid': str(i), 'values': (i, f"{label} {i}", i % 10), 'tags': ()} for i in range(count)]
+
+
+def test_page_sizes_exceed_insert_chunk(make_tree_view):
+    # Halaman terbesar (100) harus melewati jalur insert bertahap
+    assert make_tree_view().INSERT_CHUNK_SIZE < 100
+
+
+def test_refresh_clears_tree_with_single_delete(make_tree_view):
+    view = make_tree_view(items_per_page=20)
+    view.set_data(make_rows(45))
+    assert view.redraw_count == 1
+    assert view.tree.delete_calls == 0  # Tree masih kosong, tidak ada delete
+
+    view.go_to_next_page()
+    assert view.redraw_count == 2
+    assert view.tree.delete_calls == 1
+    assert [values[0] for values in shown_values(view)] == list(range(20, 40))
+
+
+def test_chunked_insert_for_large_page(make_tree_view):
+    view = make_tree_view(items_per_page=100)
+    chunk = view.INSERT_CHUNK_SIZE
+    view.set_data(make_rows(250))
+
+    # Chunk pertama langsung tampil, sisanya menunggu idle
+    assert view.redraw_count == 1
+    assert len(view.tree.get_children()) == chunk
+    assert view._pending_insert is not None
+
+    view.tree.run_idle()
+    assert view._pending_insert is None
+    assert [values[0] for values in shown_values(view)] == list(range(100))
+    assert view.redraw_count == 1
+
+
+def test_pending_chunk_reads_current_page_rows(make_tree_view):
+    view = make_tree_view(items_per_page=100)
+    chunk = view.INSERT_CHUNK_SIZE
+    view.set_data(make_rows(100))
+
+    # Baris yang belum ter-insert diganti sebelum chunk berikutnya berjalan
+    changed = {'iid': str(chunk + 5), 'values': (chunk + 5, 'diubah', (chunk + 5) % 10), 'tags': ()}
+    view.upsert_rows([changed])
+    assert view.redraw_count == 1
+    view.tree.run_idle()
+
+    assert view.tree.items[str(chunk + 5)]['values'] == changed['values']
+    assert len(view.tree.get_children()) == 100
+
+
+def test_refresh_cancels_pending_chunk(make_tree_view):
+    view = make_tree_view(items_per_page=100)
+    view.set_data(make_rows(300))
+    view.go_to_next_page()
+    assert len(view.tree.idle_callbacks) == 1  # Chunk halaman pertama sudah dibatalkan
+    view.tree.run_idle()
+
+    assert view.redraw_count == 2
+    assert [values[0] for values in shown_values(view)] == list(range(100, 200))
+
+
+@pytest.mark.parametrize('text, decimal_mark, expected', [
+    ('0,125', DECIMAL_COMMA, 0.125),  # format_berat
+    ('1.500.000,5', DECIMAL_COMMA, 1500000.5),
+    ('Rp 1.500', DECIMAL_COMMA, 1500.0),
+    ('1.500', DECIMAL_POINT, 1.5),  # format_ton
+    ('Rp 1,500', DECIMAL_POINT, 1500.0),
+    ('Rp 1,500,000', DECIMAL_POINT, 1500000.0),
+    ('0.1250', DECIMAL_POINT, 0.125),
+])
+def test_sort_key_uses_column_decimal_mark(text, decimal_mark, expected):
+    assert make_sort_key(text, decimal_mark) == (0, expected, '')
+
+
+def test_sort_by_decimal_comma_column(make_tree_view):
+    view = make_tree_view(columns=('ID', 'Berat'), decimal_marks={'Berat': DECIMAL_COMMA})
+    view.set_data([(1, '0,125'), (2, '2,5'), (3, '0,5'), (4, '-'), (5, '12,0')])
+
+    view.sort_by('Berat')
+
+    assert [values[0] for values in shown_values(view)] == [1, 3, 2, 5, 4]
@@ -0,0 +1,136 @@
+"""PaginatedTreeView.upsert_rows / remove_rows: in-place row updates without a full reload"""
+
+import sqlite3
+
+import pytest
+
+from src.widget.paginated_tree_view import PaginatedTreeView, QueryDataSource
+
+
+def row(barang_id, nama, jumlah):
+    return {'iid': str(barang_id), 'values': (barang_id, nama, jumlah), 'tags': ()}
+
+
+def shown_values(view):
+    return [view.tree.items[iid]['values'] for iid in view.tree.get_children()]
+
+
+@pytest.fixture
+def view(make_tree_view):
+    paged = make_tree_view(items_per_page=5)
+    paged.set_data([row(i, f"barang {i:02d}", i % 4) for i in range(1, 13)])
+    return paged
+
+
+def test_row_key_uses_iid_or_first_value():
+    assert PaginatedTreeView.row_key(row(7, 'semen', 1)) == '7'
+    assert PaginatedTreeView.row_key((9, 'besi', 2)) == 9
+    assert PaginatedTreeView.row_key({'values': ()}) is None
+
+
+def test_upsert_existing_row_updates_its_item_in_place(view):
+    redraws, inserts = view.redraw_count, view.tree.insert_calls
+
+    view.upsert_rows([row(2, 'barang 02 baru', 9)])
+
+    assert shown_values(view)[1] == (2, 'barang 02 baru', 9)
+    assert (view.redraw_count, view.tree.insert_calls) == (redraws, inserts)
+    assert view.total_items == 12
+    # Baris di halaman lain juga diganti di data, tanpa digambar
+    view.upsert_rows([row(11, 'barang 11 baru', 0)])
+    assert view.redraw_count == redraws
+    view.go_to_last_page()
+    assert shown_values(view)[0] == (11, 'barang 11 baru', 0)
+
+
+def test_upsert_new_row_is_inserted_in_sort_order(view):
+    view.sort_by('nama')
+
+    view.upsert_rows([row(99, 'barang 00', 1)])
+
+    assert view.total_items == 13
+    assert view.total_pages == 3
+    assert shown_values(view)[0] == (99, 'barang 00', 1)
+
+
+def test_upsert_changing_sort_value_reorders(view):
+    view.sort_by('jumlah')
+    assert shown_values(view)[0][2] == 0
+
+    view.upsert_rows([row(1, 'barang 01', -5)])
+
+    assert shown_values(view)[0] == (1, 'barang 01', -5)
+
+
+def test_upsert_respects_active_filter(make_tree_view):
+    filtered = make_tree_view(items_per_page=5)
+    filtered.set_data([row(i, f"barang {i:02d}", i % 4) for i in range(1, 13)],
+                      filter_func=lambda item: item['values'][2] == 1)
+    assert [values[0] for values in shown_values(filtered)] == [1, 5, 9]
+
+    filtered.upsert_rows([row(5, 'barang 05', 2), row(20, 'barang 20', 1)])
+
+    assert [values[0] for values in shown_values(filtered)] == [1, 9, 20]
+    assert filtered.total_items == 3
+
+
+def test_remove_rows_shrinks_data_and_clamps_page(view):
+    view.go_to_last_page()
+    assert [values[0] for values in shown_values(view)] == [11, 12]
+
+    view.remove_rows(['11', '12', 'tidak-ada'])
+
+    assert view.total_items == 10
+    assert view.total_pages == 2
+    assert view.current_page == 1
+    assert [values[0] for values in shown_values(view)] == [6, 7, 8, 9, 10]
+    view.upsert_rows([row(3, 'barang 03 baru', 3)])
+    view.go_to_first_page()
+    assert shown_values(view)[2] == (3, 'barang 03 baru', 3)
+
+
+@pytest.fixture
+def barang_conn():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE barang (id INTEGER PRIMARY KEY, nama TEXT, jumlah INTEGER)")
+    conn.executemany("INSERT INTO barang VALUES (?, ?, ?)", [(i, f"barang {i:03d}", i) for i in range(1, 501)])
+    yield conn
+    conn.close()
+
+
+def make_source(conn, fetches):
+    def count(filters=None):
+        return conn.execute("SELECT COUNT(*) FROM barang").fetchone()[0]
+
+    def fetch(offset, limit, sort=None, filters=None):
+        fetches.append((offset, limit))
+        return conn.execute("SELECT id, nama, jumlah FROM barang ORDER BY id LIMIT ? OFFSET ?",
+                            (limit, offset)).fetchall()
+
+    return QueryDataSource(count, fetch, format_row=lambda record: row(*record))
+
+
+@pytest.mark.parametrize('virtual', [False, True])
+def test_data_source_upsert_swaps_loaded_rows_without_query(make_tree_view, barang_conn, virtual):
+    fetches = []
+    source_view = make_tree_view(items_per_page=20, virtual=virtual, height=10)
+    source_view.set_data_source(make_source(barang_conn, fetches))
+    fetched = len(fetches)
+
+    source_view.upsert_rows([row(3, 'semen baru', 7)])
+
+    assert len(fetches) == fetched
+    assert shown_values(source_view)[2] == (3, 'semen baru', 7)
+
+
+@pytest.mark.parametrize('virtual', [False, True])
+def test_data_source_remove_recounts(make_tree_view, barang_conn, virtual):
+    fetches = []
+    source_view = make_tree_view(items_per_page=20, virtual=virtual, height=10)
+    source_view.set_data_source(make_source(barang_conn, fetches))
+
+    barang_conn.execute("DELETE FROM barang WHERE id = 2")
+    source_view.remove_rows(['2'])
+
+    assert source_view.total_items == 499
+    assert [values[0] for values in shown_values(source_view)][:3] == [1, 3, 4]
@@ -0,0 +1,92 @@
+"""PaginatedTreeView(virtual=True): fixed slot pool rebound while scrolling"""
+
+from types import SimpleNamespace
+
+import pytest
+
+
+ROW_COUNT = 200_000
+
+
+@pytest.fixture
+def view(make_tree_view):
+    virtual_view = make_tree_view(virtual=True, height=12)
+    virtual_view.set_data([{'iid': str(i), 'values': (i, f"barang {i}", i % 10), 'tags': ()}
+                           for i in range(ROW_COUNT)])
+    return virtual_view
+
+
+def visible_ids(view):
+    return [view.tree.items[slot]['values'][0] for slot in view.tree.get_children()]
+
+
+def slot_for(view, row_index):
+    for slot, (index, _) in view._slot_rows.items():
+        if index == row_index:
+            return slot
+    return None
+
+
+def test_slot_pool_stays_constant_while_scrolling(view):
+    inserts = view.tree.insert_calls
+    assert len(view.tree.get_children()) == 12
+    assert visible_ids(view) == list(range(12))
+
+    view.scroll_virtual_to(150_000)
+
+    assert visible_ids(view) == list(range(150_000, 150_012))
+    assert view.tree.insert_calls == inserts
+    assert view.tree.delete_calls == 0
+    assert view.v_scrollbar.last_set == (150_000 / ROW_COUNT, 150_012 / ROW_COUNT)
+
+
+def test_scrollbar_commands_move_and_clamp_the_window(view):
+    view.on_virtual_scroll('moveto', '0.5')
+    assert view.virtual_offset == ROW_COUNT // 2
+
+    view.on_virtual_scroll('scroll', '1', 'pages')
+    assert view.virtual_offset == ROW_COUNT // 2 + 12
+    view.on_virtual_scroll('scroll', '-2', 'units')
+    assert view.virtual_offset == ROW_COUNT // 2 + 10
+
+    view.on_virtual_scroll('moveto', '1.0')
+    assert visible_ids(view)[-1] == ROW_COUNT - 1
+    view.on_virtual_mousewheel(SimpleNamespace(num=5, delta=0))
+    assert visible_ids(view)[-1] == ROW_COUNT - 1
+    view.on_virtual_mousewheel(SimpleNamespace(num=4, delta=0))
+    assert view.virtual_offset == ROW_COUNT - 12 - 3
+
+
+def test_selection_survives_slot_rebinding(view):
+    view.scroll_virtual_to(500)
+    view.tree.selection_set([slot_for(view, 503)])
+    view.on_virtual_select()
+
+    view.scroll_virtual_to(90_000)
+    assert view.selection() == ('503',)
+    assert view.tree.selection() == ()
+    assert view.item('503', 'values') == [503, 'barang 503', 3]
+
+    view.scroll_virtual_to(495)
+    assert view.tree.selection() == (slot_for(view, 503),)
+
+
+def test_down_key_past_last_slot_scrolls_one_row(view):
+    last_slot = slot_for(view, 11)
+    view.tree.focus(last_slot)
+
+    result = view.on_virtual_key(SimpleNamespace(keysym='Down'))
+
+    assert result == 'break'
+    assert view.virtual_offset == 1
+    assert view.selection() == ('12',)
+    assert view.tree.items[view.tree.focus()]['values'][0] == 12
+
+
+def test_resize_grows_the_slot_pool(view):
+    view.tree._height = 20
+
+    view.on_virtual_configure()
+
+    assert len(view.tree.get_children()) == 20
+    assert visible_ids(view) == list(range(20))